@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PermissionGrant, EmailOutbox
+
+
+@admin.register(PermissionGrant)
+class PermissionGrantAdmin(admin.ModelAdmin):
+    list_display = ('role', 'resource', 'action', 'allowed')
+    list_filter = ('role', 'resource')
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
@@ -6,4 +6,5 @@ class AdminapiConfig(AppConfig):
     name = 'adminapi'
 
     def ready(self):
+        import adminapi.checks
         import adminapi.signals
\ No newline at end of file
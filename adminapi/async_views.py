@@ -0,0 +1,161 @@
+"""
+Jalur baca async (ASGI) untuk list & detail products dan orders.
+
+Di ASGI, view DRF sync dijalankan lewat sync_to_async: satu thread hop
+per request, dan semua view sync berbagi satu thread. AsyncReadMixin
+menjalankan GET list/retrieve langsung di event loop dengan async ORM
+(aiterator, aget), memakai komponen viewset yang sama (filter, sparse
+fieldsets, pagination, serializer, ETag, cache katalog), jadi response-nya
+identik dengan jalur sync. Method lain tetap ke viewset sync.
+
+URL-nya dipasang di backend/asgi_urls.py (ROOT_URLCONF untuk ASGI);
+di WSGI view async justru butuh event loop per request, jadi tidak dipakai.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    Versi async dari dispatch + list/retrieve ModelViewSet. Mixin lain
+    (ConditionalGetMixin, CatalogCacheMixin) menyediakan alist/aretrieve
+    yang membungkus versi di sini lewat super(), seperti list/retrieve.
+    """
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return render_response(self.response)
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+        request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        if self.get_throttles():
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request):
+        # sama dengan Request._authenticate, tapi memakai aauthenticate() kalau ada
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_permission'):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None),
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_object_permission'):
+                allowed = await permission.ahas_object_permission(request, self, obj)
+            else:
+                allowed = permission.has_object_permission(request, self, obj)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None),
+                )
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            # sama dengan get_object_or_404 DRF
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([obj async for obj in queryset.aiterator()], many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
+
+
+def render_response(response):
+    """
+    Render Response DRF di event loop. Handler ASGI memanggil render()
+    lewat sync_to_async kalau response masih punya method render, jadi
+    hasilnya disalin ke HttpResponse biasa.
+    """
+    if not isinstance(response, Response):
+        return response
+    response.render()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    rendered.cookies = response.cookies
+    return rendered
+
+
+def async_read_view(viewset, actions, **initkwargs):
+    """
+    View async untuk satu route viewset: GET ke alist/aretrieve
+    (AsyncReadMixin), method lain ke viewset.as_view(actions) lewat sync_to_async.
+    """
+    sync_view = viewset.as_view(actions, **initkwargs)
+    if 'get' in actions and 'head' not in actions:
+        actions = {**actions, 'head': actions['get']}
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+        self = viewset(**initkwargs)
+        self.action_map = actions
+        # seperti as_view DRF, supaya header Allow sama
+        for method, action in actions.items():
+            setattr(self, method, getattr(self, action))
+        return await self.adispatch(request, *args, **kwargs)
+
+    # seperti as_view DRF: CSRF dicek oleh authentication class, bukan middleware
+    view.csrf_exempt = True
+    view.cls = viewset
+    view.initkwargs = initkwargs
+    view.actions = actions
+    return view
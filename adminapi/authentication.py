@@ -0,0 +1,128 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Disimpan di cache untuk user yang tidak aktif / sudah dihapus
+REVOKED = -1
+
+
+def auth_version_cache_key(user_id):
+    return f'auth_version:{user_id}'
+
+
+def get_auth_version(user_id):
+    """
+    Versi auth user saat ini, dari cache. Kalau cache miss baru query
+    ke DB (satu kolom), hasilnya disimpan AUTH_VERSION_CACHE_TIMEOUT detik.
+    """
+    key = auth_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            get_user_model().objects
+            .filter(pk=user_id, is_active=True)
+            .values_list('auth_version', flat=True)
+            .first()
+        )
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, settings.AUTH_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+async def aget_auth_version(user_id):
+    """Versi async get_auth_version, untuk view async (adminapi/async_views.py)."""
+    key = auth_version_cache_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = await (
+            get_user_model().objects
+            .filter(pk=user_id, is_active=True)
+            .values_list('auth_version', flat=True)
+            .afirst()
+        )
+        if version is None:
+            version = REVOKED
+        await cache.aset(key, version, settings.AUTH_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def invalidate_auth_version(user_id):
+    cache.delete(auth_version_cache_key(user_id))
+
+
+class RoleTokenUser(TokenUser):
+    """
+    User stateless yang dibangun dari claim access token
+    (lihat CustomTokenObtainPairSerializer.get_token).
+    """
+
+    @cached_property
+    def id(self):
+        # claim user_id berupa string, samakan tipenya dengan primary key User
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def auth_version(self):
+        return self.token.get('auth_version')
+
+    def is_admin(self):
+        return self.role == get_user_model().ROLE_ADMIN
+
+    def is_manager(self):
+        return self.role == get_user_model().ROLE_MANAGER
+
+    def is_staff_role(self):
+        return self.role == get_user_model().ROLE_STAFF
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication tanpa lookup User ke DB:
+    - role & auth_version dibaca dari claim token
+    - auth_version dibandingkan dengan versi di cache, token lama ditolak
+    - token lama tanpa claim role tetap diterima lewat lookup DB biasa
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token or 'auth_version' not in validated_token:
+            return super().get_user(validated_token)
+
+        user = RoleTokenUser(validated_token)
+        if get_auth_version(user.id) != user.auth_version:
+            raise AuthenticationFailed(_('Token is no longer valid'), code='token_revoked')
+        return user
+
+    async def aauthenticate(self, request):
+        """Sama dengan authenticate(), dipakai view async."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if 'role' not in validated_token or 'auth_version' not in validated_token:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        user = RoleTokenUser(validated_token)
+        if await aget_auth_version(user.id) != user.auth_version:
+            raise AuthenticationFailed(_('Token is no longer valid'), code='token_revoked')
+        return user
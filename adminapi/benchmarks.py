@@ -0,0 +1,543 @@
+"""
+Skenario benchmark untuk `python manage.py bench`.
+
+Setiap skenario didaftarkan dengan @scenario dan mengembalikan list dict
+hasil (satu per variasi yang diukur). Command bench menjalankan skenario
+di database test sementara, jadi data asli tidak tersentuh.
+
+Hasil bisa dibandingkan dengan baseline (JSON dari run sebelumnya) lewat
+compare_results(); hasil dicocokkan berdasarkan IDENTITY_KEYS.
+"""
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+SCENARIOS = {}
+
+# field yang mengidentifikasi satu hasil (bukan angka yang diukur)
+IDENTITY_KEYS = ('name', 'role', 'orders', 'table_size', 'rows', 'threads', 'concurrency')
+# metric yang dicek terhadap baseline; query dihitung, bukan diukur, jadi tanpa toleransi
+LOWER_IS_BETTER = ('p50_ms', 'p95_ms', 'p99_ms', 'cpu_ms_per_10k_rows')
+HIGHER_IS_BETTER = ('ops_per_sec', 'rows_per_sec', 'orders_per_sec')
+EXACT_COUNTS = ('queries_per_op',)
+
+# skenario login_flood: laju total percobaan login penyerang (request/detik)
+FLOOD_THREADS = 4
+FLOOD_RATE = 100
+FLOOD_WARMUP = 40
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile dari list yang sudah diurutkan."""
+    return sorted_values[max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)]
+
+
+def measure(func, iterations):
+    """Jalankan func sebanyak iterations kali; throughput, latency p50/p95/p99 & jumlah query."""
+    func()  # warm up (cache, bloom filter, tabel permission)
+    latencies = []
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            call_start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+    return {**latency_stats(latencies, elapsed), 'queries_per_op': round(len(ctx.captured_queries) / iterations, 2)}
+
+
+def latency_stats(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'iterations': len(latencies),
+        'ops_per_sec': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def result_key(result):
+    return tuple((key, result[key]) for key in IDENTITY_KEYS if key in result)
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Bandingkan hasil dengan baseline. tolerance relatif (0.2 = boleh 20%
+    lebih lambat). Return list pesan regresi; hasil yang tidak ada di
+    baseline dilewati.
+    """
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result_key(result))
+        if base is None:
+            continue
+        label = ' '.join(f'{key}={value}' for key, value in result_key(result))
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER + EXACT_COUNTS:
+            if metric not in result or metric not in base:
+                continue
+            current, expected = result[metric], base[metric]
+            if metric in LOWER_IS_BETTER:
+                regressed = current > expected * (1 + tolerance)
+            elif metric in HIGHER_IS_BETTER:
+                regressed = current < expected * (1 - tolerance)
+            else:
+                regressed = current > expected
+            if regressed:
+                regressions.append(f'{label}: {metric} {current} (baseline {expected})')
+    return regressions
+
+
+@scenario('token_refresh')
+def token_refresh(options):
+    """Throughput /api/token/refresh vs ukuran tabel outstanding/blacklisted token."""
+    from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    from .models import User
+    from .serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
+    from .tokens import blacklist_filter
+
+    user = User.objects.filter(role='admin').first()
+    refresh = str(CustomTokenObtainPairSerializer.get_token(user))
+    variants = {
+        'simplejwt': TokenRefreshSerializer,
+        'filtered': CustomTokenRefreshSerializer,
+    }
+
+    results = []
+    for size in options['sizes']:
+        # isi tabel sampai `size` token, separuhnya di-blacklist
+        missing = size - OutstandingToken.objects.count()
+        expires_at = timezone.now() + timedelta(days=7)
+        for offset in range(0, max(missing, 0), 5000):
+            tokens = OutstandingToken.objects.bulk_create([
+                OutstandingToken(jti=uuid.uuid4().hex, token='', created_at=timezone.now(), expires_at=expires_at)
+                for _ in range(min(5000, missing - offset))
+            ])
+            BlacklistedToken.objects.bulk_create([
+                BlacklistedToken(token=token) for token in OutstandingToken.objects.filter(
+                    jti__in=[t.jti for t in tokens[::2]]
+                )
+            ])
+
+        for name, serializer_class in variants.items():
+            blacklist_filter.reset()
+
+            def refresh_once():
+                serializer_class(data={'refresh': refresh}).is_valid(raise_exception=True)
+
+            results.append({'name': f'token_refresh[{name}]', 'table_size': size, **measure(refresh_once, options['iterations'])})
+    return results
+
+
+def place_concurrent_orders(product_id, threads, orders_per_thread):
+    """
+    Beberapa thread memesan product yang sama (quantity 1) dengan alur yang
+    sama seperti OrderViewSet.perform_create: insert order lalu reserve stock
+    sebagai statement terakhir dalam satu transaksi (OutOfStock me-rollback
+    INSERT). Return jumlah order diterima / ditolak (out of stock) dan
+    orders/sec.
+    """
+    from .inventory import OutOfStock, reserve_stock
+    from .models import Order, Product
+
+    product = Product.objects.get(pk=product_id)
+    counts = {'accepted': 0, 'rejected': 0, 'retries': 0}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(threads)
+
+    def place_order():
+        try:
+            with transaction.atomic():
+                Order.objects.create(product=product, customer_name='bench', quantity=1, total_price=product.price)
+                reserve_stock(product_id, 1)
+        except OutOfStock:
+            return False
+        return True
+
+    def worker():
+        local = {'accepted': 0, 'rejected': 0, 'retries': 0}
+        start_barrier.wait()
+        try:
+            for _ in range(orders_per_thread):
+                while True:
+                    try:
+                        accepted = place_order()
+                        break
+                    except OperationalError:
+                        # SQLite (shared cache) menolak writer paralel alih-alih menunggu;
+                        # transaksi sudah di-rollback jadi aman diulang
+                        local['retries'] += 1
+                        time.sleep(0.001)
+                local['accepted' if accepted else 'rejected'] += 1
+        finally:
+            connection.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = threads * orders_per_thread
+    return {**counts, 'orders_per_sec': round(total / elapsed, 1)}
+
+
+@scenario('stock_reservation')
+def stock_reservation(options):
+    """Orders/sec pada satu product populer, dengan pengecekan tidak ada oversell."""
+    from .models import Order, Product
+
+    results = []
+    for threads in (1, 4, 8):
+        stock = options['iterations']
+        product = Product.objects.create(name='Hot item', price=1, stock=stock)
+        result = place_concurrent_orders(product.pk, threads, stock * 2 // threads)
+        product.refresh_from_db()
+        result['oversold'] = Order.objects.filter(product=product).count() - stock + product.stock
+        results.append({'name': 'stock_reservation', 'threads': threads, **result})
+    return results
+
+
+@scenario('product_import')
+def product_import(options):
+    """Rows/sec import CSV: insert baru lalu import ulang (semua row jadi update)."""
+    import io
+
+    from .imports import import_products
+
+    results = []
+    for size in options['sizes']:
+        body = io.StringIO()
+        body.write('sku,name,price,stock,status\n')
+        for i in range(size):
+            body.write(f'BENCH-{size}-{i},Product {i},{10 + i % 500}.50,{i % 100},true\n')
+
+        for phase in ('insert', 'update'):
+            body.seek(0)
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                result = import_products(body, 'csv')
+            elapsed = time.perf_counter() - start
+            results.append({
+                'name': f'product_import[{phase}]', 'rows': size,
+                'rows_per_sec': round(size / elapsed, 1), 'queries': len(ctx.captured_queries),
+                'failed': result['failed'],
+            })
+    return results
+
+
+def seed_endpoint_fixtures(orders):
+    """
+    Isi database sampai `orders` order (tambahan saja, jadi ukuran berikutnya
+    memakai ulang data sebelumnya), dengan 1 product dan 1 invitation per 100 order.
+    """
+    from .models import Invitation, Order, Product
+
+    products = max(orders // 100, 10)
+    missing = products - Product.objects.count()
+    for offset in range(0, max(missing, 0), 5000):
+        Product.objects.bulk_create([
+            Product(name=f'Bench product {offset + i}', price=10 + (offset + i) % 500, stock=1000)
+            for i in range(min(5000, missing - offset))
+        ])
+
+    missing = orders // 100 - Invitation.objects.count()
+    if missing > 0:
+        Invitation.objects.bulk_create([
+            Invitation(email=f'bench{uuid.uuid4().hex[:12]}@example.com', role='staff') for _ in range(missing)
+        ])
+
+    product_ids = list(Product.objects.values_list('pk', flat=True))
+    missing = orders - Order.objects.count()
+    for offset in range(0, max(missing, 0), 5000):
+        Order.objects.bulk_create([
+            Order(
+                product_id=product_ids[(offset + i) % len(product_ids)], customer_name=f'Customer {offset + i}',
+                quantity=1, total_price=10,
+            )
+            for i in range(min(5000, missing - offset))
+        ])
+
+
+@scenario('endpoints')
+def endpoints(options):
+    """
+    Latency & throughput endpoint utama per role lewat client in-process
+    (seluruh stack: middleware, auth, permission, serializer). `sizes`
+    adalah jumlah order di fixture. Login di-hash PBKDF2, jadi iterasinya
+    dibatasi sepersepuluh. Throttle dimatikan: yang diukur biaya endpoint,
+    bukan 429 (lihat skenario login_flood).
+    """
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    from .models import User
+    from .serializers import CustomTokenObtainPairSerializer
+
+    results = []
+    for size in options['sizes']:
+        seed_endpoint_fixtures(size)
+        for role in ('admin', 'manager', 'staff'):
+            user = User.objects.filter(role=role).first()
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+            anonymous = APIClient()
+
+            requests = [
+                ('POST /api/login', max(options['iterations'] // 10, 1), lambda: anonymous.post(
+                    '/api/login', {'username': user.username, 'password': 'password123'}, format='json')),
+                ('POST /api/token/refresh', options['iterations'], lambda: anonymous.post(
+                    '/api/token/refresh', {'refresh': str(refresh)}, format='json')),
+                ('GET /api/products', options['iterations'], lambda: client.get('/api/products')),
+                ('GET /api/orders', options['iterations'], lambda: client.get('/api/orders')),
+                ('GET /api/invitations', options['iterations'], lambda: client.get('/api/invitations')),
+            ]
+            with override_settings(THROTTLE_RATES={}):
+                for name, iterations, send in requests:
+                    status = send().status_code
+                    results.append({'name': name, 'role': role, 'orders': size, 'status': status, **measure(send, iterations)})
+    return results
+
+
+@scenario('login_flood')
+def login_flood(options):
+    """
+    Latency user sah (GET /api/products + /api/orders dari IP sendiri)
+    selama flood POST /api/login (username acak, password salah) dari satu
+    IP dengan laju tetap FLOOD_RATE request/detik: tanpa flood, flood dengan
+    throttle, dan flood tanpa throttle (setiap percobaan di-hash).
+
+    Pengukuran dimulai setelah flood mengirim FLOOD_WARMUP request, jadi
+    bucket throttle sudah habis. `iterations` request user sah per variasi.
+    """
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    from .models import User
+    from .serializers import CustomTokenObtainPairSerializer
+    from .throttling import get_throttle_cache
+
+    user = User.objects.filter(role='admin').first()
+    access = CustomTokenObtainPairSerializer.get_token(user).access_token
+    seed_endpoint_fixtures(min(options['sizes']))
+    variants = {'no_flood': (False, None), 'throttled': (True, None), 'unthrottled': (True, {})}
+
+    results = []
+    for name, (flooding, rates) in variants.items():
+        with override_settings(**({} if rates is None else {'THROTTLE_RATES': rates})):
+            get_throttle_cache().clear()
+            stop = threading.Event()
+            counts = {'sent': 0, 'rejected': 0}
+            lock = threading.Lock()
+
+            def flood():
+                client = APIClient(REMOTE_ADDR='203.0.113.66')
+                interval = FLOOD_THREADS / FLOOD_RATE
+                next_at = time.perf_counter()
+                try:
+                    while not stop.is_set():
+                        response = client.post('/api/login', {
+                            'username': f'guess{uuid.uuid4().hex[:8]}', 'password': 'wrong',
+                        }, format='json')
+                        with lock:
+                            counts['sent'] += 1
+                            counts['rejected'] += response.status_code == 429
+                        # laju tetap (bukan secepat mungkin), seperti traffic dari luar;
+                        # request yang lambat tidak "dibayar" dengan burst sesudahnya
+                        next_at = max(next_at + interval, time.perf_counter())
+                        stop.wait(next_at - time.perf_counter())
+                finally:
+                    connection.close()
+
+            legit = APIClient(REMOTE_ADDR='198.51.100.7')
+            legit.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+            for path in READ_PATHS:
+                legit.get(path)  # warm up
+
+            workers = [threading.Thread(target=flood) for _ in range(FLOOD_THREADS if flooding else 0)]
+            for worker in workers:
+                worker.start()
+            while workers and counts['sent'] < FLOOD_WARMUP:
+                time.sleep(0.05)
+            with lock:
+                sent_before, rejected_before = counts['sent'], counts['rejected']
+
+            latencies, statuses = [], set()
+            start = time.perf_counter()
+            for i in range(options['iterations']):
+                call_start = time.perf_counter()
+                statuses.add(legit.get(READ_PATHS[i % len(READ_PATHS)]).status_code)
+                latencies.append(time.perf_counter() - call_start)
+            elapsed = time.perf_counter() - start
+            with lock:
+                sent, rejected = counts['sent'] - sent_before, counts['rejected'] - rejected_before
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+            results.append({
+                'name': f'login_flood[{name}]', 'threads': len(workers), **latency_stats(latencies, elapsed),
+                'legit_statuses': sorted(statuses),
+                # flood selama pengukuran saja
+                'flood_per_sec': round(sent / elapsed, 1), 'flood_rejected': rejected,
+            })
+    return results
+
+
+READ_PATHS = ('/api/products', '/api/orders')
+
+
+def wsgi_reads(headers, concurrency, per_worker):
+    """Client sync (handler WSGI), satu thread per koneksi."""
+    from django.test import Client
+
+    latencies = []
+    barrier = threading.Barrier(concurrency)
+
+    def worker():
+        client = Client(headers=headers)
+        local = []
+        barrier.wait()
+        try:
+            for i in range(per_worker):
+                start = time.perf_counter()
+                client.get(READ_PATHS[i % len(READ_PATHS)])
+                local.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+        latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def asgi_reads(headers, concurrency, per_worker):
+    """AsyncClient (handler ASGI, view async dari backend.asgi_urls), satu coroutine per koneksi."""
+    import asyncio
+
+    from django.test import AsyncClient
+    from django.test.utils import override_settings
+
+    latencies = []
+
+    async def worker(client):
+        for i in range(per_worker):
+            start = time.perf_counter()
+            await client.get(READ_PATHS[i % len(READ_PATHS)])
+            latencies.append(time.perf_counter() - start)
+
+    async def run():
+        clients = [AsyncClient(headers=headers) for _ in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for client in clients))
+        return time.perf_counter() - start
+
+    with override_settings(ROOT_URLCONF='backend.asgi_urls'):
+        elapsed = asyncio.run(run())
+    return latencies, elapsed
+
+
+@scenario('asgi_reads')
+def asgi_reads_scenario(options):
+    """
+    Throughput GET /api/products + /api/orders (admin) dengan N koneksi
+    bersamaan: thread + handler WSGI vs coroutine + handler ASGI.
+    In-process, tanpa server HTTP; `iterations` request per tingkat konkurensi.
+    """
+    from .models import User
+    from .serializers import CustomTokenObtainPairSerializer
+
+    user = User.objects.filter(role='admin').first()
+    headers = {'Authorization': f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'}
+    runners = {'wsgi': wsgi_reads, 'asgi': asgi_reads}
+
+    results = []
+    for size in options['sizes']:
+        seed_endpoint_fixtures(size)
+        for concurrency in (1, 10, 50):
+            per_worker = max(options['iterations'] // concurrency, 1)
+            for name, run in runners.items():
+                run(headers, 1, len(READ_PATHS))  # warm up (cache katalog, state ETag)
+                latencies, elapsed = run(headers, concurrency, per_worker)
+                results.append({
+                    'name': f'reads[{name}]', 'orders': size, 'concurrency': concurrency,
+                    **latency_stats(latencies, elapsed),
+                })
+    return results
+
+
+@scenario('list_rows')
+def list_rows(options):
+    """
+    CPU (time.process_time) untuk membaca + mengubah + meng-encode `size`
+    row list products / orders: serializer + JSONRenderer DRF vs jalur
+    cepat (.values() + fungsi row + FastJSONRenderer). Dinormalisasi per
+    10k row; hasil `fast` juga mencatat CPU yang dihemat.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from .fastpath import FastJSONRenderer, row_plan
+    from .models import Order, Product
+    from .serializers import OrderSerializer, ProductSerializer
+
+    resources = {
+        'products': (Product.objects.all(), ProductSerializer),
+        'orders': (Order.objects.select_related('product'), OrderSerializer),
+    }
+
+    results = []
+    for size in options['sizes']:
+        seed_endpoint_fixtures(size)
+        for resource, (queryset, serializer_class) in resources.items():
+            queryset = queryset.order_by('-created_at', '-id')[:size]
+            plan = row_plan(serializer_class())
+            variants = {
+                'serializer': lambda: JSONRenderer().render(serializer_class(list(queryset), many=True).data),
+                'fast': lambda: FastJSONRenderer().render(plan.build(queryset.values(*plan.lookups))),
+            }
+            cpu = {}
+            for name, render in variants.items():
+                render()  # warm up
+                rows = len(queryset)
+                repeats = max(options['iterations'] // 100, 1)
+                start = time.process_time()
+                for _ in range(repeats):
+                    render()
+                cpu[name] = (time.process_time() - start) / repeats
+                result = {
+                    'name': f'list_rows[{resource}:{name}]', 'rows': rows,
+                    'rows_per_sec': round(rows / cpu[name], 1) if cpu[name] else None,
+                    'cpu_ms_per_10k_rows': round(cpu[name] / rows * 10000 * 1000, 1),
+                }
+                if name == 'fast':
+                    result['cpu_saved_ms_per_10k_rows'] = round((cpu['serializer'] - cpu['fast']) / rows * 10000 * 1000, 1)
+                results.append(result)
+    return results
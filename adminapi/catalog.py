@@ -0,0 +1,158 @@
+"""
+Cache payload list/detail product.
+
+Key berisi versi katalog + query params, jadi invalidasi cukup dengan
+mengganti versi (bump_catalog_version); entry lama dibiarkan expire
+sendiri. Backend mengikuti PRODUCT_CACHE['ALIAS'] di settings.CACHES.
+
+Versi di-bump saat product disimpan / dihapus / di-import, tapi tidak
+saat stock berubah karena order (inventory.py), supaya cache tetap
+berguna di bawah beban order. Versinya sendiri expire setelah
+PRODUCT_CACHE['TIMEOUT'], jadi stock paling lama basi selama itu; ETag
+product ikut versi ini (ProductViewSet) supaya client yang revalidate
+juga mendapat body baru.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def get_catalog_cache():
+    return caches[settings.PRODUCT_CACHE['ALIAS']]
+
+
+def catalog_version():
+    cache = get_catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, settings.PRODUCT_CACHE['TIMEOUT'])
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+async def acatalog_version():
+    cache = get_catalog_cache()
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, uuid.uuid4().hex, settings.PRODUCT_CACHE['TIMEOUT'])
+        version = await cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    get_catalog_cache().set(CATALOG_VERSION_KEY, uuid.uuid4().hex, settings.PRODUCT_CACHE['TIMEOUT'])
+
+
+def invalidate_catalog():
+    """
+    Dipanggil setiap data product berubah (bukan stock dari order). Versi di-bump lagi
+    setelah commit supaya request lain yang mengisi cache dengan data
+    sebelum commit tidak meninggalkan entry basi.
+    """
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+def request_fingerprint(request):
+    # urutan query params tidak berpengaruh; host ikut karena link next/previous absolut
+    params = urlencode(sorted((key, sorted(values)) for key, values in request.query_params.lists()), doseq=True)
+    return f'{request.get_host()}{request.path}?{params}'
+
+
+def catalog_cache_key(request, kind, version=None):
+    digest = hashlib.md5(request_fingerprint(request).encode('utf-8')).hexdigest()
+    return f'catalog:{version or catalog_version()}:{kind}:{digest}'
+
+
+async def acatalog_cache_key(request, kind):
+    return catalog_cache_key(request, kind, await acatalog_version())
+
+
+def get_or_compute(key, compute):
+    """
+    Ambil dari cache, atau hitung dan simpan.
+
+    Stampede protection: hanya request yang mendapat lock (cache.add) yang
+    menghitung; yang lain menunggu entry terisi sampai LOCK_WAIT detik,
+    lalu menghitung sendiri (tanpa menyimpan) kalau pemegang lock terlalu lama.
+    """
+    cache = get_catalog_cache()
+    config = settings.PRODUCT_CACHE
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, config['LOCK_TIMEOUT']):
+        try:
+            data = compute()
+            cache.set(key, data, config['TIMEOUT'])
+        finally:
+            cache.delete(lock_key)
+        return data
+
+    deadline = time.monotonic() + config['LOCK_WAIT']
+    while time.monotonic() < deadline:
+        time.sleep(0.01)
+        data = cache.get(key)
+        if data is not None:
+            return data
+    return compute()
+
+
+async def aget_or_compute(key, compute):
+    """Versi async get_or_compute; compute adalah coroutine function."""
+    cache = get_catalog_cache()
+    config = settings.PRODUCT_CACHE
+    data = await cache.aget(key)
+    if data is not None:
+        return data
+
+    lock_key = f'{key}:lock'
+    if await cache.aadd(lock_key, 1, config['LOCK_TIMEOUT']):
+        try:
+            data = await compute()
+            await cache.aset(key, data, config['TIMEOUT'])
+        finally:
+            await cache.adelete(lock_key)
+        return data
+
+    deadline = time.monotonic() + config['LOCK_WAIT']
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+        data = await cache.aget(key)
+        if data is not None:
+            return data
+    return await compute()
+
+
+class CatalogCacheMixin:
+    """List & detail dilayani dari cache katalog; permission tetap dicek per request."""
+
+    def list(self, request, *args, **kwargs):
+        data = get_or_compute(catalog_cache_key(request, 'list'), lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs).data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = get_or_compute(catalog_cache_key(request, 'detail'), lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs).data)
+        return Response(data)
+
+    async def alist(self, request, *args, **kwargs):
+        async def compute():
+            return (await super(CatalogCacheMixin, self).alist(request, *args, **kwargs)).data
+        return Response(await aget_or_compute(await acatalog_cache_key(request, 'list'), compute))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        async def compute():
+            return (await super(CatalogCacheMixin, self).aretrieve(request, *args, **kwargs)).data
+        return Response(await aget_or_compute(await acatalog_cache_key(request, 'detail'), compute))
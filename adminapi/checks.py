@@ -0,0 +1,24 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Versi permission, auth_version dan state ETag di-invalidasi lewat cache
+    'default'. Dengan locmem setiap worker punya cache sendiri, jadi perubahan
+    baru terlihat di worker lain setelah timeout-nya habis.
+    """
+    workers = int(os.getenv('WEB_CONCURRENCY', '1') or 1)
+    backend = settings.CACHES['default']['BACKEND']
+    if workers > 1 and backend == 'django.core.cache.backends.locmem.LocMemCache':
+        return [Warning(
+            f'WEB_CONCURRENCY={workers} with the per-process locmem cache: PermissionGrant changes reach '
+            f'other workers only after PERMISSION_CACHE_TIMEOUT ({settings.PERMISSION_CACHE_TIMEOUT}s) '
+            f'and revoked tokens stay valid there for AUTH_VERSION_CACHE_TIMEOUT.',
+            hint='Set CACHE_BACKEND / CACHE_LOCATION to a shared cache (Redis, Memcached).',
+            id='adminapi.W001',
+        )]
+    return []
@@ -0,0 +1,118 @@
+"""
+Conditional GET (ETag / Last-Modified -> 304) untuk viewset adminapi.
+
+Validator dihitung dari state per resource (jumlah row + MAX(updated_at)),
+bukan dari hash body, sehingga 304 dikirim sebelum query data dan
+serialisasi. State disimpan di cache dan dihapus oleh signal setiap
+row resource itu berubah; saat cache miss dihitung ulang dengan satu
+query aggregate (memakai index updated_at).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .catalog import request_fingerprint
+
+
+def resource_state_key(resource):
+    return f'resource_state:{resource}'
+
+
+def get_resource_state(resource, queryset):
+    """(count, last_modified) untuk seluruh queryset resource, dari cache kalau ada."""
+    key = resource_state_key(resource)
+    state = cache.get(key)
+    if state is None:
+        aggregate = queryset.order_by().aggregate(count=Count('pk'), last_modified=Max('updated_at'))
+        state = (aggregate['count'], aggregate['last_modified'])
+        cache.set(key, state, settings.RESOURCE_STATE_CACHE_TIMEOUT)
+    return state
+
+
+async def aget_resource_state(resource, queryset):
+    key = resource_state_key(resource)
+    state = await cache.aget(key)
+    if state is None:
+        aggregate = await queryset.order_by().aaggregate(count=Count('pk'), last_modified=Max('updated_at'))
+        state = (aggregate['count'], aggregate['last_modified'])
+        await cache.aset(key, state, settings.RESOURCE_STATE_CACHE_TIMEOUT)
+    return state
+
+
+def invalidate_resource_state(resource):
+    # dihapus lagi setelah commit, sama seperti invalidate_catalog
+    key = resource_state_key(resource)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class ConditionalGetMixin:
+    """
+    Tambahkan ETag & Last-Modified ke list dan retrieve, dan jawab 304 kalau
+    If-None-Match / If-Modified-Since masih cocok. Viewset harus punya
+    `permission_resource` dan model dengan kolom updated_at.
+
+    ETag detail juga memakai state resource: lebih kasar dari per-object,
+    tapi tidak perlu query sama sekali saat cache state hangat.
+    """
+
+    def get_validator_version(self):
+        """Bagian tambahan ETag, mis. versi cache katalog (lihat ProductViewSet)."""
+        return ''
+
+    async def aget_validator_version(self):
+        return self.get_validator_version()
+
+    def make_validators(self, request, state, version=''):
+        count, last_modified = state
+        raw = f'{self.permission_resource}:{count}:{last_modified.isoformat() if last_modified else ""}:{version}:{request_fingerprint(request)}'
+        etag = quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+        # Last-Modified hanya presisi detik
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def get_validators(self, request):
+        state = get_resource_state(self.permission_resource, self.get_queryset())
+        return self.make_validators(request, state, self.get_validator_version())
+
+    async def aget_validators(self, request):
+        state = await aget_resource_state(self.permission_resource, self.get_queryset())
+        return self.make_validators(request, state, await self.aget_validator_version())
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def conditional(self, request, handler, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(handler(request, *args, **kwargs), etag, last_modified)
+
+    async def aconditional(self, request, handler, *args, **kwargs):
+        etag, last_modified = await self.aget_validators(request)
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(await handler(request, *args, **kwargs), etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, super().retrieve, *args, **kwargs)
+
+    # versi async (lihat adminapi/async_views.py)
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional(request, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional(request, super().aretrieve, *args, **kwargs)
@@ -0,0 +1,260 @@
+"""
+Jalur cepat list endpoint (GET /api/products, /api/orders) tanpa serializer.
+
+Yang mahal di list bukan SQL tapi to_representation DRF per field per row.
+FastListMixin membaca row lewat .values() (relasi di-join di SQL), lalu
+mengubahnya jadi dict dengan fungsi yang di-compile sekali per kombinasi
+field (hasil sparse fieldset), dari field serializer itu sendiri:
+
+    {'id': r['id'], 'price': float(r['price']), 'product': {'id': r['product__id'], ...}}
+
+Output-nya harus identik byte per byte dengan serializer (dicek golden test
+di tests.FastPathTests). Field yang konversinya tidak dikenal di sini membuat
+view kembali ke jalur serializer biasa, jadi menambah field ke serializer
+tidak pernah mengubah output.
+
+FastJSONRenderer meng-encode dengan orjson kalau ter-install (opsional,
+`pip install orjson`), dengan hasil sama dengan JSONRenderer DRF.
+"""
+import functools
+import time
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import record_serializer_time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+
+def _datetime(value, tz):
+    # sama dengan DateTimeField.to_representation (format ISO 8601, Z untuk UTC)
+    if tz is not None:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _decimal_string(value):
+    return f'{value:f}'
+
+
+# nama converter -> fungsi; dipakai sebagai globals fungsi hasil compile
+CONVERTERS = {
+    '_datetime': _datetime,
+    '_decimal_string': _decimal_string,
+    '_float': float,
+}
+
+
+# field serializer yang to_representation-nya tidak mengubah nilai dari kolom ini
+IDENTITY_FIELDS = (
+    (serializers.BooleanField, {'BooleanField'}),
+    (serializers.IntegerField, {
+        'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+        'PositiveIntegerField', 'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+    }),
+    (serializers.CharField, {'CharField', 'TextField'}),
+)
+
+
+def field_converter(field, model_field):
+    """
+    Nama converter untuk satu field serializer: '' kalau nilai dari DB
+    sudah sama dengan to_representation, None kalau tidak didukung.
+    """
+    field_class = type(field)
+    for base, internal_types in IDENTITY_FIELDS:
+        if isinstance(field, base) and field_class.to_representation is base.to_representation:
+            return '' if model_field.get_internal_type() in internal_types else None
+    if field_class is serializers.ChoiceField and all(isinstance(key, str) for key in field.choices):
+        return ''
+    if field_class is serializers.DecimalField:
+        if field.localize or field.normalize_output or field.decimal_places != getattr(model_field, 'decimal_places', None):
+            return None
+        # kolom DECIMAL sudah ber-scale decimal_places, quantize tidak mengubah apa-apa;
+        # coerce_to_string=False -> Decimal, yang di-encode JSONEncoder DRF sebagai float
+        coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        return '_decimal_string' if coerce else '_float'
+    if field_class is serializers.DateTimeField:
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, 'timezone'):
+            return None
+        return '_datetime'
+    return None
+
+
+def row_spec(serializer, prefix=''):
+    """
+    Deskripsi hashable field yang dirender serializer:
+    ((nama, lookup, converter, nullable, nested spec atau None), ...).
+    None kalau ada field yang tidak bisa dikonversi tanpa serializer.
+    """
+    model = serializer.Meta.model
+    spec = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        lookup = f'{prefix}{field.source}'
+        if isinstance(field, serializers.Serializer):
+            if not model_field.many_to_one:
+                return None
+            nested = row_spec(field, f'{lookup}__')
+            if nested is None:
+                return None
+            spec.append((name, lookup, '', model_field.null, nested))
+            continue
+        if model_field.is_relation:
+            return None
+        converter = field_converter(field, model_field)
+        if converter is None:
+            return None
+        spec.append((name, lookup, converter, model_field.null, None))
+    return tuple(spec)
+
+
+def spec_lookups(spec):
+    lookups = []
+    for _, lookup, _, nullable, nested in spec:
+        if nested is None:
+            lookups.append(lookup)
+        else:
+            if nullable:
+                # FK-nya sendiri, untuk tahu relasinya null
+                lookups.append(lookup)
+            lookups.extend(spec_lookups(nested))
+    return lookups
+
+
+def spec_source(spec):
+    items = []
+    for name, lookup, converter, nullable, nested in spec:
+        if nested is not None:
+            value = spec_source(nested)
+        elif converter == '_datetime':
+            value = f'_datetime(r[{lookup!r}], tz)'
+        elif converter:
+            value = f'{converter}(r[{lookup!r}])'
+        else:
+            value = f'r[{lookup!r}]'
+        if nullable and (converter or nested is not None):
+            # serializer merender None untuk nilai / relasi kosong
+            value = f'(None if r[{lookup!r}] is None else {value})'
+        items.append(f'{name!r}: {value}')
+    return '{' + ', '.join(items) + '}'
+
+
+@functools.lru_cache(maxsize=256)
+def compile_row(spec):
+    """Fungsi row(r, tz) -> dict untuk spec ini (di-cache per kombinasi field)."""
+    namespace = dict(CONVERTERS)
+    exec(f'def row(r, tz):\n    return {spec_source(spec)}\n', namespace)
+    return namespace['row']
+
+
+class RowPlan:
+    __slots__ = ('lookups', 'row')
+
+    def __init__(self, spec):
+        self.lookups = spec_lookups(spec)
+        self.row = compile_row(spec)
+
+    def build(self, rows):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        row = self.row
+        start = time.perf_counter()
+        try:
+            return [row(r, tz) for r in rows]
+        finally:
+            # dicatat sebagai waktu serializer (Server-Timing `ser`)
+            record_serializer_time(time.perf_counter() - start)
+
+
+def row_plan(serializer):
+    spec = row_spec(serializer)
+    return None if spec is None else RowPlan(spec)
+
+
+class FastListMixin:
+    """
+    list / alist dari .values() + fungsi row hasil compile (lihat modul ini)
+    kalau settings.FAST_READ_PATH aktif dan semua field serializer didukung.
+    Taruh setelah mixin cache/ETag dan sebelum AsyncReadMixin, supaya
+    menggantikan list ModelViewSet dan alist AsyncReadMixin.
+    """
+
+    def get_row_plan(self):
+        if not settings.FAST_READ_PATH:
+            return None
+        # sparse fieldset (?fields= / ?exclude=) sudah diterapkan di sini, termasuk error 400-nya
+        return row_plan(self.get_serializer())
+
+    def get_values_queryset(self, plan):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookups = list(plan.lookups)
+        if self.paginator is not None:
+            # posisi cursor diambil dari kolom ordering pertama
+            ordering = self.paginator.get_ordering(self.request, queryset, self)
+            lookups.append(ordering[0].lstrip('-'))
+        return queryset.values(*dict.fromkeys(lookups))
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_row_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_values_queryset(plan)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.build(page))
+        return Response(plan.build(queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        plan = self.get_row_plan()
+        if plan is None:
+            return await super().alist(request, *args, **kwargs)
+        queryset = self.get_values_queryset(plan)
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return self.get_paginated_response(plan.build(page))
+        return Response(plan.build([row async for row in queryset.aiterator()]))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer dengan orjson. Tipe yang tidak dikenal orjson (datetime,
+    Decimal, lazy string, ...) diteruskan ke JSONEncoder DRF, dan apa pun
+    yang ditolak orjson (int > 64 bit, key bukan str) kembali ke json
+    bawaan, jadi hasilnya sama dengan JSONRenderer.
+
+    Beda yang tersisa hanya float >= 1e16 atau < 1e-4 (orjson menulis
+    1e16, json 1e+16) dan NaN; float di API ini berasal dari
+    DecimalField(max_digits=10, decimal_places=2), jadi tidak pernah ke sana.
+    """
+    # default JSONEncoder DRF, tanpa bagian json.JSONEncoder
+    encoder_default = staticmethod(JSONRenderer.encoder_class().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not (self.compact and not self.ensure_ascii):
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # sama dengan JSONRenderer: \u2028 dan \u2029 selalu di-escape
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """
+    Filter sederhana dari query params, didefinisikan per view lewat
+    `query_filters`, mis. {'status': 'status', 'created_after': 'created_at__gte'}.
+
+    Nilai di-parse dengan field model-nya (to_python); nilai invalid -> 400.
+    Hanya lookup yang didukung index yang sebaiknya didaftarkan di sini.
+    """
+
+    BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+    def parse_value(self, model, lookup, value):
+        field = model._meta.get_field(lookup.split('__')[0])
+        if field.is_relation:
+            field = field.target_field
+        if isinstance(field, models.BooleanField):
+            if value.lower() not in self.BOOLEAN_VALUES:
+                raise DjangoValidationError('Must be true or false.')
+            return self.BOOLEAN_VALUES[value.lower()]
+        value = field.to_python(value)
+        if isinstance(value, datetime) and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        errors = {}
+        for param, lookup in getattr(view, 'query_filters', {}).items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                filters[lookup] = self.parse_value(queryset.model, lookup, value)
+            except DjangoValidationError as e:
+                errors[param] = e.messages
+        if errors:
+            raise serializers.ValidationError(errors)
+        return queryset.filter(**filters) if filters else queryset
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """
+    ?ordering= yang hanya menerima kolom di `ordering_fields` view (semuanya
+    ber-index). Field lain -> 400, bukan diabaikan diam-diam. pk ditambahkan
+    sebagai tie-breaker supaya urutan cursor pagination stabil.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return self.get_default_ordering(view)
+
+        terms = [term.strip() for term in params.split(',') if term.strip()]
+        valid = self.remove_invalid_fields(queryset, terms, view, request)
+        invalid = [term for term in terms if term not in valid]
+        if invalid:
+            raise serializers.ValidationError({self.ordering_param: [f'Cannot order by: {", ".join(invalid)}']})
+
+        if not any(term.lstrip('-') in ('id', 'pk') for term in valid):
+            valid.append('-id' if valid[-1].startswith('-') else 'id')
+        return valid
@@ -0,0 +1,140 @@
+"""
+Import product dari CSV / NDJSON (POST /api/products/import dan
+`manage.py import_products`).
+
+File dibaca sebagai stream dan diproses per chunk: validasi, lalu satu
+bulk_create(update_conflicts=True) per chunk dengan sku sebagai natural
+key. Memory dibatasi oleh ukuran chunk (dan MAX_ERRORS), bukan ukuran file.
+Row yang invalid dilaporkan per baris tanpa menggagalkan row lain.
+"""
+import csv
+import io
+import json
+
+from django.db import DatabaseError, connection, transaction
+
+from .catalog import invalidate_catalog
+from .conditional import invalidate_resource_state
+from .models import Product
+from .serializers import ProductImportSerializer
+
+
+FORMATS = {
+    '.csv': 'csv', 'text/csv': 'csv',
+    '.ndjson': 'ndjson', '.jsonl': 'ndjson', 'application/x-ndjson': 'ndjson',
+}
+UPDATE_FIELDS = ['name', 'price', 'stock', 'status', 'updated_at']
+# error yang disimpan di laporan; sisanya hanya dihitung
+MAX_ERRORS = 1000
+
+
+def detect_format(name='', content_type=''):
+    for key in (content_type.split(';')[0].strip(), '.' + name.rsplit('.', 1)[-1].lower()):
+        if key in FORMATS:
+            return FORMATS[key]
+    return None
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (nomor baris, dict row atau None kalau tidak bisa di-parse).
+    stream adalah file teks; dibaca baris per baris.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # kolom kosong dianggap tidak diisi, supaya default model berlaku
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ('', None)}
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else None
+
+
+def upsert_products(products):
+    """Satu INSERT ... ON CONFLICT/ON DUPLICATE KEY UPDATE untuk satu chunk."""
+    kwargs = {'update_conflicts': True, 'update_fields': UPDATE_FIELDS}
+    # MySQL tidak mendukung target konflik (memakai unique key mana pun yang bentrok)
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['sku']
+    Product.objects.bulk_create(products, **kwargs)
+
+
+class ProductImporter:
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def run(self, rows):
+        chunk = []
+        try:
+            for line, row in rows:
+                chunk.append((line, row))
+                if len(chunk) >= self.chunk_size:
+                    self.process_chunk(chunk)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # sisa file tidak bisa dibaca; chunk yang sudah terkumpul tetap diproses
+            self.error(None, {'non_field_errors': [f'Unreadable file: {e}']})
+        if chunk:
+            self.process_chunk(chunk)
+
+        if self.created or self.updated:
+            # bulk_create tidak memicu signal post_save
+            invalidate_catalog()
+            invalidate_resource_state('products')
+        return self.report()
+
+    def process_chunk(self, chunk):
+        products = {}
+        lines = {}
+        for line, row in chunk:
+            if row is None:
+                self.error(line, {'non_field_errors': ['Row could not be parsed']})
+                continue
+            serializer = ProductImportSerializer(data=row)
+            if not serializer.is_valid():
+                self.error(line, serializer.errors)
+                continue
+            product = Product(**serializer.validated_data)
+            # sku dobel dalam satu chunk: row terakhir yang dipakai
+            products[product.sku] = product
+            lines[product.sku] = line
+        if not products:
+            return
+
+        existing = set(Product.objects.filter(sku__in=list(products)).values_list('sku', flat=True))
+        try:
+            with transaction.atomic():
+                upsert_products(list(products.values()))
+        except DatabaseError as e:
+            for sku in products:
+                self.error(lines[sku], {'non_field_errors': [str(e)]})
+            return
+        self.updated += len(existing)
+        self.created += len(products) - len(existing)
+
+    def report(self):
+        return {'created': self.created, 'updated': self.updated, 'failed': self.failed, 'errors': self.errors}
+
+
+def import_products(stream, fmt, chunk_size=1000):
+    """stream: file teks atau biner (dibungkus TextIOWrapper)."""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    return ProductImporter(chunk_size).run(read_rows(stream, fmt))
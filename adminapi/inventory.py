@@ -0,0 +1,49 @@
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .conditional import invalidate_resource_state
+from .models import Product
+
+
+class OutOfStock(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Insufficient stock'
+    default_code = 'out_of_stock'
+
+
+def stock_changed():
+    # update() tidak memicu signal post_save. Cache katalog sengaja tidak
+    # di-invalidate (setiap order akan membuangnya): stock di list/detail
+    # product boleh basi paling lama PRODUCT_CACHE_TIMEOUT, lihat catalog.py
+    invalidate_resource_state('products')
+
+
+def try_reserve_stock(product_id, quantity):
+    """
+    Kurangi stock secara atomik dengan satu UPDATE bersyarat:
+    UPDATE product SET stock = stock - q WHERE id = ? AND stock >= q.
+
+    Tidak perlu SELECT ... FOR UPDATE, tapi di dalam transaction.atomic()
+    InnoDB memegang lock baris product sampai commit, dan order lain untuk
+    product yang sama menunggu selama itu. Karena itu panggil sebagai
+    statement terakhir sebelum commit (setelah INSERT / DELETE order).
+    Return False kalau stock tidak cukup.
+    """
+    if quantity <= 0:
+        return True
+    if Product.objects.filter(pk=product_id, stock__gte=quantity).update(stock=F('stock') - quantity, updated_at=timezone.now()) == 1:
+        stock_changed()
+        return True
+    return False
+
+
+def reserve_stock(product_id, quantity):
+    if not try_reserve_stock(product_id, quantity):
+        raise OutOfStock()
+
+
+def release_stock(product_id, quantity):
+    if quantity > 0 and Product.objects.filter(pk=product_id).update(stock=F('stock') + quantity, updated_at=timezone.now()):
+        stock_changed()
@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from adminapi.benchmarks import SCENARIOS, compare_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Jalankan skenario benchmark di database test sementara "
+        "(dibuat dari DATABASES['default'], dihapus setelah selesai)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Default semua: {', '.join(SCENARIOS)}")
+        parser.add_argument('--sizes', default='1000,10000,100000', help='Ukuran tabel, dipisah koma')
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--output', help='Tulis hasil ke file JSON')
+        parser.add_argument('--baseline', help='File JSON hasil run sebelumnya; gagal kalau ada regresi')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Toleransi regresi relatif (default 0.2 = 20%%)')
+        parser.add_argument('--keepdb', action='store_true', help='Pakai ulang database test')
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario: {', '.join(sorted(unknown))}")
+        options['sizes'] = [int(size) for size in options['sizes'].split(',')]
+        baseline = None
+        if options['baseline']:
+            # dibaca sebelum benchmark supaya file yang salah tidak membuang waktu satu run
+            with open(options['baseline']) as fp:
+                baseline = json.load(fp)
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            results = []
+            for name in names:
+                for result in SCENARIOS[name](options):
+                    results.append(result)
+                    self.stdout.write(json.dumps(result))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                json.dump(results, fp, indent=2)
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline, options['tolerance'])
+            for message in regressions:
+                self.stderr.write(f'REGRESSION {message}')
+            if regressions:
+                raise CommandError(f'{len(regressions)} metric(s) regressed beyond {options["tolerance"]:.0%} of baseline')
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
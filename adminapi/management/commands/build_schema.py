@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from adminapi.schema import SCHEMA_FORMATS, generate_schema, render_schema, write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Tulis skema OpenAPI (openapi.yaml + openapi.json) ke OPENAPI_SCHEMA_DIR, "
+        "yang dikirim apa adanya oleh /api/schema. Jalankan saat build / deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Default: settings.OPENAPI_SCHEMA_DIR')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Jangan menulis; exit non-zero kalau file belum ada atau berbeda dengan kode (untuk CI)',
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['output_dir'] or settings.OPENAPI_SCHEMA_DIR)
+
+        if options['check']:
+            schema = generate_schema()
+            stale = []
+            for fmt, (filename, _) in SCHEMA_FORMATS.items():
+                path = directory / filename
+                if not path.exists() or path.read_bytes() != render_schema(schema, fmt):
+                    stale.append(str(path))
+            if stale:
+                raise CommandError(f"Schema out of date, run build_schema: {', '.join(stale)}")
+            self.stdout.write("Schema up to date")
+            return
+
+        for path in write_schema(directory):
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminapi.imports import detect_format, import_products
+
+
+class Command(BaseCommand):
+    help = "Import / upsert product dari file CSV atau NDJSON (sku sebagai natural key)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'ndjson'], help='Default dari ekstensi file')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fmt = options['file_format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Cannot detect format, use --format csv|ndjson")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = import_products(stream, fmt, options['chunk_size'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(f"Created {result['created']}, updated {result['updated']}, failed {result['failed']}")
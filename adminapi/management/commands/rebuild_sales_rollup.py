@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminapi.reports import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Bangun ulang rollup DailyProductSales dari tabel Order, per batch hari. "
+        "Dipakai untuk backfill pertama kali atau memperbaiki drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Tanggal awal (YYYY-MM-DD), default order pertama')
+        parser.add_argument('--end', help='Tanggal akhir (YYYY-MM-DD), default order terakhir')
+        parser.add_argument('--days-per-batch', type=int, default=31)
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if options['days_per_batch'] < 1:
+            raise CommandError("--days-per-batch must be at least 1")
+
+        written = rebuild_sales(start, end, options['days_per_batch'])
+        self.stdout.write(f"Wrote {written} daily sales rows")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from adminapi.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = "Worker pengirim email dari EmailOutbox (batch, thread pool, retry dengan backoff)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=4, help='Jumlah thread (satu koneksi SMTP per thread)')
+        parser.add_argument('--interval', type=float, default=5, help='Jeda (detik) saat outbox kosong')
+        parser.add_argument('--once', action='store_true', help='Proses sampai outbox kosong lalu berhenti')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent, failed = process_outbox(options['batch_size'], options['workers'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,60 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from adminapi.conditional import invalidate_resource_state
+from adminapi.models import EmailOutbox, Invitation
+
+
+class Command(BaseCommand):
+    help = (
+        "Hapus invitation yang sudah lewat expires_at (dipakai / revoked maupun tidak), "
+        "per batch supaya tidak ada lock panjang. Opsional arsipkan dulu ke file NDJSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0, help='Jeda (detik) antar batch')
+        parser.add_argument('--older-than-days', type=int, default=0, help='Hanya yang expired lebih dari N hari lalu')
+        parser.add_argument('--archive', help='Tambahkan row yang dihapus ke file NDJSON ini')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        archive = open(options['archive'], 'a') if options['archive'] else None
+        total = 0
+        try:
+            # dua pass supaya keduanya memakai index (is_used, expires_at); __in karena
+            # is_used=False dirender Django sebagai `NOT is_used` yang tidak bisa pakai index
+            for is_used in (False, True):
+                expired = Invitation.objects.filter(is_used__in=[is_used], expires_at__lte=cutoff).order_by()
+                while True:
+                    ids = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+                    if not ids:
+                        break
+
+                    with transaction.atomic():
+                        if archive:
+                            for row in Invitation.objects.filter(pk__in=ids).values():
+                                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                        EmailOutbox.objects.filter(invitation_id__in=ids).update(invitation=None)
+                        # satu DELETE ... WHERE id IN (...): .delete() harus load setiap row
+                        # untuk post_delete (reset_resource_state), state cukup direset sekali
+                        deleted = Invitation.objects.filter(pk__in=ids)
+                        deleted._raw_delete(deleted.db)
+                        invalidate_resource_state('invitations')
+                    if archive:
+                        archive.flush()
+
+                    total += len(ids)
+                    if options['sleep']:
+                        time.sleep(options['sleep'])
+        finally:
+            if archive:
+                archive.close()
+
+        self.stdout.write(f"Swept {total} expired invitations")
@@ -0,0 +1,258 @@
+"""
+Instrumentasi per request: latency, jumlah & waktu SQL, waktu serializer,
+ukuran response. Dicatat per (view, method, status) ke histogram in-process.
+
+Setiap thread menulis ke store miliknya sendiri (tanpa lock); lock hanya
+dipakai sekali saat thread pertama kali mendaftarkan store-nya. Store
+baru digabung saat /api/metrics di-scrape.
+
+Request yang sedang diukur disimpan di ContextVar, bukan thread-local:
+di ASGI banyak request berbagi satu thread event loop, dan query async
+ORM dijalankan di thread lain (sync_to_async menyalin context-nya).
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.serializers import ListSerializer
+
+from .mysql_pool.pool import render_pool_metrics
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# (nama metric, help, buckets, atribut RequestMetrics)
+HISTOGRAMS = (
+    ('adminapi_request_duration_seconds', 'Request latency.', DURATION_BUCKETS, 'duration'),
+    ('adminapi_request_db_queries', 'SQL queries per request.', QUERY_BUCKETS, 'queries'),
+    ('adminapi_request_db_seconds', 'Time spent in SQL per request.', DURATION_BUCKETS, 'db_time'),
+    ('adminapi_request_serializer_seconds', 'Time spent in serializers per request.', DURATION_BUCKETS, 'serializer_time'),
+    ('adminapi_response_size_bytes', 'Response body size (non-streaming responses).', SIZE_BUCKETS, 'size'),
+)
+
+_local = threading.local()
+_current = ContextVar('adminapi_request_metrics', default=None)
+_stores = []
+_stores_lock = threading.Lock()
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+
+class RequestMetrics:
+    __slots__ = ('start', 'duration', 'queries', 'db_time', 'serializer_time', 'size')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = 0
+        self.queries = 0
+        self.db_time = 0
+        self.serializer_time = 0
+        self.size = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def server_timing(self):
+        return (
+            f'app;dur={self.duration * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'ser;dur={self.serializer_time * 1000:.1f}'
+        )
+
+
+def thread_store():
+    store = getattr(_local, 'store', None)
+    if store is None:
+        store = _local.store = {}
+        with _stores_lock:
+            _stores.append(store)
+    return store
+
+
+def record(labels, metrics):
+    series = thread_store().get(labels)
+    if series is None:
+        series = thread_store()[labels] = [Histogram(buckets) for _, _, buckets, _ in HISTOGRAMS]
+    for histogram, (_, _, _, attr) in zip(series, HISTOGRAMS):
+        value = getattr(metrics, attr)
+        if value is not None:
+            histogram.observe(value)
+
+
+def record_serializer_time(seconds):
+    current = _current.get()
+    if current is not None:
+        current.serializer_time += seconds
+
+
+def count_query(execute, sql, params, many, context):
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    return current.execute_wrapper(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """
+    Receiver connection_created: count_query dipasang permanen di setiap
+    koneksi (di thread mana pun) dan hanya menghitung kalau ada request
+    yang sedang diukur di context-nya.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def collect():
+    """Gabungkan store semua thread: {labels: [Histogram, ...]}."""
+    merged = {}
+    with _stores_lock:
+        stores = list(_stores)
+    for store in stores:
+        for labels, series in list(store.items()):
+            target = merged.setdefault(labels, [Histogram(buckets) for _, _, buckets, _ in HISTOGRAMS])
+            for total, histogram in zip(target, series):
+                total.merge(histogram)
+    return merged
+
+
+def reset():
+    with _stores_lock:
+        for store in _stores:
+            store.clear()
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """Format text exposition Prometheus 0.0.4."""
+    merged = sorted(collect().items())
+    lines = []
+    for index, (name, help_text, buckets, _) in enumerate(HISTOGRAMS):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (view, method, status), series in merged:
+            histogram = series[index]
+            labels = f'view="{_label_value(view)}",method="{method}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum:g}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    lines.extend(render_pool_metrics())
+    return '\n'.join(lines) + '\n'
+
+
+class TimedSerializerMixin:
+    """
+    Waktu render `.data` serializer root dicatat ke request yang sedang
+    diukur (Server-Timing `ser`). Untuk many=True, ListSerializer-nya
+    juga diganti dengan versi yang diukur.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = cls.__dict__.get('Meta')
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        if self.parent is not None:
+            return super().data
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            record_serializer_time(time.perf_counter() - start)
+
+
+class TimedListSerializer(TimedSerializerMixin, ListSerializer):
+    pass
+
+
+class MetricsMiddleware:
+    """
+    Ukur setiap request (histogram /api/metrics) dan, kalau
+    SERVER_TIMING_HEADER aktif, tambahkan header Server-Timing. Query dihitung
+    lewat execute wrapper di koneksi (count_query), jadi tidak perlu DEBUG=True.
+    Untuk response streaming, query saat streaming tidak ikut terhitung.
+    Bisa sync dan async, supaya view async di ASGI tidak dibungkus sync_to_async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        metrics.duration = time.perf_counter() - metrics.start
+        if not response.streaming:
+            metrics.size = len(response.content)
+        if settings.SERVER_TIMING_HEADER:
+            # durasi DB / query count membocorkan detail internal (dan timing login)
+            response['Server-Timing'] = metrics.server_timing()
+
+        match = request.resolver_match
+        record((match.view_name if match else 'unmatched', request.method, response.status_code), metrics)
+        return response
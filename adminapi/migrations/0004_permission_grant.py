@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapi', '0003_user_auth_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PermissionGrant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=20)),
+                ('resource', models.CharField(max_length=50)),
+                ('action', models.CharField(choices=[('read', 'Read'), ('write', 'Write'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('allowed', models.BooleanField(default=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('role', 'resource', 'action'), name='permission_grant_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+# Index untuk tabel token_blacklist (app pihak ketiga, jadi dibuat lewat
+# schema_editor di sini): expires_at untuk prune_tokens, blacklisted_at untuk
+# sync incremental BlacklistFilter.
+INDEXES = [
+    ('OutstandingToken', models.Index(fields=['expires_at'], name='outstanding_expires_at_idx')),
+    ('BlacklistedToken', models.Index(fields=['blacklisted_at'], name='blacklisted_at_idx')),
+]
+
+
+def add_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        schema_editor.add_index(apps.get_model('token_blacklist', model_name), index)
+
+
+def remove_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        schema_editor.remove_index(apps.get_model('token_blacklist', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapi', '0004_permission_grant'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
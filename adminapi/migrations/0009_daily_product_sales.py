@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapi', '0008_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='adminapi.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'date'], name='daily_sales_product_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='daily_sales_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapi', '0010_product_sku'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['is_used', 'expires_at'], name='invitation_used_expires_idx'),
+        ),
+    ]
@@ -17,6 +17,32 @@ class User(AbstractUser):
 
 
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default=ROLE_STAFF)
+    # Dinaikkan setiap role / status aktif / password berubah, supaya access
+    # token lama (claim auth_version) otomatis ditolak
+    auth_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    AUTH_STATE_FIELDS = ('role', 'is_active', 'password')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_auth_state = {
+            name: getattr(instance, name) for name in cls.AUTH_STATE_FIELDS if name in instance.__dict__
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_auth_state', {})
+        if any(self.__dict__.get(name, value) != value for name, value in loaded.items()):
+            self.auth_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'auth_version'}
+        super().save(*args, **kwargs)
+        self._loaded_auth_state = {
+            name: getattr(self, name) for name in self.AUTH_STATE_FIELDS if name in self.__dict__
+        }
 
     def is_admin(self):
         return self.role == self.ROLE_ADMIN
@@ -29,24 +55,84 @@ class User(AbstractUser):
     def is_staff_role(self):
         return self.role == self.ROLE_STAFF
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='user_joined_id_idx'),
+            models.Index(fields=['updated_at'], name='user_updated_idx'),
+            models.Index(fields=['role', 'date_joined'], name='user_role_joined_idx'),
+        ]
+
 class Product(models.Model):
+    # natural key untuk import katalog supplier (lihat imports.py); product lama boleh kosong
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name = models.CharField(max_length=150)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
     status = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+            models.Index(fields=['status', 'price'], name='product_status_price_idx'),
+            models.Index(fields=['price'], name='product_price_idx'),
+            models.Index(fields=['stock'], name='product_stock_idx'),
+        ]
 
 
 def __str__(self):
     return self.name
 
 class Order(models.Model):
+    STATUS_PENDING = 'Pending'
+    STATUS_CANCELLED = 'Cancelled'
+
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
     customer_name = models.CharField(max_length=150)
     quantity = models.PositiveIntegerField(default=1)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
-    status = models.CharField(max_length=15, default='Pending')
+    status = models.CharField(max_length=15, default=STATUS_PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='order_created_id_idx'),
+            models.Index(fields=['updated_at'], name='order_updated_idx'),
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['product', 'created_at'], name='order_product_created_idx'),
+        ]
+
+    # field yang mempengaruhi rollup DailyProductSales (lihat reports.py)
+    SALES_FIELDS = ('product_id', 'quantity', 'total_price', 'status', 'created_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_sales = instance.sales_state()
+        return instance
+
+    def sales_state(self):
+        # None kalau ada field yang di-defer (mis. .only()); signal lalu baca ulang dari DB
+        if any(name not in self.__dict__ for name in self.SALES_FIELDS):
+            return None
+        return {name: self.__dict__[name] for name in self.SALES_FIELDS}
+
+    def holds_stock(self):
+        # order yang dibatalkan tidak lagi memegang stock product
+        return self.status.lower() != self.STATUS_CANCELLED.lower()
+
+
+class InvitationQuerySet(models.QuerySet):
+
+    def pending(self):
+        """Invitation yang belum dipakai dan belum expired."""
+        return self.filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=timezone.now()),
+            is_used=False,
+        )
 
 
 class Invitation(models.Model):
@@ -56,14 +142,114 @@ class Invitation(models.Model):
     inviter = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     is_used = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField(null=True, blank=True)
 
+    objects = InvitationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='invitation_created_id_idx'),
+            # pending() dan sweep_invitations
+            models.Index(fields=['is_used', 'expires_at'], name='invitation_used_expires_idx'),
+            models.Index(fields=['updated_at'], name='invitation_updated_idx'),
+        ]
+
+    @staticmethod
+    def default_expires_at():
+        return timezone.now() + timezone.timedelta(days=1)
 
     def save(self, *args, **kwargs):
         if not self.expires_at:
-            self.expires_at = timezone.now() + timezone.timedelta(days=1)
+            self.expires_at = self.default_expires_at()
         super().save(*args, **kwargs)
 
 
     def is_valid(self):
-        return (not self.is_used) and (self.expires_at is None or timezone.now() < self.expires_at)
\ No newline at end of file
+        return (not self.is_used) and (self.expires_at is None or timezone.now() < self.expires_at)
+
+
+class PermissionGrant(models.Model):
+    """
+    Override ROLE_PERMISSIONS (adminapi/permissions.py) yang disimpan di DB.
+    Role / resource baru juga boleh ditambahkan di sini.
+    """
+    ACTION_CHOICES = [
+        ('read', 'Read'),
+        ('write', 'Write'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+
+    role = models.CharField(max_length=20)
+    resource = models.CharField(max_length=50)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    allowed = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['role', 'resource', 'action'], name='permission_grant_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.role}:{self.resource}:{self.action}={'allow' if self.allowed else 'deny'}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Email yang menunggu dikirim oleh worker `manage.py send_outbox`.
+    Ditulis di dalam transaksi yang sama dengan data yang memicunya.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    invitation = models.ForeignKey(Invitation, on_delete=models.SET_NULL, null=True, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    lock_id = models.CharField(max_length=32, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+            models.Index(fields=['lock_id'], name='outbox_lock_idx'),
+        ]
+
+
+class DailyProductSales(models.Model):
+    """
+    Rollup penjualan per product per hari (tanggal created_at order, TIME_ZONE).
+    Di-update incremental oleh signal Order; dibangun ulang dengan
+    `manage.py rebuild_sales_rollup`. Order yang Cancelled tidak dihitung.
+    """
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='daily_sales_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'date'], name='daily_sales_product_date_idx'),
+        ]
@@ -0,0 +1,4 @@
+"""
+Database backend MySQL dengan connection pool per process:
+ENGINE = 'adminapi.mysql_pool' (lihat base.py dan pool.py).
+"""
@@ -0,0 +1,59 @@
+"""
+Backend MySQL (mysqlclient) dengan connection pool: subclass tipis dari
+django.db.backends.mysql. Konfigurasi di OPTIONS['pool'] (seperti pool
+bawaan Django untuk PostgreSQL), mis.
+
+    'OPTIONS': {'charset': 'utf8mb4', 'pool': {'min_size': 2, 'max_size': 20}}
+
+Django tetap "menutup" koneksi di akhir request (CONN_MAX_AGE = 0), tapi
+close() hanya mengembalikan koneksi ke pool, jadi connect + handshake auth
+hanya terjadi saat pool membuat koneksi baru.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from .pool import ConnectionPool, get_pool
+
+POOL_DEFAULTS = {
+    'min_size': 0,
+    'max_size': 10,
+    # detik menunggu koneksi kosong sebelum PoolTimeout
+    'timeout': 10,
+    # detik; di bawah wait_timeout MySQL supaya server tidak menutup duluan
+    'max_lifetime': 3600,
+    # koneksi yang idle selama ini (detik) di-ping dulu saat checkout; 0 = selalu
+    'ping_interval': 0,
+}
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+
+    def pool_options(self):
+        options = {**POOL_DEFAULTS, **self.settings_dict['OPTIONS'].get('pool', {})}
+        unknown = set(options) - set(POOL_DEFAULTS)
+        if unknown:
+            raise ImproperlyConfigured(f"Unknown OPTIONS['pool'] keys: {', '.join(sorted(unknown))}")
+        return options
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def pool_key(self, conn_params):
+        # database test punya NAME sendiri, jadi pool-nya juga terpisah
+        host = conn_params.get('unix_socket') or f"{conn_params.get('host', '')}:{conn_params.get('port', '')}"
+        return self.alias, f"{conn_params.get('user', '')}@{host}/{conn_params.get('database', '')}"
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.pool_key(conn_params), lambda: ConnectionPool(
+            lambda: MySQLDatabaseWrapper.get_new_connection(self, conn_params), **self.pool_options()
+        ))
+        return pool.acquire()
+
+    def init_connection_state(self):
+        # SET session (isolation level, SQL_AUTO_IS_NULL) cukup sekali per koneksi fisik
+        if self.connection.initialized:
+            return
+        super().init_connection_state()
+        self.connection.initialized = True
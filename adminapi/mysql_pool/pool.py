@@ -0,0 +1,248 @@
+"""
+Connection pool generik, tidak bergantung pada MySQLdb: koneksi dibuat
+lewat fungsi `connect` dan dicek lewat `ping()` / `rollback()` / `close()`
+milik koneksi itu, jadi bisa dites dengan connector palsu.
+
+Satu pool per process per target database (lihat get_pool). Setelah fork
+(mis. gunicorn --preload) pool milik parent dibuang, bukan dipakai bersama.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    """Semua koneksi sedang dipakai dan tidak ada yang kembali dalam `timeout` detik."""
+
+
+class PooledConnection:
+    """
+    Pembungkus koneksi DB-API: close() mengembalikan koneksi ke pool,
+    atribut lain diteruskan ke koneksi aslinya.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # diisi oleh DatabaseWrapper setelah SET session pertama kali
+        self.initialized = False
+        self.checked_out = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self.checked_out:
+            self._pool.release(self)
+
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+class ConnectionPool:
+    """
+    min_size koneksi dibuat saat pertama dipakai dan dijaga tetap ada,
+    paling banyak max_size koneksi sekaligus. Checkout menunggu paling lama
+    `timeout` detik kalau pool penuh. Koneksi yang lebih tua dari
+    max_lifetime ditutup saat kembali / saat akan dipakai; koneksi yang
+    idle lebih dari ping_interval di-ping dulu sebelum diberikan.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, timeout=10, max_lifetime=3600, ping_interval=0):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError('Pool needs 0 <= min_size <= max_size and max_size >= 1')
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.idle = deque()
+        self.size = 0
+        self.filled = False
+        self.condition = threading.Condition()
+        self.stats = dict.fromkeys((
+            'checkouts', 'created', 'closed', 'recycled', 'broken', 'waits', 'timeouts',
+        ), 0)
+        self.stats['wait_seconds'] = 0.0
+        self.stats['max_wait_seconds'] = 0.0
+
+    # --- checkout / release ---
+
+    def acquire(self):
+        self.fill()
+        start = time.monotonic()
+        waited = False
+        while True:
+            conn = None
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(f'No database connection available within {self.timeout}s (pool size {self.max_size})')
+                    waited = True
+                    self.condition.wait(remaining)
+                if self.idle:
+                    conn = self.idle.pop()  # LIFO: koneksi yang baru dipakai masih hangat
+                else:
+                    self.size += 1  # slot dipesan, koneksi dibuat di luar lock
+
+            if conn is None:
+                conn = self.create()
+            elif not self.healthy(conn):
+                continue
+
+            with self.condition:
+                if waited:
+                    wait = time.monotonic() - start
+                    self.stats['waits'] += 1
+                    self.stats['wait_seconds'] += wait
+                    self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], wait)
+                self.stats['checkouts'] += 1
+            conn.checked_out = True
+            return conn
+
+    def release(self, conn):
+        conn.checked_out = False
+        if conn.age() >= self.max_lifetime:
+            self.discard(conn, 'recycled')
+            return
+        try:
+            # transaksi yang belum selesai tidak boleh terbawa ke pemakai berikutnya
+            conn._raw.rollback()
+        except Exception:
+            self.discard(conn, 'broken')
+            return
+        conn.last_used = time.monotonic()
+        with self.condition:
+            self.idle.append(conn)
+            self.condition.notify()
+
+    # --- internal ---
+
+    def create(self):
+        try:
+            conn = PooledConnection(self, self.connect())
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.stats['created'] += 1
+        return conn
+
+    def healthy(self, conn):
+        """False (dan slot dilepas) kalau koneksi idle sudah terlalu tua atau mati."""
+        if conn.age() >= self.max_lifetime:
+            self.discard(conn, 'recycled')
+            return False
+        if time.monotonic() - conn.last_used >= self.ping_interval:
+            try:
+                conn._raw.ping()
+            except Exception:
+                self.discard(conn, 'broken')
+                return False
+        return True
+
+    def discard(self, conn, reason=None):
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.size -= 1
+            self.stats['closed'] += 1
+            if reason:
+                self.stats[reason] += 1
+            self.condition.notify()
+
+    def fill(self):
+        if self.filled:
+            return
+        with self.condition:
+            if self.filled:
+                return
+            self.filled = True
+            missing = max(self.min_size - self.size, 0)
+            self.size += missing
+        for _ in range(missing):
+            self.release(self.create())
+
+    def close_all(self):
+        with self.condition:
+            idle, self.idle = list(self.idle), deque()
+        for conn in idle:
+            self.discard(conn)
+
+    def snapshot(self):
+        with self.condition:
+            idle = len(self.idle)
+            return {**self.stats, 'size': self.size, 'idle': idle, 'in_use': self.size - idle, 'max_size': self.max_size}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def get_pool(key, factory):
+    """Pool untuk `key` di process ini; dibuat dengan factory() kalau belum ada."""
+    global _pid
+    pool = _pools.get(key)
+    if pool is not None and _pid == os.getpid():
+        return pool
+    with _pools_lock:
+        if _pid != os.getpid():
+            # process hasil fork: koneksi parent tidak boleh dipakai bersama
+            _pools.clear()
+            _pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+        return pool
+
+
+def pool_snapshots():
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [(key, pool.snapshot()) for key, pool in pools]
+
+
+POOL_METRICS = (
+    ('size', 'gauge', 'Open connections (idle + in use).'),
+    ('idle', 'gauge', 'Idle connections.'),
+    ('in_use', 'gauge', 'Checked-out connections.'),
+    ('max_size', 'gauge', 'Configured maximum pool size.'),
+    ('checkouts', 'counter', 'Connections handed out.'),
+    ('created', 'counter', 'Connections opened.'),
+    ('closed', 'counter', 'Connections closed by the pool.'),
+    ('recycled', 'counter', 'Connections closed after max lifetime.'),
+    ('broken', 'counter', 'Connections that failed ping or rollback.'),
+    ('waits', 'counter', 'Checkouts that had to wait for a free connection.'),
+    ('wait_seconds', 'counter', 'Total time spent waiting for a connection.'),
+    ('max_wait_seconds', 'gauge', 'Longest wait for a connection.'),
+    ('timeouts', 'counter', 'Checkouts that gave up waiting.'),
+)
+
+
+def render_pool_metrics():
+    """Baris Prometheus untuk semua pool di process ini (dipanggil metrics.render_prometheus)."""
+    snapshots = pool_snapshots()
+    if not snapshots:
+        return []
+    lines = []
+    for field, kind, help_text in POOL_METRICS:
+        name = f'adminapi_db_pool_{field}' + ('_total' if kind == 'counter' else '')
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (alias, database), snapshot in snapshots:
+            # key pool: (alias, "host:port/nama database"), lihat base.DatabaseWrapper.pool_key
+            lines.append(f'{name}{{alias="{alias}",database="{database}"}} {snapshot[field]:g}')
+    return lines
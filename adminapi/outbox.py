@@ -0,0 +1,143 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+INVITE_LINK = "https://frontend-rbac.tokocoding.com/api/invitations/accept/?token={token}"
+
+
+def invitation_email(invitation):
+    """Bangun row outbox (belum disimpan) untuk email undangan."""
+    invite_link = INVITE_LINK.format(token=invitation.token)
+    return EmailOutbox(
+        invitation=invitation,
+        subject='You are invited',
+        body=f"You have been invited. Click to accept: {invite_link}\nThis link expires: {invitation.expires_at}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient=invitation.email,
+    )
+
+
+def enqueue_invitation_email(invitation):
+    outbox = invitation_email(invitation)
+    outbox.save()
+    return outbox
+
+
+def enqueue_invitation_emails(invitations):
+    """Versi bulk: satu INSERT untuk semua email; dikirim worker lewat satu koneksi per batch."""
+    return EmailOutbox.objects.bulk_create([invitation_email(invitation) for invitation in invitations])
+
+
+def claim_batch(batch_size):
+    """
+    Ambil sampai batch_size email yang siap dikirim dan tandai 'sending'.
+
+    UPDATE dengan lock_id unik memastikan dua worker tidak pernah mengklaim
+    row yang sama. Row 'sending' yang lock-nya lebih tua dari LEASE (worker
+    mati di tengah jalan) diklaim ulang.
+    """
+    now = timezone.now()
+    due = (
+        Q(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=EmailOutbox.STATUS_SENDING, locked_at__lt=now - timedelta(seconds=settings.EMAIL_OUTBOX['LEASE']))
+    )
+    ids = list(EmailOutbox.objects.filter(due).order_by('next_attempt_at').values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    lock_id = uuid.uuid4().hex
+    EmailOutbox.objects.filter(due, pk__in=ids).update(status=EmailOutbox.STATUS_SENDING, lock_id=lock_id, locked_at=now)
+    return list(EmailOutbox.objects.filter(lock_id=lock_id))
+
+
+def _send_chunk(rows):
+    """
+    Kirim satu chunk lewat satu koneksi mail. Return [(row, error atau None)].
+
+    Semua message dikirim dengan satu send_messages. Kalau panggilan itu
+    raise, tidak diketahui message mana yang sudah terkirim (backend SMTP
+    berhenti di message pertama yang gagal), jadi setiap message dikirim
+    ulang satu per satu untuk memetakan error ke row-nya. Message yang sudah
+    terkirim bisa terkirim dua kali; outbox memang at-least-once.
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+        messages = [
+            EmailMessage(row.subject, row.body, row.from_email, [row.recipient], connection=connection)
+            for row in rows
+        ]
+        try:
+            connection.send_messages(messages)
+            return [(row, None) for row in rows]
+        except Exception:
+            pass
+        results = []
+        for row, message in zip(rows, messages):
+            try:
+                connection.send_messages([message])
+                results.append((row, None))
+            except Exception as e:
+                results.append((row, repr(e)))
+        return results
+    except Exception as e:
+        # gagal connect: semua row dianggap gagal
+        return [(row, repr(e)) for row in rows]
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def send_batch(rows, workers=1):
+    """Bagi rows ke beberapa thread, tiap thread memakai satu koneksi mail."""
+    if not rows:
+        return []
+    workers = max(1, min(workers, len(rows)))
+    chunks = [rows[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [result for chunk_results in executor.map(_send_chunk, chunks) for result in chunk_results]
+
+
+def record_results(results):
+    """Simpan status hasil kirim: sent, atau retry dengan exponential backoff."""
+    now = timezone.now()
+    config = settings.EMAIL_OUTBOX
+
+    sent_ids = [row.pk for row, error in results if error is None]
+    if sent_ids:
+        EmailOutbox.objects.filter(pk__in=sent_ids).update(
+            status=EmailOutbox.STATUS_SENT, sent_at=now, lock_id='', locked_at=None, last_error='',
+        )
+
+    failed = 0
+    for row, error in results:
+        if error is None:
+            continue
+        failed += 1
+        attempts = row.attempts + 1
+        if attempts >= config['MAX_ATTEMPTS']:
+            status, next_attempt_at = EmailOutbox.STATUS_FAILED, row.next_attempt_at
+        else:
+            delay = min(config['RETRY_BASE'] * 2 ** (attempts - 1), config['RETRY_MAX'])
+            status, next_attempt_at = EmailOutbox.STATUS_PENDING, now + timedelta(seconds=delay)
+        EmailOutbox.objects.filter(pk=row.pk).update(
+            status=status, attempts=attempts, next_attempt_at=next_attempt_at,
+            lock_id='', locked_at=None, last_error=error[:2000],
+        )
+    return len(sent_ids), failed
+
+
+def process_outbox(batch_size=100, workers=1):
+    """Satu putaran worker: klaim, kirim, simpan hasil. Return (sent, failed)."""
+    rows = claim_batch(batch_size)
+    return record_results(send_batch(rows, workers))
@@ -0,0 +1,26 @@
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination for all list endpoints:
+    - ordered by (created_at, id), both covered by an index
+    - next/previous cursors are opaque, no COUNT(*) query
+    - client can set ?page_size= up to max_page_size
+
+    apaginate_queryset untuk view async: paginate_queryset DRF apa adanya,
+    dijalankan lewat sync_to_async (async ORM Django juga menjalankan
+    query-nya dengan cara itu), jadi hasilnya identik dengan jalur sync.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+
+class UserCursorPagination(KeysetCursorPagination):
+    # User tidak punya created_at, pakai date_joined dari AbstractUser
+    ordering = ('-date_joined', '-id')
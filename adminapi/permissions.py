@@ -1,3 +1,9 @@
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework import permissions
 
 
@@ -7,94 +13,185 @@ ROLE_PERMISSIONS = {
         'products': {'read': True, 'write': True, 'delete': True , 'update': True},
         'orders': {'read': True, 'write': True, 'delete': True , 'update': True},
         'invitations': {'read': True, 'write': True, 'delete': True , 'update': True},
+        'metrics': {'read': True, 'write': False, 'delete': False, 'update': False},
     },
     'manager': {
         'users': {'read': True, 'write': False, 'delete': False, 'update': False},
         'products': {'read': True, 'write': False, 'delete': False, 'update': True},
         'orders': {'read': True, 'write': False, 'delete': False, 'update': False},
         'invitations': {'read': True, 'write': True, 'delete': False, 'update': True},
+        'metrics': {'read': False, 'write': False, 'delete': False, 'update': False},
     },
     'staff': {
         'users': {'read': False, 'write': False , 'delete': False , 'update': False},
         'products': {'read': True, 'write': False, 'delete': False, 'update': False},
         'orders': {'read': False, 'write': False, 'delete': False, 'update': False},
         'invitations': {'read': False, 'write': False, 'delete': False, 'update': False},
+        'metrics': {'read': False, 'write': False, 'delete': False, 'update': False},
     }
 }
 
-class UserPermission(permissions.BasePermission):
-    """
-    Role-based permission untuk User model:
-    - Admin: full access
-    - Manager: read-only
-    - Staff: no access
-    """
-    def has_permission(self, request, view):
-        user = request.user
-        if not user.is_authenticated:
-            return False
+# resource internal (bukan halaman frontend): dicek seperti biasa, tapi tidak
+# ikut di matrix permissions yang dikirim saat login
+INTERNAL_RESOURCES = frozenset({'metrics'})
+
+# Satu bit per action di ROLE_PERMISSIONS
+ACTION_BITS = {'read': 1, 'write': 2, 'update': 4, 'delete': 8}
+
+METHOD_ACTIONS = {
+    'GET': 'read',
+    'HEAD': 'read',
+    'OPTIONS': 'read',
+    'POST': 'write',
+    'PUT': 'update',
+    'PATCH': 'update',
+    'DELETE': 'delete',
+}
 
-        role = getattr(user, 'role', None)
+PERMISSION_VERSION_KEY = 'rbac:version'
 
-        if role == 'admin':
-            return True
-        elif role == 'manager':
-            return request.method in permissions.SAFE_METHODS
-        elif role == 'staff':
-            return False
-        return False
 
-    def has_object_permission(self, request, view, obj):
-        return self.has_permission(request, view)
+def compile_permissions(matrix):
+    """Compile matrix {role: {resource: {action: bool}}} menjadi {(role, resource): bitmask}."""
+    table = {}
+    for role, resources in matrix.items():
+        for resource, actions in resources.items():
+            mask = 0
+            for action, allowed in actions.items():
+                if allowed:
+                    mask |= ACTION_BITS[action]
+            table[(role, resource)] = mask
+    return table
+
+
+def load_permission_matrix():
+    """ROLE_PERMISSIONS ditimpa dengan grant yang tersimpan di DB (PermissionGrant)."""
+    from .models import PermissionGrant
 
+    matrix = {role: {resource: dict(actions) for resource, actions in resources.items()}
+              for role, resources in ROLE_PERMISSIONS.items()}
+    grants = PermissionGrant.objects.values_list('role', 'resource', 'action', 'allowed')
+    for role, resource, action, allowed in grants:
+        actions = matrix.setdefault(role, {}).setdefault(resource, dict.fromkeys(ACTION_BITS, False))
+        actions[action] = allowed
+    return matrix
 
-class ProductPermission(permissions.BasePermission):
+
+def bump_permission_version():
     """
-    Role-based permission untuk Product model:
-    - Admin: full access
-    - Manager: full access
-    - Staff: read-only
+    Dipanggil setiap grant berubah. Process ini compile ulang langsung; process
+    lain setelah PERMISSION_CHECK_INTERVAL (cache bersama) atau paling lambat
+    PERMISSION_CACHE_TIMEOUT (cache per-process, versinya expired sendiri).
     """
-    def has_permission(self, request, view):
-        user = request.user
-        if not user.is_authenticated:
-            return False
-
-        role = getattr(user, 'role', None)
+    cache.set(PERMISSION_VERSION_KEY, uuid.uuid4().hex, settings.PERMISSION_CACHE_TIMEOUT)
+    permission_table.expire()
 
-        if role == 'admin':
-            return True
-        elif role == 'manager':
-            return True
-        elif role == 'staff':
-            return request.method in permissions.SAFE_METHODS
-        return False
 
-    def has_object_permission(self, request, view, obj):
-        return self.has_permission(request, view)
+class PermissionTable:
+    """
+    Lookup (role, resource, method) -> allowed dalam O(1).
 
+    Tabel di-compile sekali per process dan di-compile ulang kalau versi di
+    cache berubah (lihat bump_permission_version) atau umurnya sudah
+    PERMISSION_CACHE_TIMEOUT. Versi di cache dicek paling sering sekali per
+    PERMISSION_CHECK_INTERVAL detik, bukan di setiap permission check.
+    """
 
-class OrderPermission(permissions.BasePermission):
+    def __init__(self, matrix):
+        self.version = None
+        self.matrix = matrix
+        self.table = compile_permissions(matrix)
+        # matrix bawaan belum termasuk grant dari DB
+        self.checked_at = self.loaded_at = float('-inf')
+
+    def expire(self):
+        self.checked_at = self.loaded_at = float('-inf')
+
+    def needs_check(self, now):
+        return now - self.checked_at >= settings.PERMISSION_CHECK_INTERVAL
+
+    def needs_reload(self, version, now):
+        self.checked_at = now
+        return version != self.version or now - self.loaded_at >= settings.PERMISSION_CACHE_TIMEOUT
+
+    def load(self, matrix, version, now):
+        self.matrix, self.table, self.version, self.loaded_at = matrix, compile_permissions(matrix), version, now
+
+    def refresh(self):
+        now = time.monotonic()
+        if not self.needs_check(now):
+            return
+        version = cache.get(PERMISSION_VERSION_KEY)
+        if version is None:
+            cache.add(PERMISSION_VERSION_KEY, uuid.uuid4().hex, settings.PERMISSION_CACHE_TIMEOUT)
+            version = cache.get(PERMISSION_VERSION_KEY)
+        if self.needs_reload(version, now):
+            self.load(load_permission_matrix(), version, now)
+
+    async def arefresh(self):
+        now = time.monotonic()
+        if not self.needs_check(now):
+            return
+        version = await cache.aget(PERMISSION_VERSION_KEY)
+        if version is None:
+            await cache.aadd(PERMISSION_VERSION_KEY, uuid.uuid4().hex, settings.PERMISSION_CACHE_TIMEOUT)
+            version = await cache.aget(PERMISSION_VERSION_KEY)
+        if self.needs_reload(version, now):
+            # jarang (hanya saat grant berubah), jadi load matrix tetap lewat ORM sync
+            self.load(await sync_to_async(load_permission_matrix)(), version, now)
+
+    def allows(self, role, resource, action):
+        self.refresh()
+        return bool(self.table.get((role, resource), 0) & ACTION_BITS[action])
+
+    async def aallows(self, role, resource, action):
+        await self.arefresh()
+        return bool(self.table.get((role, resource), 0) & ACTION_BITS[action])
+
+    def permissions_for(self, role):
+        """Matrix role untuk frontend (response login), tanpa INTERNAL_RESOURCES."""
+        self.refresh()
+        return {resource: actions for resource, actions in self.matrix.get(role, {}).items()
+                if resource not in INTERNAL_RESOURCES}
+
+
+# Matrix bawaan sudah di-compile saat import; grant dari DB dimuat saat pertama dipakai
+permission_table = PermissionTable(ROLE_PERMISSIONS)
+
+
+class RolePermission(permissions.BasePermission):
     """
-    Role-based permission untuk Order model:
-    - Admin: full access
-    - Manager: read-only
-    - Staff: no access
+    Role-based permission berdasarkan ROLE_PERMISSIONS (+ grant di DB).
+
+    View menentukan resource lewat `permission_resource`, mis. 'products'.
+    Method HTTP dipetakan ke action lewat METHOD_ACTIONS; custom action bisa
+    dipetakan sendiri lewat `permission_action_map`, mis. {'revoke': 'delete'}.
     """
-    def has_permission(self, request, view):
+
+    def get_action(self, request, view):
         user = request.user
-        if not user.is_authenticated:
-            return False
+        if not user or not user.is_authenticated:
+            return None
 
-        role = getattr(user, 'role', None)
+        action = getattr(view, 'permission_action_map', {}).get(getattr(view, 'action', None))
+        if action is None:
+            action = METHOD_ACTIONS.get(request.method)
+        return action
 
-        if role == 'admin':
-            return True
-        elif role == 'manager':
-            return request.method in permissions.SAFE_METHODS
-        elif role == 'staff':
+    def has_permission(self, request, view):
+        action = self.get_action(request, view)
+        if action is None:
             return False
-        return False
+        return permission_table.allows(getattr(request.user, 'role', None), view.permission_resource, action)
 
     def has_object_permission(self, request, view, obj):
         return self.has_permission(request, view)
+
+    async def ahas_permission(self, request, view):
+        action = self.get_action(request, view)
+        if action is None:
+            return False
+        return await permission_table.aallows(getattr(request.user, 'role', None), view.permission_resource, action)
+
+    async def ahas_object_permission(self, request, view, obj):
+        return await self.ahas_permission(request, view)
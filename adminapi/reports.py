@@ -0,0 +1,123 @@
+"""
+Rollup penjualan harian (DailyProductSales).
+
+Setiap perubahan order diterjemahkan jadi delta (orders, units, revenue)
+per (product, tanggal) dan ditambahkan ke rollup dengan UPDATE ... + F().
+Report lalu cukup membaca rollup: biayanya sebanding hari x product,
+bukan jumlah order.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyProductSales, Order
+
+
+def sales_day(created_at):
+    if timezone.is_naive(created_at):
+        return created_at.date()
+    return timezone.localdate(created_at)
+
+
+def add_sales(deltas, state, sign):
+    """Tambahkan kontribusi satu order (Order.sales_state()) ke deltas, sign +1 / -1."""
+    if state is None or state['status'].lower() == Order.STATUS_CANCELLED.lower():
+        return
+    totals = deltas.setdefault((state['product_id'], sales_day(state['created_at'])), [0, 0, Decimal('0')])
+    totals[0] += sign
+    totals[1] += sign * state['quantity']
+    totals[2] += sign * Decimal(state['total_price'])
+
+
+def apply_sales_deltas(deltas):
+    # diurutkan supaya dua transaksi selalu mengunci row rollup dengan urutan yang sama
+    for (product_id, day), (orders, units, revenue) in sorted(deltas.items()):
+        if not (orders or units or revenue):
+            continue
+        rows = DailyProductSales.objects.filter(product_id=product_id, date=day)
+        changes = {'orders': F('orders') + orders, 'units': F('units') + units, 'revenue': F('revenue') + revenue}
+        if rows.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                DailyProductSales.objects.create(product_id=product_id, date=day, orders=orders, units=units, revenue=revenue)
+        except IntegrityError:
+            # row baru saja dibuat oleh transaksi lain
+            rows.update(**changes)
+
+
+def record_order_change(before, after):
+    """before / after: Order.sales_state() sebelum dan sesudah perubahan (None = tidak ada)."""
+    deltas = {}
+    add_sales(deltas, before, -1)
+    add_sales(deltas, after, 1)
+    apply_sales_deltas(deltas)
+
+
+def record_orders_created(orders):
+    """Untuk bulk_create, yang tidak memicu signal post_save."""
+    deltas = {}
+    for order in orders:
+        add_sales(deltas, order.sales_state(), 1)
+    apply_sales_deltas(deltas)
+
+
+def rebuild_sales(start=None, end=None, days_per_batch=31):
+    """
+    Bangun ulang rollup dari tabel Order, per batch `days_per_batch` hari.
+    Setiap batch (hapus + insert hasil GROUP BY) jalan dalam satu transaksi.
+    Return jumlah row rollup yang ditulis.
+    """
+    orders = Order.objects.exclude(status__iexact=Order.STATUS_CANCELLED)
+    if start is None or end is None:
+        first = orders.order_by('created_at').values_list('created_at', flat=True).first()
+        last = orders.order_by('-created_at').values_list('created_at', flat=True).first()
+        if first is None:
+            return 0
+        start = start or sales_day(first)
+        end = end or sales_day(last)
+
+    written = 0
+    day = start
+    while day <= end:
+        batch_end = min(day + timedelta(days=days_per_batch - 1), end)
+        window = (
+            timezone.make_aware(datetime.combine(day, time.min)),
+            timezone.make_aware(datetime.combine(batch_end + timedelta(days=1), time.min)),
+        )
+        rows = (
+            orders.filter(created_at__gte=window[0], created_at__lt=window[1])
+            .annotate(day=TruncDate('created_at'))
+            .values('product_id', 'day')
+            .annotate(order_count=Count('pk'), unit_count=Sum('quantity'), revenue_total=Sum('total_price'))
+            .order_by()
+        )
+        with transaction.atomic():
+            DailyProductSales.objects.filter(date__gte=day, date__lte=batch_end).delete()
+            created = DailyProductSales.objects.bulk_create([
+                DailyProductSales(
+                    product_id=row['product_id'], date=row['day'], orders=row['order_count'],
+                    units=row['unit_count'], revenue=row['revenue_total'],
+                )
+                for row in rows
+            ])
+        written += len(created)
+        day = batch_end + timedelta(days=1)
+    return written
+
+
+def sales_report(start, end, product_ids=None):
+    """Row rollup untuk rentang tanggal (inklusif), opsional dibatasi product."""
+    queryset = DailyProductSales.objects.filter(date__gte=start, date__lte=end)
+    if product_ids:
+        queryset = queryset.filter(product_id__in=product_ids)
+    return queryset
+
+
+def sales_totals(queryset):
+    totals = queryset.aggregate(orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue'))
+    return {key: value or 0 for key, value in totals.items()}
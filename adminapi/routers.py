@@ -0,0 +1,198 @@
+"""
+Routing read replica (DATABASE_REPLICAS di settings).
+
+- Request GET/HEAD/OPTIONS membaca dari replica, bergiliran (round-robin)
+  di antara replica yang sehat. Replica yang gagal dicek dilewati selama
+  REPLICA_HEALTH_CHECK_INTERVAL detik.
+- Request lain (tulis) dan semua query setelah ada write di request yang
+  sama memakai primary ('default').
+- Read-your-writes: setelah user melakukan request tulis yang berhasil,
+  request GET user itu tetap ke primary selama REPLICA_STICKY_SECONDS,
+  supaya lag replikasi tidak membuat perubahannya sendiri "hilang".
+
+Di luar request (management command, worker) semua query ke primary.
+"""
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+
+import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.settings import api_settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_routing = ContextVar('adminapi_db_routing', default=None)
+
+
+class RoutingState:
+    __slots__ = ('use_primary',)
+
+    def __init__(self, use_primary):
+        self.use_primary = use_primary
+
+
+def sticky_key(user_id):
+    return f'replica:sticky:{user_id}'
+
+
+def request_user_id(request):
+    """
+    user_id dari access token tanpa verifikasi signature: hanya dipakai
+    untuk memilih database (autentikasi tetap dilakukan view), jadi token
+    palsu paling jauh hanya membuat request itu membaca dari primary.
+    """
+    header = request.headers.get('Authorization', '')
+    parts = header.split()
+    if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        payload = jwt.decode(parts[1], options={'verify_signature': False})
+    except jwt.InvalidTokenError:
+        return None
+    return payload.get(api_settings.USER_ID_CLAIM)
+
+
+def written_by(request, response):
+    """
+    user_id yang sticky ke primary setelah request tulis ini: hanya kalau
+    write-nya berhasil dan token sudah diverifikasi view (DRF menyalin
+    request.auth / request.user ke HttpRequest), supaya token palsu atau
+    request yang ditolak tidak bisa memaksa user lain ke primary.
+    """
+    if response.status_code >= 400 or getattr(request, 'auth', None) is None:
+        return None
+    # di sini request.user sudah user dari token, bukan lazy user session
+    user = request.user
+    return user.pk if user.is_authenticated else None
+
+
+class ReplicaRouter:
+
+    def __init__(self):
+        self.counter = itertools.count()
+        self.checked_at = {}
+        self.down_until = {}
+
+    @property
+    def replicas(self):
+        return settings.DATABASE_REPLICAS
+
+    def check(self, alias):
+        try:
+            connection = connections[alias]
+            connection.ensure_connection()
+            return connection.is_usable()
+        except Exception:
+            return False
+
+    def healthy(self, alias):
+        now = time.monotonic()
+        if self.down_until.get(alias, 0) > now:
+            return False
+        if now - self.checked_at.get(alias, float('-inf')) < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # di event loop tidak boleh ada I/O DB sync: pakai hasil cek terakhir,
+            # replica yang belum pernah dicek tidak dipakai (db_for_read ke primary)
+            return alias in self.checked_at and alias not in self.down_until
+        self.checked_at[alias] = now
+        if self.check(alias):
+            self.down_until.pop(alias, None)
+            return True
+        self.down_until[alias] = now + settings.REPLICA_HEALTH_CHECK_INTERVAL
+        return False
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.use_primary or not self.replicas:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # read di dalam transaksi harus melihat write transaksi itu sendiri
+            return DEFAULT_DB_ALIAS
+
+        replicas = self.replicas
+        start = next(self.counter)
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.healthy(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            # sisa request ini membaca dari primary
+            state.use_primary = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replica diisi oleh replikasi MySQL, bukan migrate
+        if db in self.replicas:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Tentukan database untuk request ini (lihat ReplicaRouter) dan tandai
+    user yang baru melakukan write supaya request berikutnya tetap ke primary.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        safe = request.method in SAFE_METHODS
+        user_id = request_user_id(request) if safe else None
+        use_primary = not safe or (user_id is not None and cache.get(sticky_key(user_id)) is not None)
+        token = _routing.set(RoutingState(use_primary))
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        writer = None if safe else written_by(request, response)
+        if writer is not None:
+            cache.set(sticky_key(writer), 1, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        safe = request.method in SAFE_METHODS
+        user_id = request_user_id(request) if safe else None
+        use_primary = not safe or (user_id is not None and await cache.aget(sticky_key(user_id)) is not None)
+        token = _routing.set(RoutingState(use_primary))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        writer = None if safe else written_by(request, response)
+        if writer is not None:
+            await cache.aset(sticky_key(writer), 1, settings.REPLICA_STICKY_SECONDS)
+        return response
@@ -0,0 +1,127 @@
+"""
+Skema OpenAPI yang sudah di-build (`manage.py build_schema`).
+
+SpectacularAPIView membuat ulang skema di setiap request, dan import
+drf_spectacular.views (generator, plumbing, ...) ikut dibayar setiap worker
+saat urls.py di-load walaupun docs tidak pernah dibuka. Di sini:
+
+- build_schema menulis openapi.yaml + openapi.json ke OPENAPI_SCHEMA_DIR;
+  schema_view mengirim file itu apa adanya (dibaca sekali per process).
+- Kalau file belum ada, atau dengan DEBUG file-nya lebih tua dari kode
+  project, skema dibuat sekali per process (runserver restart setiap kode
+  berubah), supaya file lama tidak menutupi perubahan di development.
+- drf_spectacular hanya di-import saat skema dibuat atau halaman docs dibuka.
+  Router juga tidak lagi memicunya, lihat LazySchemaMixin.
+"""
+import inspect
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.decorators import MethodMapper
+
+# format -> (nama file, Content-Type), sama dengan renderer drf_spectacular
+SCHEMA_FORMATS = {
+    'yaml': ('openapi.yaml', 'application/vnd.oai.openapi; charset=utf-8'),
+    'json': ('openapi.json', 'application/vnd.oai.openapi+json'),
+}
+
+# app project yang kodenya menentukan isi skema
+SOURCE_DIRS = ('adminapi', 'backend')
+
+_schemas = {}
+
+
+def generate_schema():
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(schema, fmt):
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    renderer = OpenApiJsonRenderer() if fmt == 'json' else OpenApiYamlRenderer()
+    return renderer.render(schema, renderer_context={})
+
+
+def write_schema(directory):
+    """Tulis semua format ke `directory`; return daftar path yang ditulis."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    schema = generate_schema()
+    paths = []
+    for fmt, (filename, _) in SCHEMA_FORMATS.items():
+        path = directory / filename
+        path.write_bytes(render_schema(schema, fmt))
+        paths.append(path)
+    return paths
+
+
+def code_mtime():
+    """mtime file .py terbaru di SOURCE_DIRS."""
+    base = Path(settings.BASE_DIR)
+    return max(path.stat().st_mtime for name in SOURCE_DIRS for path in (base / name).rglob('*.py'))
+
+
+def load_schema(fmt):
+    """Isi skema untuk format ini: dari file hasil build_schema, atau dibuat sekali."""
+    filename, _ = SCHEMA_FORMATS[fmt]
+    path = Path(settings.OPENAPI_SCHEMA_DIR) / filename
+    try:
+        built_at = path.stat().st_mtime
+    except FileNotFoundError:
+        built_at = None
+    if built_at is not None and settings.DEBUG and built_at < code_mtime():
+        # development: file lebih tua dari kode, buat ulang
+        built_at = None
+    key = (str(path), built_at)
+    if key not in _schemas:
+        _schemas[key] = render_schema(generate_schema(), fmt) if built_at is None else path.read_bytes()
+    return _schemas[key]
+
+
+def schema_view(request):
+    # ?format=json / Accept: application/json -> JSON, selain itu YAML (default drf_spectacular)
+    fmt = request.GET.get('format')
+    if fmt not in SCHEMA_FORMATS:
+        fmt = 'json' if 'json' in request.headers.get('Accept', '') else 'yaml'
+    response = HttpResponse(load_schema(fmt), content_type=SCHEMA_FORMATS[fmt][1])
+    title = settings.SPECTACULAR_SETTINGS.get('TITLE') or 'schema'
+    response['Content-Disposition'] = f'inline; filename="{title}.{fmt}"'
+    return response
+
+
+def lazy_view(import_path, **initkwargs):
+    """as_view() dari class view yang baru di-import saat request pertama."""
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(import_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class LazySchemaMixin:
+    """
+    get_extra_actions tanpa getmembers(): getmembers membaca semua atribut
+    class, termasuk descriptor `schema` DRF yang meng-import
+    DEFAULT_SCHEMA_CLASS (drf_spectacular.openapi + plumbing) saat router
+    membuat URL. getattr_static melihat atribut tanpa menjalankan descriptor.
+    """
+
+    @classmethod
+    def get_extra_actions(cls):
+        # sama dengan ViewSetMixin.get_extra_actions (dicek di tests.SchemaTests)
+        actions = []
+        for name in sorted(dir(cls)):
+            method = inspect.getattr_static(cls, name)
+            if isinstance(getattr(method, 'mapping', None), MethodMapper):
+                assert method.__name__ == name, f'Extra action {method.__name__!r} must be defined as attribute {name!r}'
+                actions.append(method)
+        return actions
@@ -1,12 +1,26 @@
 from rest_framework import serializers
-from .models import User, Product, Order, Invitation
+from .models import User, Product, Order, Invitation, DailyProductSales
 import base64
 import json
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .permissions import ROLE_PERMISSIONS
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import get_auth_version
+from .metrics import TimedSerializerMixin
+from .permissions import permission_table
+from .tokens import FilteredRefreshToken
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
+    @classmethod
+    def get_token(cls, user):
+        # claim untuk StatelessJWTAuthentication (tanpa lookup User ke DB)
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['auth_version'] = user.auth_version
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         user = self.user
@@ -24,7 +38,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['profile'] = user_profile_base64
 
         # Ambil permissions
-        role_perm = ROLE_PERMISSIONS.get(user.role, {})
+        role_perm = permission_table.permissions_for(user.role)
 
         # Encode ke base64
         role_perm_json = json.dumps(role_perm)  # dict → JSON string
@@ -33,15 +47,118 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['permissions'] = role_perm_base64
 
         return data
-    
-class UserSerializer(serializers.ModelSerializer):
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh tanpa query ke DB di kasus normal:
+    - blacklist dicek lewat bloom filter dulu (FilteredRefreshToken)
+    - status user dicek lewat auth_version di cache, bukan User.objects.get
+    """
+    token_class = FilteredRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        if 'auth_version' not in refresh:
+            # token dari sebelum ada claim auth_version
+            return super().validate(attrs)
+
+        if get_auth_version(refresh[api_settings.USER_ID_CLAIM]) != refresh['auth_version']:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+def parse_fieldset(request):
+    """?fields=id,product.name dan ?exclude=status -> (include atau None, exclude)."""
+    def split(name):
+        value = request.query_params.get(name)
+        return [path.strip() for path in value.split(',') if path.strip()] if value is not None else None
+    return split('fields'), split('exclude') or []
+
+
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets untuk GET: ?fields= memilih field yang dirender,
+    ?exclude= membuang field. Field nested ditulis dengan titik,
+    mis. ?fields=id,product.name. Field yang tidak dikenal -> 400.
+
+    only_fields() memberi kolom yang perlu di-load untuk field yang tersisa,
+    dipakai SparseFieldsetViewMixin untuk queryset.only().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None and request.method in ('GET', 'HEAD'):
+            include, exclude = parse_fieldset(request)
+            if include is not None or exclude:
+                self.prune_fields(include, exclude)
+
+    def prune_fields(self, include, exclude, prefix=''):
+        readable = {name for name, field in self.fields.items() if not field.write_only}
+        nested_include, nested_exclude = {}, {}
+        for paths, nested in ((include or [], nested_include), (exclude, nested_exclude)):
+            for path in paths:
+                name, _, rest = path.partition('.')
+                field = self.fields.get(name)
+                if name not in readable or (rest and not isinstance(field, serializers.Serializer)):
+                    raise serializers.ValidationError({'fields': [f'Unknown field: {prefix}{path}']})
+                if rest:
+                    nested.setdefault(name, []).append(rest)
+
+        if include is not None:
+            keep = {path.partition('.')[0] for path in include}
+            for name in readable - keep:
+                self.fields.pop(name)
+        for path in exclude:
+            if '.' not in path:
+                self.fields.pop(path, None)
+
+        for name in set(nested_include) | set(nested_exclude):
+            if name in self.fields:
+                SparseFieldsetMixin.prune_fields(
+                    self.fields[name], nested_include.get(name), nested_exclude.get(name, []), f'{prefix}{name}.'
+                )
+
+    def only_fields(self):
+        model = self.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        columns = {model._meta.pk.name}
+        for field in self.fields.values():
+            if field.write_only or field.source == '*':
+                continue
+            source = field.source.replace('.', '__')
+            if isinstance(field, SparseFieldsetMixin):
+                columns.add(source)
+                columns.update(f'{source}__{column}' for column in field.only_fields())
+            elif source in concrete:
+                columns.add(source)
+        return columns
+
+
+class UserSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     username = serializers.CharField(read_only=True)
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'first_name', 'last_name']
         read_only_fields = ['id']
 
-class AdminCreateUserSerializer(serializers.ModelSerializer):
+class AdminCreateUserSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'password','first_name', 'last_name']
@@ -56,18 +173,30 @@ class AdminCreateUserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False)
     class Meta:
         model = Product
-        fields = ['id', 'name', 'price', 'stock', 'status', 'created_at']
+        fields = ['id', 'sku', 'name', 'price', 'stock', 'status', 'created_at']
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """
+    Satu row import product. Keunikan sku sengaja tidak divalidasi di sini
+    (itu query per row); row dengan sku yang sudah ada justru di-update.
+    """
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
 
-class ProductForeignSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['sku', 'name', 'price', 'stock', 'status']
+        extra_kwargs = {'sku': {'required': True, 'allow_null': False, 'allow_blank': False, 'validators': []}}
+
+class ProductForeignSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'price']
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     product = ProductForeignSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(),
@@ -86,8 +215,53 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class InvitationSerializer(serializers.ModelSerializer):
+class OrderBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Satu item di POST /api/orders/bulk. product_id sengaja IntegerField biasa
+    (bukan PrimaryKeyRelatedField) supaya validasi tidak query per item;
+    semua product diambil sekaligus oleh view.
+    """
+    product_id = serializers.IntegerField()
+
+    class Meta:
+        model = Order
+        fields = ['product_id', 'customer_name', 'quantity', 'status']
+
+
+class InvitationSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Invitation
         fields = ['id', 'email', 'role', 'token', 'inviter', 'is_used', 'created_at', 'expires_at']
-        read_only_fields = ['token', 'inviter', 'is_used', 'created_at', 'expires_at']
\ No newline at end of file
+        read_only_fields = ['token', 'inviter', 'is_used', 'created_at', 'expires_at']
+
+class SalesReportQuerySerializer(serializers.Serializer):
+    """Query params GET /api/reports/sales."""
+    MAX_DAYS = 366
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    product = serializers.CharField(required=False)
+
+    def validate_product(self, value):
+        try:
+            return [int(pk) for pk in value.split(',') if pk.strip()]
+        except ValueError:
+            raise serializers.ValidationError('Comma-separated product ids expected.')
+
+    def validate(self, attrs):
+        days = (attrs['end'] - attrs['start']).days + 1
+        if days < 1:
+            raise serializers.ValidationError({'end': ['end must not be before start.']})
+        if days > self.MAX_DAYS:
+            raise serializers.ValidationError({'end': [f'At most {self.MAX_DAYS} days per report.']})
+        return attrs
+
+
+class DailyProductSalesSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    product_id = serializers.IntegerField()
+    product_name = serializers.CharField(source='product.name')
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2, coerce_to_string=False)
+
+    class Meta:
+        model = DailyProductSales
+        fields = ['date', 'product_id', 'product_name', 'orders', 'units', 'revenue']
@@ -1,6 +1,14 @@
-from django.db.models.signals import post_migrate
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from .authentication import invalidate_auth_version
+from .catalog import invalidate_catalog
+from .conditional import invalidate_resource_state
+from .metrics import install_query_counter
+from .models import Invitation, Order, PermissionGrant, Product
+from .permissions import bump_permission_version
+from .reports import record_order_change
 
 User = get_user_model()
 @receiver(post_migrate)
@@ -45,3 +53,71 @@ def create_default_admin(sender, **kwargs):
             )
 
             print("Default staff user created: staff / password123")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_auth_version_cache(sender, instance, **kwargs):
+    invalidate_auth_version(instance.pk)
+
+
+@receiver(post_save, sender=PermissionGrant)
+@receiver(post_delete, sender=PermissionGrant)
+def reset_permission_table(sender, **kwargs):
+    bump_permission_version()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def reset_catalog_cache(sender, **kwargs):
+    invalidate_catalog()
+
+
+RESOURCE_MODELS = {User: 'users', Product: 'products', Order: 'orders', Invitation: 'invitations'}
+
+
+# per sender: receiver tanpa sender membuat semua QuerySet.delete() (mis. prune_tokens)
+# tidak bisa fast-delete karena Django harus load tiap row untuk signal
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=Invitation)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=Invitation)
+def reset_resource_state(sender, **kwargs):
+    invalidate_resource_state(RESOURCE_MODELS[sender])
+
+
+def order_sales_before(instance):
+    # snapshot dari from_db; kalau tidak lengkap (field di-defer) baca ulang dari DB
+    before = getattr(instance, '_loaded_sales', None)
+    if before is None:
+        before = Order.objects.filter(pk=instance.pk).values(*Order.SALES_FIELDS).first()
+    return before
+
+
+@receiver(pre_save, sender=Order)
+@receiver(pre_delete, sender=Order)
+def remember_order_sales(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._sales_before = None if instance._state.adding else order_sales_before(instance)
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    after = instance.sales_state()
+    record_order_change(getattr(instance, '_sales_before', None), after)
+    instance._loaded_sales = after
+
+
+@receiver(post_delete, sender=Order)
+def remove_from_sales_rollup(sender, instance, **kwargs):
+    record_order_change(getattr(instance, '_sales_before', None), None)
+
+
+# query dihitung per request oleh MetricsMiddleware (lihat metrics.count_query)
+connection_created.connect(install_query_counter, dispatch_uid='adminapi_query_counter')
@@ -1,3 +1,2239 @@
-from django.test import TestCase
+import asyncio
+import base64
+import contextlib
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models import F
+from django.http import HttpResponse
+from django.urls import resolve
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from asgiref.sync import async_to_sync
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APITestCase
+from rest_framework.viewsets import ViewSetMixin
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .models import User, Product, Order, Invitation, PermissionGrant, EmailOutbox, DailyProductSales
+from .outbox import claim_batch, enqueue_invitation_email, process_outbox
+from .authentication import get_auth_version, invalidate_auth_version
+from .async_views import render_response
+from .benchmarks import SCENARIOS, compare_results, percentile, place_concurrent_orders
+from .catalog import CATALOG_VERSION_KEY, get_catalog_cache, get_or_compute
+from .checks import check_shared_cache
+from .conditional import get_resource_state
+from .imports import import_products
+from . import fastpath, metrics
+from .mysql_pool import pool as db_pool
+from .pagination import KeysetCursorPagination
+from .permissions import ROLE_PERMISSIONS, permission_table
+from .routers import ReplicaRouter, ReplicaRoutingMiddleware
+from .schema import LazySchemaMixin, schema_view
+from .throttling import TICK, TokenBucketThrottle, consume, get_throttle_cache, parse_rate
+from .serializers import CustomTokenObtainPairSerializer, InvitationSerializer, OrderSerializer, ProductSerializer
+from .signals import RESOURCE_MODELS
+from .tokens import BloomFilter, blacklist_filter
+from .views import InvitationViewSet, OrderViewSet, ProductViewSet, UserViewSet
+
+
+class ApiTestCase(APITestCase):
+    """
+    Base test case. User admin / manager / staff sudah dibuat oleh
+    signal post_migrate (lihat signals.py).
+    """
+
+    def setUp(self):
+        cache.clear()
+        # grant dari test sebelumnya sudah di-rollback tanpa signal
+        permission_table.expire()
+        self.users = {role: User.objects.filter(role=role).first() for role in ('admin', 'manager', 'staff')}
+
+    def login_as(self, role):
+        token = CustomTokenObtainPairSerializer.get_token(self.users[role]).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def create_products(self, count, **kwargs):
+        return Product.objects.bulk_create([
+            Product(name=f'Product {i}', price=Decimal('10.00') + i, stock=100, **kwargs)
+            for i in range(count)
+        ])
+
+    def create_orders(self, products, per_product=1):
+        return Order.objects.bulk_create([
+            Order(product=product, customer_name=f'Customer {product.pk}-{i}', quantity=1, total_price=product.price)
+            for product in products for i in range(per_product)
+        ])
+
+
+class KeysetPaginationTests(ApiTestCase):
+
+    def test_list_is_paginated_with_cursors(self):
+        self.create_products(5)
+        self.login_as('admin')
+
+        response = self.client.get('/api/products', {'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['previous'])
+        self.assertIn('cursor=', response.data['next'])
+
+    def test_walks_every_row_exactly_once(self):
+        products = self.create_products(7)
+        self.create_orders(products)
+        self.login_as('admin')
+
+        seen = []
+        url = '/api/orders?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_page_size_is_capped(self):
+        self.create_products(3)
+        self.login_as('admin')
+
+        with mock.patch.object(KeysetCursorPagination, 'max_page_size', 2):
+            response = self.client.get('/api/products', {'page_size': 100000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_users_paginate_on_date_joined(self):
+        self.login_as('admin')
+
+        response = self.client.get('/api/users', {'page_size': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_list_does_not_count(self):
+        self.create_products(3)
+        self.login_as('admin')
+        # COUNT untuk state ETag hanya jalan saat cache miss, bukan per halaman
+        get_resource_state('products', Product.objects.all())
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/products')
+
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+
+
+class QueryBudgetMixin:
+    """
+    Harness untuk memastikan jumlah query SQL per endpoint & role tidak
+    melewati budget. Budget dihitung dengan banyak baris di tabel supaya
+    N+1 langsung kelihatan.
+    """
+
+    def assertQueryBudget(self, role, method, url, max_queries, data=None):
+        self.login_as(role)
+        # budget dihitung dalam kondisi steady state: auth cache, tabel permission & state ETag sudah hangat
+        get_auth_version(self.users[role].pk)
+        permission_table.refresh()
+        for model, resource in RESOURCE_MODELS.items():
+            get_resource_state(resource, model.objects.all())
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, f'{method.upper()} {url} as {role}: {response.status_code}')
+        executed = len(ctx.captured_queries)
+        self.assertLessEqual(
+            executed, max_queries,
+            f'{method.upper()} {url} as {role} ran {executed} queries (budget {max_queries}):\n'
+            + '\n'.join(q['sql'] for q in ctx.captured_queries)
+        )
+        return response
+
+
+class QueryBudgetTests(QueryBudgetMixin, ApiTestCase):
+    # (role, method, url, max queries)
+    QUERY_BUDGETS = [
+        ('admin', 'get', '/api/users', 1),
+        ('manager', 'get', '/api/users', 1),
+        ('admin', 'get', '/api/products', 1),
+        ('manager', 'get', '/api/products', 1),
+        ('staff', 'get', '/api/products', 1),
+        ('admin', 'get', '/api/orders', 1),
+        ('manager', 'get', '/api/orders', 1),
+        ('admin', 'get', '/api/invitations', 1),
+        ('manager', 'get', '/api/invitations', 1),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        products = self.create_products(10)
+        self.create_orders(products, per_product=3)
+        Invitation.objects.bulk_create([
+            Invitation(email=f'user{i}@example.com', role='staff', inviter=self.users['admin'])
+            for i in range(10)
+        ])
+
+    def test_list_endpoints_stay_within_budget(self):
+        for role, method, url, max_queries in self.QUERY_BUDGETS:
+            with self.subTest(role=role, method=method, url=url):
+                self.assertQueryBudget(role, method, url, max_queries)
+
+    def test_order_detail_within_budget(self):
+        order = Order.objects.first()
+        self.assertQueryBudget('admin', 'get', f'/api/orders/{order.pk}', 1)
+
+
+class StatelessJWTAuthenticationTests(ApiTestCase):
+
+    def test_login_embeds_role_and_auth_version(self):
+        response = self.client.post('/api/login', {'username': 'manager', 'password': 'password123'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        token = AccessToken(response.data['access'])
+        self.assertEqual(token['role'], 'manager')
+        self.assertEqual(token['auth_version'], self.users['manager'].auth_version)
+
+    def test_login_permissions_exclude_internal_resources(self):
+        response = self.client.post('/api/login', {'username': 'admin', 'password': 'password123'}, format='json')
+
+        permissions = json.loads(base64.b64decode(response.data['permissions']))
+        self.assertEqual(set(permissions), {'users', 'products', 'orders', 'invitations'})
+        self.assertEqual(permissions['orders'], ROLE_PERMISSIONS['admin']['orders'])
+
+    def test_authenticated_request_skips_user_lookup(self):
+        self.login_as('staff')
+        self.client.get('/api/products')  # warm auth_version cache
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/products')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('adminapi_user' in q['sql'] for q in ctx.captured_queries))
+
+    def test_role_change_revokes_old_tokens(self):
+        self.login_as('manager')
+        self.assertEqual(self.client.get('/api/orders').status_code, 200)
+
+        manager = User.objects.get(pk=self.users['manager'].pk)
+        manager.role = 'staff'
+        manager.save()
+
+        response = self.client.get('/api/orders')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(manager.auth_version, self.users['manager'].auth_version + 1)
+
+    def test_deactivation_revokes_old_tokens(self):
+        self.login_as('staff')
+        self.assertEqual(self.client.get('/api/products').status_code, 200)
+
+        staff = User.objects.get(pk=self.users['staff'].pk)
+        staff.is_active = False
+        staff.save(update_fields=['is_active'])
+
+        self.assertEqual(self.client.get('/api/products').status_code, 401)
+
+    def test_unrelated_save_keeps_tokens_valid(self):
+        self.login_as('staff')
+        staff = User.objects.get(pk=self.users['staff'].pk)
+        staff.first_name = 'Renamed'
+        staff.save()
+
+        self.assertEqual(self.client.get('/api/products').status_code, 200)
+
+    def test_token_user_can_create_invitation(self):
+        self.login_as('manager')
+
+        response = self.client.post('/api/invitations', {'email': 'new@example.com', 'role': 'staff'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['inviter'], self.users['manager'].pk)
+
+    def test_token_without_role_claim_falls_back_to_db(self):
+        token = RefreshToken.for_user(self.users['staff']).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.assertEqual(self.client.get('/api/products').status_code, 200)
+
+
+class RolePermissionTests(ApiTestCase):
+    RESOURCE_URLS = {
+        'users': '/api/users',
+        'products': '/api/products',
+        'orders': '/api/orders',
+        'invitations': '/api/invitations',
+    }
+
+    def test_list_access_follows_role_permissions_matrix(self):
+        for role, resources in ROLE_PERMISSIONS.items():
+            self.login_as(role)
+            for resource, url in self.RESOURCE_URLS.items():
+                with self.subTest(role=role, resource=resource):
+                    expected = 200 if resources[resource]['read'] else 403
+                    self.assertEqual(self.client.get(url).status_code, expected)
+
+    def test_manager_can_update_but_not_create_products(self):
+        product = self.create_products(1)[0]
+        self.login_as('manager')
+
+        self.assertEqual(self.client.patch(f'/api/products/{product.pk}', {'stock': 5}, format='json').status_code, 200)
+        self.assertEqual(self.client.post('/api/products', {'name': 'X', 'price': 1}, format='json').status_code, 403)
+        self.assertEqual(self.client.delete(f'/api/products/{product.pk}').status_code, 403)
+
+    def test_revoke_is_checked_as_delete(self):
+        invitation = Invitation.objects.create(email='a@example.com', role='staff')
+
+        self.login_as('manager')
+        self.assertEqual(self.client.post(f'/api/invitations/{invitation.pk}/revoke').status_code, 403)
+
+        self.login_as('admin')
+        self.assertEqual(self.client.post(f'/api/invitations/{invitation.pk}/revoke').status_code, 200)
+
+    def test_db_grant_overrides_matrix_and_recompiles(self):
+        self.login_as('staff')
+        self.assertEqual(self.client.get('/api/orders').status_code, 403)
+
+        grant = PermissionGrant.objects.create(role='staff', resource='orders', action='read', allowed=True)
+        self.assertEqual(self.client.get('/api/orders').status_code, 200)
+
+        grant.delete()
+        self.assertEqual(self.client.get('/api/orders').status_code, 403)
+
+    def test_compiled_table_is_not_reloaded_without_version_change(self):
+        permission_table.allows('staff', 'products', 'read')
+
+        with self.assertNumQueries(0):
+            for _ in range(10):
+                permission_table.allows('staff', 'products', 'read')
+
+    def test_grant_from_other_worker_is_seen_after_check_interval(self):
+        permission_table.allows('staff', 'orders', 'read')
+        # worker lain menyimpan grant: DB dan versi di cache berubah, tabel process ini tidak di-expire
+        with mock.patch.object(permission_table, 'expire'):
+            PermissionGrant.objects.create(role='staff', resource='orders', action='read', allowed=True)
+
+        with mock.patch('adminapi.permissions.cache.get') as cache_get:
+            self.assertFalse(permission_table.allows('staff', 'orders', 'read'))
+        cache_get.assert_not_called()
+
+        permission_table.checked_at -= settings.PERMISSION_CHECK_INTERVAL
+        self.assertTrue(permission_table.allows('staff', 'orders', 'read'))
+
+    def test_compiled_table_expires_without_shared_cache(self):
+        permission_table.allows('staff', 'orders', 'read')
+        # locmem worker lain: versi di cache process ini tidak pernah berubah
+        with mock.patch('adminapi.signals.bump_permission_version'):
+            PermissionGrant.objects.create(role='staff', resource='orders', action='read', allowed=True)
+        permission_table.checked_at -= settings.PERMISSION_CHECK_INTERVAL
+        self.assertFalse(permission_table.allows('staff', 'orders', 'read'))
+
+        permission_table.loaded_at -= settings.PERMISSION_CACHE_TIMEOUT
+        permission_table.checked_at -= settings.PERMISSION_CHECK_INTERVAL
+        self.assertTrue(permission_table.allows('staff', 'orders', 'read'))
+
+    def test_locmem_cache_with_several_workers_warns(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertEqual([w.id for w in check_shared_cache(None)], ['adminapi.W001'])
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '1'}):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class TokenBlacklistTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        blacklist_filter.reset()
+        self.refresh = str(CustomTokenObtainPairSerializer.get_token(self.users['staff']))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [uuid.uuid4().hex for _ in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_refresh_skips_blacklist_query(self):
+        self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json')  # warm up
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_logged_out_token_cannot_refresh(self):
+        self.login_as('staff')
+        self.assertEqual(self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json').status_code, 200)
+
+        self.assertEqual(self.client.post('/api/logout', {'refresh': self.refresh}, format='json').status_code, 205)
+
+        self.assertEqual(self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json').status_code, 401)
+
+    def test_blacklist_from_other_process_is_picked_up_on_sync(self):
+        self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json')  # bangun filter
+        # blacklist langsung lewat simplejwt, tanpa lewat filter di process ini
+        RefreshToken(self.refresh).blacklist()
+        blacklist_filter.next_sync = 0
+
+        response = self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_rejected_after_role_change(self):
+        staff = User.objects.get(pk=self.users['staff'].pk)
+        staff.role = 'manager'
+        staff.save()
+
+        response = self.client.post('/api/token/refresh', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_prune_tokens_deletes_only_expired(self):
+        now = timezone.now()
+        expired = OutstandingToken.objects.bulk_create([
+            OutstandingToken(jti=uuid.uuid4().hex, token='', expires_at=now - timedelta(days=1))
+            for _ in range(5)
+        ])
+        BlacklistedToken.objects.create(token=expired[0])
+        live = OutstandingToken.objects.create(jti=uuid.uuid4().hex, token='', expires_at=now + timedelta(days=1))
+
+        call_command('prune_tokens', batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(list(OutstandingToken.objects.filter(expires_at__lte=now)), [])
+        self.assertTrue(OutstandingToken.objects.filter(pk=live.pk).exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP down')
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    """Catat ukuran setiap panggilan send_messages; gagal untuk recipient bad@..."""
+    calls = []
+
+    def send_messages(self, messages):
+        self.calls.append(len(messages))
+        if any('bad@example.com' in message.to for message in messages):
+            raise ConnectionError('mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class EmailOutboxTests(ApiTestCase):
+
+    def create_invitation(self):
+        self.login_as('admin')
+        response = self.client.post('/api/invitations', {'email': 'new@example.com', 'role': 'staff'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def test_create_enqueues_instead_of_sending(self):
+        response = self.create_invitation()
+
+        self.assertEqual(len(mail.outbox), 0)
+        row = EmailOutbox.objects.get()
+        self.assertEqual(row.status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(row.recipient, 'new@example.com')
+        self.assertIn(response.data['token'], row.body)
+
+    def test_worker_sends_batch(self):
+        for i in range(5):
+            Invitation.objects.create(email=f'user{i}@example.com', role='staff')
+        for invitation in Invitation.objects.all():
+            enqueue_invitation_email(invitation)
+
+        sent, failed = process_outbox(batch_size=10, workers=2)
+
+        self.assertEqual((sent, failed), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists())
+
+    def enqueue(self, *emails):
+        for email in emails:
+            enqueue_invitation_email(Invitation.objects.create(email=email, role='staff'))
+
+    def test_chunk_is_sent_with_one_call(self):
+        self.enqueue('a@example.com', 'b@example.com', 'c@example.com')
+        CountingEmailBackend.calls = []
+
+        with self.settings(EMAIL_BACKEND='adminapi.tests.CountingEmailBackend'):
+            self.assertEqual(process_outbox(batch_size=10), (3, 0))
+
+        self.assertEqual(CountingEmailBackend.calls, [3])
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_chunk_maps_error_to_its_row(self):
+        self.enqueue('a@example.com', 'bad@example.com', 'c@example.com')
+        CountingEmailBackend.calls = []
+
+        with self.settings(EMAIL_BACKEND='adminapi.tests.CountingEmailBackend'):
+            self.assertEqual(process_outbox(batch_size=10), (2, 1))
+
+        # satu panggilan batch, lalu satu per message untuk mencari yang gagal
+        self.assertEqual(CountingEmailBackend.calls, [3, 1, 1, 1])
+        failed = EmailOutbox.objects.get(status=EmailOutbox.STATUS_PENDING)
+        self.assertEqual(failed.recipient, 'bad@example.com')
+        self.assertIn('mailbox unavailable', failed.last_error)
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENT).count(), 2)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.create_invitation()
+
+        with self.settings(EMAIL_BACKEND='adminapi.tests.FailingEmailBackend'):
+            self.assertEqual(process_outbox(), (0, 1))
+
+        row = EmailOutbox.objects.get()
+        self.assertEqual(row.status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        self.assertIn('SMTP down', row.last_error)
+        # belum waktunya retry
+        self.assertEqual(process_outbox(), (0, 0))
+
+    def test_gives_up_after_max_attempts(self):
+        self.create_invitation()
+        EmailOutbox.objects.update(attempts=settings.EMAIL_OUTBOX['MAX_ATTEMPTS'] - 1)
+
+        with self.settings(EMAIL_BACKEND='adminapi.tests.FailingEmailBackend'):
+            process_outbox()
+
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.STATUS_FAILED)
+
+    def test_claimed_rows_are_not_claimed_twice(self):
+        self.create_invitation()
+
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_send_outbox_command(self):
+        self.create_invitation()
+
+        call_command('send_outbox', once=True, stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class BulkInvitationTests(ApiTestCase):
+
+    def test_creates_valid_items_and_reports_failures(self):
+        Invitation.objects.create(email='pending@example.com', role='staff')
+        self.login_as('manager')
+
+        payload = [
+            {'email': 'a@example.com', 'role': 'staff'},
+            {'email': 'not-an-email', 'role': 'staff'},
+            {'email': 'PENDING@example.com', 'role': 'staff'},
+            {'email': 'b@example.com', 'role': 'manager'},
+            {'email': 'a@example.com', 'role': 'staff'},
+        ]
+        get_auth_version(self.users['manager'].pk)
+        permission_table.refresh()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/invitations/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 3))
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'error', 'error', 'created', 'error'])
+        self.assertIsNotNone(response.data['results'][0]['invitation']['id'])
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+        # dedup 1 query + insert invitation 1 + insert outbox 1 (+ savepoint), tidak tergantung jumlah item
+        self.assertLessEqual(len(ctx.captured_queries), 5)
+
+
+    def test_expired_or_used_invitation_does_not_block(self):
+        Invitation.objects.create(email='old@example.com', role='staff', expires_at=timezone.now() - timedelta(days=1))
+        Invitation.objects.create(email='used@example.com', role='staff', is_used=True)
+        self.login_as('admin')
+
+        response = self.client.post('/api/invitations/bulk', {'invitations': [
+            {'email': 'old@example.com', 'role': 'staff'},
+            {'email': 'used@example.com', 'role': 'staff'},
+        ]}, format='json')
+
+        self.assertEqual(response.data['created'], 2)
+
+    def test_same_role_rules_as_create(self):
+        self.login_as('staff')
+
+        response = self.client.post('/api/invitations/bulk', [{'email': 'a@example.com', 'role': 'staff'}], format='json')
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_nothing_created_returns_400(self):
+        self.login_as('admin')
+
+        response = self.client.post('/api/invitations/bulk', [{'email': 'bad', 'role': 'staff'}], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Invitation.objects.count(), 0)
+
+
+class BulkOrderTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.products = self.create_products(3)
+        self.login_as('admin')
+        get_auth_version(self.users['admin'].pk)
+        permission_table.refresh()
+
+    def test_creates_orders_with_one_product_query(self):
+        payload = [
+            {'product_id': product.pk, 'customer_name': f'POS {i}', 'quantity': 1 + i % 3}
+            for i, product in enumerate(self.products * 20)
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 60)
+        self.assertEqual(Order.objects.count(), 60)
+        product_queries = [q for q in ctx.captured_queries if 'FROM "adminapi_product"' in q['sql']]
+        self.assertEqual(len(product_queries), 1)
+        order = Order.objects.select_related('product').get(customer_name='POS 4')
+        self.assertEqual(order.total_price, order.product.price * 2)
+
+    def test_created_orders_have_ids_without_returning(self):
+        # MySQL: bulk_create tidak mengisi pk
+        payload = [{'product_id': product.pk, 'customer_name': 'POS'} for product in self.products * 2]
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        ids = [result['order']['id'] for result in response.data['results']]
+        self.assertNotIn(None, ids)
+        self.assertEqual(sorted(ids), sorted(Order.objects.values_list('pk', flat=True)))
+        for result in response.data['results']:
+            self.assertEqual(Order.objects.get(pk=result['order']['id']).product_id, result['order']['product']['id'])
+
+    def test_duplicate_orders_get_ids_without_returning(self):
+        product = self.products[0]
+        # row identik yang sudah ada (mis. request lain di waktu yang sama)
+        Order.objects.create(product=product, customer_name='POS', quantity=1, total_price=product.price)
+        payload = [{'product_id': product.pk, 'customer_name': 'POS'}] * 3
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        ids = [result['order']['id'] for result in response.data['results']]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(Order.objects.filter(pk__in=ids).count(), 3)
+        # rollup dihitung sekali per order (lewat signal, bukan record_orders_created juga)
+        self.assertEqual(DailyProductSales.objects.get(product=product).orders, 4)
+
+    def test_atomic_mode_rejects_everything_on_any_error(self):
+        payload = {'orders': [
+            {'product_id': self.products[0].pk, 'customer_name': 'ok'},
+            {'product_id': 999999, 'customer_name': 'missing product'},
+            {'product_id': self.products[1].pk},
+        ]}
+
+        response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([r['index'] for r in response.data['results']], [1, 2])
+        self.assertFalse(Order.objects.exists())
+
+    def test_per_item_mode_creates_valid_items(self):
+        payload = {'atomic': False, 'orders': [
+            {'product_id': self.products[0].pk, 'customer_name': 'ok'},
+            {'product_id': 999999, 'customer_name': 'missing product'},
+        ]}
+
+        response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['results'][0]['order']['total_price'], self.products[0].price)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_manager_cannot_bulk_create(self):
+        self.login_as('manager')
+
+        response = self.client.post('/api/orders/bulk', [{'product_id': self.products[0].pk, 'customer_name': 'x'}], format='json')
+
+        self.assertEqual(response.status_code, 403)
+
+
+class StockReservationTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name='Hot item', price=Decimal('5.00'), stock=3)
+        self.login_as('admin')
+
+    def stock(self):
+        return Product.objects.get(pk=self.product.pk).stock
+
+    def order(self, quantity, **extra):
+        return self.client.post('/api/orders', {'product_id': self.product.pk, 'customer_name': 'c', 'quantity': quantity, **extra}, format='json')
+
+    def test_create_decrements_stock_and_rejects_oversell(self):
+        self.assertEqual(self.order(2).status_code, 201)
+        self.assertEqual(self.stock(), 1)
+
+        response = self.order(2)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.stock(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_stock_update_is_last_statement_before_commit(self):
+        # lock baris product dipegang sampai commit, jadi diambil paling akhir
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.order(1).status_code, 201)
+        statements = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertTrue(statements[-1].startswith('UPDATE "adminapi_product"'), statements)
+
+    def test_cancel_and_delete_restore_stock(self):
+        first = self.order(2).data['id']
+        second = self.order(1).data['id']
+        self.assertEqual(self.stock(), 0)
+
+        self.client.patch(f'/api/orders/{first}', {'status': 'Cancelled'}, format='json')
+        self.assertEqual(self.stock(), 2)
+
+        self.client.delete(f'/api/orders/{second}')
+        self.assertEqual(self.stock(), 3)
+
+        # order yang sudah cancelled tidak mengembalikan stock dua kali
+        self.client.delete(f'/api/orders/{first}')
+        self.assertEqual(self.stock(), 3)
+
+    def test_update_quantity_adjusts_stock(self):
+        order_id = self.order(1).data['id']
+
+        self.assertEqual(self.client.patch(f'/api/orders/{order_id}', {'quantity': 3}, format='json').status_code, 200)
+        self.assertEqual(self.stock(), 0)
+
+        self.assertEqual(self.client.patch(f'/api/orders/{order_id}', {'quantity': 4}, format='json').status_code, 409)
+        self.assertEqual(self.stock(), 0)
+        self.assertEqual(Order.objects.get(pk=order_id).quantity, 3)
+
+    def test_bulk_atomic_rolls_back_stock(self):
+        other = Product.objects.create(name='Other', price=Decimal('1.00'), stock=10)
+        payload = [
+            {'product_id': other.pk, 'customer_name': 'a', 'quantity': 5},
+            {'product_id': self.product.pk, 'customer_name': 'b', 'quantity': 2},
+            {'product_id': self.product.pk, 'customer_name': 'c', 'quantity': 2},
+        ]
+
+        response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Product.objects.get(pk=other.pk).stock, 10)
+        self.assertEqual(self.stock(), 3)
+        self.assertFalse(Order.objects.exists())
+
+    def test_bulk_per_item_fills_what_it_can(self):
+        payload = {'atomic': False, 'orders': [
+            {'product_id': self.product.pk, 'customer_name': 'b', 'quantity': 2},
+            {'product_id': self.product.pk, 'customer_name': 'c', 'quantity': 2},
+            {'product_id': self.product.pk, 'customer_name': 'd', 'quantity': 1},
+        ]}
+
+        response = self.client.post('/api/orders/bulk', payload, format='json')
+
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'error', 'created'])
+        self.assertEqual(self.stock(), 0)
+
+
+class ProductCacheTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name='Keyboard', price=Decimal('79.99'), stock=5)
+        self.login_as('staff')
+
+    def test_list_and_detail_are_served_from_cache(self):
+        first = self.client.get('/api/products?page_size=10')
+        detail = self.client.get(f'/api/products/{self.product.pk}')
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get('/api/products?page_size=10').data, first.data)
+            self.assertEqual(self.client.get(f'/api/products/{self.product.pk}').data, detail.data)
+        self.assertFalse([q for q in ctx.captured_queries if 'adminapi_product' in q['sql']])
+
+    def test_query_params_are_part_of_the_key(self):
+        self.create_products(3)
+        self.assertEqual(len(self.client.get('/api/products?page_size=2').data['results']), 2)
+        self.assertEqual(len(self.client.get('/api/products?page_size=10').data['results']), 4)
+
+    def test_save_delete_and_stock_changes_invalidate(self):
+        other = Product.objects.create(name='Mouse', price=Decimal('9.99'), stock=1)
+        self.client.get('/api/products')
+
+        self.product.name = 'Mechanical keyboard'
+        self.product.save()
+        self.assertIn('Mechanical keyboard', [p['name'] for p in self.client.get('/api/products').data['results']])
+
+        self.login_as('admin')
+        self.client.post('/api/orders', {'product_id': self.product.pk, 'customer_name': 'c', 'quantity': 2}, format='json')
+        self.assertEqual(self.client.get(f'/api/products/{self.product.pk}').data['stock'], 3)
+
+        other.delete()
+        self.assertEqual(len(self.client.get('/api/products').data['results']), 1)
+
+    def test_permission_is_checked_before_cache(self):
+        self.client.get('/api/products')
+        self.client.credentials()
+        self.assertEqual(self.client.get('/api/products').status_code, 401)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'ok': True}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_or_compute('catalog:test', compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'ok': True}] * 5)
+
+
+class ConditionalGetTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        products = self.create_products(3)
+        self.orders = self.create_orders(products)
+        Invitation.objects.create(email='new@example.com', role='staff')
+        self.login_as('admin')
+
+    def test_list_and_detail_send_validators(self):
+        for url in ('/api/users', '/api/products', '/api/orders', '/api/invitations', f'/api/products/{Product.objects.first().pk}'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['ETag'].startswith('"'))
+                self.assertIn('Last-Modified', response)
+
+    def test_if_none_match_returns_304_without_queries(self):
+        etag = self.client.get('/api/orders')['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get('/api/products')['Last-Modified']
+        self.assertEqual(self.client.get('/api/products', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_etag_depends_on_query_params(self):
+        etag = self.client.get('/api/orders')['ETag']
+        self.assertEqual(self.client.get('/api/orders?page_size=1', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_changes_invalidate_etag(self):
+        changes = [
+            lambda: self.client.patch(f'/api/orders/{self.orders[0].pk}', {'customer_name': 'Renamed'}, format='json'),
+            lambda: self.client.post('/api/orders', {'product_id': self.orders[0].product_id, 'customer_name': 'c'}, format='json'),
+            lambda: self.client.post('/api/orders/bulk', [{'product_id': self.orders[0].product_id, 'customer_name': 'b'}], format='json'),
+            lambda: self.client.delete(f'/api/orders/{self.orders[1].pk}'),
+        ]
+        for change in changes:
+            etag = self.client.get('/api/orders')['ETag']
+            self.assertLess(change().status_code, 300)
+            self.assertEqual(self.client.get('/api/orders', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_stock_reservation_keeps_catalog_cache_until_version_expires(self):
+        product = self.orders[0].product
+        etag = self.client.get(f'/api/products/{product.pk}')['ETag']
+
+        self.client.post('/api/orders', {'product_id': product.pk, 'customer_name': 'c', 'quantity': 1}, format='json')
+
+        # stock dari order tidak membuang cache katalog
+        response = self.client.get(f'/api/products/{product.pk}')
+        self.assertEqual(response.data['stock'], 100)
+
+        # versi katalog expire (PRODUCT_CACHE_TIMEOUT): body baru, ETag juga baru
+        get_catalog_cache().delete(CATALOG_VERSION_KEY)
+        response = self.client.get(f'/api/products/{product.pk}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stock'], 99)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_product_save_invalidates_catalog(self):
+        product = self.orders[0].product
+        etag = self.client.get(f'/api/products/{product.pk}')['ETag']
+
+        self.client.patch(f'/api/products/{product.pk}', {'price': '12.50'}, format='json')
+
+        response = self.client.get(f'/api/products/{product.pk}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['price'], 12.5)
+
+    def test_permission_is_checked_before_304(self):
+        etag = self.client.get('/api/orders')['ETag']
+        self.login_as('staff')
+        self.assertEqual(self.client.get('/api/orders', HTTP_IF_NONE_MATCH=etag).status_code, 403)
+
+
+class SparseFieldsetTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_orders(self.create_products(3))
+        self.login_as('admin')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response, [q['sql'] for q in ctx.captured_queries]
+
+    def test_fields_narrow_json_and_columns(self):
+        response, queries = self.get('/api/products?fields=id,name,price')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'price'})
+        select = next(sql for sql in queries if 'FROM "adminapi_product"' in sql and 'COUNT' not in sql.upper())
+        self.assertNotIn('"stock"', select)
+        self.assertNotIn('"status"', select)
+
+    def test_exclude(self):
+        response, _ = self.get('/api/products?exclude=stock,status')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'sku', 'name', 'price', 'created_at'})
+
+    def test_nested_product_fields(self):
+        response, queries = self.get('/api/orders?fields=id,quantity,product.name')
+
+        self.assertEqual(response.data['results'][0]['product'], {'name': response.data['results'][0]['product']['name']})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'quantity', 'product'})
+        select = next(sql for sql in queries if 'FROM "adminapi_order"' in sql and 'COUNT' not in sql.upper())
+        self.assertNotIn('"customer_name"', select)
+        self.assertNotIn('"adminapi_product"."price"', select)
+
+    def test_orders_without_product_skip_join(self):
+        response, queries = self.get('/api/orders?fields=id,customer_name')
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'customer_name'})
+        self.assertFalse([sql for sql in queries if 'JOIN "adminapi_product"' in sql])
+
+    def test_detail_and_pagination_still_work(self):
+        response, _ = self.get('/api/orders?fields=id&page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 1)
+
+        order = Order.objects.first()
+        response, _ = self.get(f'/api/orders/{order.pk}?fields=status')
+        self.assertEqual(response.data, {'status': order.status})
+
+    def test_unknown_fields_return_400(self):
+        for url in ('/api/products?fields=id,secret', '/api/orders?fields=product.stock', '/api/orders?exclude=product_id', '/api/users?fields=password'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('fields', response.data)
+
+    def test_writes_ignore_fields_param(self):
+        product = Product.objects.first()
+        response = self.client.post('/api/orders?fields=id', {'product_id': product.pk, 'customer_name': 'c'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('customer_name', response.data)
+
+
+class FilterOrderingTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.products = self.create_products(4)
+        self.orders = self.create_orders(self.products, per_product=2)
+        Order.objects.filter(pk=self.orders[0].pk).update(status='Shipped')
+        self.login_as('admin')
+
+    def results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_order_filters(self):
+        self.assertEqual([o['id'] for o in self.results('/api/orders?status=Shipped')], [self.orders[0].pk])
+        product = self.products[1]
+        self.assertEqual({o['product']['id'] for o in self.results(f'/api/orders?product={product.pk}')}, {product.pk})
+
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        self.assertEqual(self.results(f'/api/orders?created_after={future.replace("+", "%2B")}'), [])
+        self.assertEqual(len(self.results('/api/orders?created_before=2100-01-01')), len(self.orders))
+
+    def test_product_filters(self):
+        Product.objects.filter(pk=self.products[0].pk).update(status=False, stock=3)
+
+        self.assertEqual([p['id'] for p in self.results('/api/products?status=false')], [self.products[0].pk])
+        self.assertEqual([p['id'] for p in self.results('/api/products?stock_below=10')], [self.products[0].pk])
+        prices = [p['price'] for p in self.results('/api/products?price_min=11&price_max=12')]
+        self.assertEqual(sorted(prices), [11, 12])
+
+    def test_user_role_filter(self):
+        self.assertEqual({u['role'] for u in self.results('/api/users?role=manager')}, {'manager'})
+
+    def test_ordering_with_cursor_pagination(self):
+        Product.objects.filter(pk=self.products[3].pk).update(price=Decimal('10.00'))
+        first = self.client.get('/api/products?ordering=price&page_size=2')
+        second = self.client.get(first.data['next'])
+
+        prices = [p['price'] for p in first.data['results'] + second.data['results']]
+        self.assertEqual(prices, sorted(prices))
+        self.assertEqual(len({p['id'] for p in first.data['results'] + second.data['results']}), 4)
+
+    def test_invalid_filter_and_ordering_return_400(self):
+        for url in ('/api/products?ordering=name', '/api/orders?ordering=-total_price', '/api/products?price_min=abc',
+                    '/api/products?status=maybe', '/api/orders?created_after=yesterday'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_ordering_with_sparse_fields_loads_ordering_column(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/products?ordering=-stock&fields=id')
+        self.assertEqual(response.status_code, 200)
+        # satu SELECT saja: kolom stock ikut di-load, tidak ada query deferred per row
+        self.assertEqual(len([q for q in ctx.captured_queries if 'FROM "adminapi_product"' in q['sql'] and 'COUNT(' not in q['sql']]), 1)
+
+
+class FilterIndexTests(ApiTestCase):
+    """Filter yang umum dipakai report harus dilayani index (cek lewat EXPLAIN)."""
+
+    def setUp(self):
+        super().setUp()
+        self.create_orders(self.create_products(20), per_product=5)
+        self.login_as('admin')
+
+    def explain_list(self, url, table):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        sql = next(q['sql'] for q in ctx.captured_queries if f'FROM {connection.ops.quote_name(table)}' in q['sql'] and 'COUNT(' not in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            return ' '.join(str(column) for row in cursor.fetchall() for column in row)
+
+    def test_common_filters_use_index(self):
+        product = Product.objects.first()
+        # (url, table, index yang boleh dipilih planner)
+        cases = [
+            ('/api/orders?status=Pending', 'adminapi_order', {'order_status_created_idx'}),
+            (f'/api/orders?product={product.pk}', 'adminapi_order', {'order_product_created_idx'}),
+            ('/api/orders?created_after=2020-01-01', 'adminapi_order', {'order_created_id_idx'}),
+            ('/api/products?status=true&price_min=5&ordering=price', 'adminapi_product', {'product_status_price_idx', 'product_price_idx'}),
+            ('/api/products?stock_below=10&ordering=stock', 'adminapi_product', {'product_stock_idx'}),
+            ('/api/users?role=staff', 'adminapi_user', {'user_role_joined_idx'}),
+        ]
+        for url, table, indexes in cases:
+            with self.subTest(url=url):
+                plan = self.explain_list(url, table)
+                self.assertTrue(any(index in plan for index in indexes), plan)
+
+
+class SalesRollupTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.keyboard = Product.objects.create(name='Keyboard', price=Decimal('10.00'), stock=100)
+        self.mouse = Product.objects.create(name='Mouse', price=Decimal('4.00'), stock=100)
+        self.today = timezone.localdate()
+        self.login_as('admin')
+
+    def order(self, product, quantity):
+        return self.client.post('/api/orders', {'product_id': product.pk, 'customer_name': 'c', 'quantity': quantity}, format='json').data['id']
+
+    def rollup(self, product):
+        return DailyProductSales.objects.filter(product=product, date=self.today).values_list('orders', 'units', 'revenue').first()
+
+    def test_rollup_follows_create_update_cancel_delete(self):
+        first = self.order(self.keyboard, 2)
+        self.order(self.keyboard, 1)
+        self.assertEqual(self.rollup(self.keyboard), (2, 3, Decimal('30.00')))
+
+        self.client.patch(f'/api/orders/{first}', {'quantity': 5}, format='json')
+        self.assertEqual(self.rollup(self.keyboard), (2, 6, Decimal('30.00')))
+
+        self.client.patch(f'/api/orders/{first}', {'status': 'Cancelled'}, format='json')
+        self.assertEqual(self.rollup(self.keyboard), (1, 1, Decimal('10.00')))
+
+        Order.objects.filter(status='Pending').get().delete()
+        self.assertEqual(self.rollup(self.keyboard), (0, 0, Decimal('0.00')))
+
+    def test_bulk_orders_update_rollup(self):
+        self.client.post('/api/orders/bulk', [
+            {'product_id': self.keyboard.pk, 'customer_name': 'a', 'quantity': 1},
+            {'product_id': self.mouse.pk, 'customer_name': 'b', 'quantity': 3},
+            {'product_id': self.mouse.pk, 'customer_name': 'c', 'quantity': 1},
+        ], format='json')
+
+        self.assertEqual(self.rollup(self.keyboard), (1, 1, Decimal('10.00')))
+        self.assertEqual(self.rollup(self.mouse), (2, 4, Decimal('16.00')))
+
+    def test_rebuild_backfills_in_batches(self):
+        self.order(self.keyboard, 2)
+        self.order(self.mouse, 1)
+        old = Order.objects.create(product=self.mouse, customer_name='old', quantity=4, total_price=Decimal('16.00'))
+        # update() melewati signal: rollup jadi drift, rebuild yang memperbaiki
+        Order.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+
+        out = io.StringIO()
+        call_command('rebuild_sales_rollup', '--days-per-batch', '7', stdout=out)
+
+        self.assertIn('Wrote 3', out.getvalue())
+        self.assertEqual(set(DailyProductSales.objects.values_list('date', 'product_id', 'orders', 'units', 'revenue')), {
+            (self.today, self.keyboard.pk, 1, 2, Decimal('20.00')),
+            (self.today, self.mouse.pk, 1, 1, Decimal('4.00')),
+            (self.today - timedelta(days=40), self.mouse.pk, 1, 4, Decimal('16.00')),
+        })
+
+    def test_report_endpoint(self):
+        self.order(self.keyboard, 2)
+        self.order(self.mouse, 1)
+        url = f'/api/reports/sales?start={self.today - timedelta(days=6)}&end={self.today}'
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if 'adminapi_order' in q['sql']])
+        self.assertEqual(response.data['totals'], {'orders': 2, 'units': 3, 'revenue': 24.0})
+        self.assertEqual([r['product_name'] for r in response.data['results']], ['Keyboard', 'Mouse'])
+
+        response = self.client.get(f'{url}&product={self.mouse.pk}')
+        self.assertEqual(response.data['results'], [{
+            'date': str(self.today), 'product_id': self.mouse.pk, 'product_name': 'Mouse', 'orders': 1, 'units': 1, 'revenue': 4.0,
+        }])
+
+    def test_report_validation_and_permissions(self):
+        for query in ('', 'start=2025-01-10&end=2025-01-01', 'start=2024-01-01&end=2025-06-01', 'start=2025-01-01&end=2025-01-02&product=x'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/reports/sales?{query}').status_code, 400)
+
+        query = '/api/reports/sales?start=2025-01-01&end=2025-01-02'
+        self.login_as('manager')
+        self.assertEqual(self.client.get(query).status_code, 200)
+        self.login_as('staff')
+        self.assertEqual(self.client.get(query).status_code, 403)
+
+
+class ExportTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orders = self.create_orders(self.create_products(4), per_product=3)
+        Order.objects.filter(pk=self.orders[0].pk).update(status='Shipped')
+        self.login_as('admin')
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export(self):
+        response = self.client.get('/api/orders/export?format=csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment; filename="orders-', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(self.content(response))))
+        self.assertEqual(rows[0], ['id', 'product_id', 'product_name', 'customer_name', 'quantity', 'total_price', 'status', 'created_at'])
+        self.assertEqual(len(rows), len(self.orders) + 1)
+        order = self.orders[0]
+        self.assertEqual(rows[1][:7], [str(order.pk), str(order.product_id), order.product.name, order.customer_name, '1', str(float(order.total_price)), 'Shipped'])
+
+    def test_ndjson_export_with_filters(self):
+        response = self.client.get(f'/api/orders/export?format=ndjson&product={self.orders[3].product_id}')
+
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([line['id'] for line in lines], [o.pk for o in self.orders[3:6]])
+        self.assertTrue(lines[0]['created_at'].endswith('Z'))
+
+    def test_export_reads_in_keyset_chunks(self):
+        with self.settings(EXPORT_CHUNK_SIZE=5), CaptureQueriesContext(connection) as ctx:
+            lines = self.content(self.client.get('/api/orders/export?format=ndjson')).splitlines()
+
+        self.assertEqual(len(lines), len(self.orders))
+        selects = [q['sql'] for q in ctx.captured_queries if 'FROM "adminapi_order"' in q['sql']]
+        self.assertEqual(len(selects), 3)
+        self.assertTrue(all('LIMIT 5' in sql and 'JOIN "adminapi_product"' in sql for sql in selects))
+
+    def test_users_export_and_permissions(self):
+        self.login_as('manager')
+        rows = list(csv.reader(io.StringIO(self.content(self.client.get('/api/users/export?format=csv&role=staff')))))
+        self.assertEqual([row[1] for row in rows[1:]], ['staff'])
+
+        self.assertEqual(self.client.get('/api/orders/export?format=xml').status_code, 404)
+        self.login_as('staff')
+        response = self.client.get('/api/orders/export?format=csv')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_validation_error_is_json(self):
+        response = self.client.get('/api/orders/export?format=ndjson&created_after=yesterday')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('created_after', response.json())
+
+
+class ProductImportTests(ApiTestCase):
+
+    CSV = (
+        'sku,name,price,stock,status\n'
+        'KB-1,Keyboard,79.99,10,true\n'
+        'MS-1,Mouse,,5,true\n'
+        'MN-1,Monitor,199.00,,false\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.login_as('admin')
+
+    def upload(self, content, name='catalog.csv'):
+        file = io.BytesIO(content.encode('utf-8'))
+        file.name = name
+        return self.client.post('/api/products/import', {'file': file}, format='multipart')
+
+    def test_csv_import_reports_row_errors(self):
+        response = self.upload(self.CSV)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (2, 0, 1))
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        self.assertIn('price', response.data['errors'][0]['errors'])
+        monitor = Product.objects.get(sku='MN-1')
+        self.assertEqual((monitor.stock, monitor.status, monitor.price), (0, False, Decimal('199.00')))
+
+    def test_reimport_upserts_by_sku(self):
+        self.upload(self.CSV)
+        created_at = Product.objects.get(sku='KB-1').created_at
+
+        response = self.upload('{"sku": "KB-1", "name": "Keyboard v2", "price": 89.5, "stock": 3}\n'
+                               '\n'
+                               'not json\n'
+                               '{"sku": "HS-1", "name": "Headset", "price": 25}\n', name='catalog.ndjson')
+
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (1, 1, 1))
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        keyboard = Product.objects.get(sku='KB-1')
+        self.assertEqual((keyboard.name, keyboard.price, keyboard.stock), ('Keyboard v2', Decimal('89.50'), 3))
+        self.assertEqual(keyboard.created_at, created_at)
+        self.assertEqual(Product.objects.filter(sku__isnull=False).count(), 3)
+
+    def test_import_runs_one_upsert_per_chunk(self):
+        rows = ''.join(f'SKU-{i},Product {i},1.00,1,true\n' for i in range(25))
+        with CaptureQueriesContext(connection) as ctx:
+            result = import_products(io.StringIO('sku,name,price,stock,status\n' + rows), 'csv', chunk_size=10)
+
+        self.assertEqual(result['created'], 25)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "adminapi_product"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_import_invalidates_product_cache(self):
+        self.assertEqual(self.client.get('/api/products').data['results'], [])
+        self.upload(self.CSV)
+        self.assertEqual(len(self.client.get('/api/products').data['results']), 2)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fp:
+            fp.write(self.CSV)
+        self.addCleanup(os.remove, fp.name)
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_products', fp.name, stdout=out, stderr=err)
+
+        self.assertIn('Created 2, updated 0, failed 1', out.getvalue())
+        self.assertIn('line 3', err.getvalue())
+
+    def test_bad_upload_and_permissions(self):
+        self.assertEqual(self.upload('x', name='catalog.xlsx').status_code, 400)
+        self.assertEqual(self.client.post('/api/products/import', {}, format='multipart').status_code, 400)
+        self.login_as('manager')
+        self.assertEqual(self.upload(self.CSV).status_code, 403)
+
+
+class InvitationAcceptTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.invitation = Invitation.objects.create(email='New@Example.com', role='manager')
+
+    def accept(self, token=None, username='newbie'):
+        return self.client.post('/api/invitations/accept', {
+            'token': str(token or self.invitation.token), 'username': username, 'password': 'secret123',
+        }, format='json')
+
+    def test_accept_creates_user_and_consumes_invitation(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.accept()
+
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username='newbie')
+        self.assertEqual((user.email, user.role), ('New@example.com', 'manager'))
+        self.assertTrue(user.check_password('secret123'))
+        self.assertTrue(Invitation.objects.get(pk=self.invitation.pk).is_used)
+        # claim UPDATE, SELECT email/role, INSERT user (+ savepoint)
+        self.assertLessEqual(len([q for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]), 3)
+
+    def test_second_accept_is_rejected(self):
+        self.assertEqual(self.accept().status_code, 201)
+        response = self.accept(username='other')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], 'invitation invalid or expired')
+        self.assertFalse(User.objects.filter(username='other').exists())
+
+    def test_taken_username_keeps_invitation_usable(self):
+        response = self.accept(username='staff')
+
+        self.assertEqual(response.data['detail'], 'username exists')
+        self.assertFalse(Invitation.objects.get(pk=self.invitation.pk).is_used)
+        self.assertEqual(self.accept().status_code, 201)
+
+    def test_expired_and_unknown_tokens(self):
+        Invitation.objects.filter(pk=self.invitation.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.accept().data['detail'], 'invitation invalid or expired')
+        self.assertEqual(self.accept(token=uuid.uuid4()).data['detail'], 'Invalid or expired token')
+        self.assertEqual(self.accept(token='not-a-uuid').data['detail'], 'Invalid or expired token')
+
+
+class InvitationSweepTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        past = timezone.now() - timedelta(days=3)
+        self.expired = Invitation.objects.create(email='a@example.com', role='staff', expires_at=past)
+        self.used = Invitation.objects.create(email='b@example.com', role='staff', expires_at=past, is_used=True)
+        self.pending = Invitation.objects.create(email='c@example.com', role='staff')
+        self.outbox = enqueue_invitation_email(self.expired)
+
+    def test_sweep_deletes_expired_in_batches(self):
+        out = io.StringIO()
+        call_command('sweep_invitations', '--batch-size', '1', stdout=out)
+
+        self.assertIn('Swept 2', out.getvalue())
+        self.assertEqual(list(Invitation.objects.all()), [self.pending])
+        self.assertIsNone(EmailOutbox.objects.get(pk=self.outbox.pk).invitation_id)
+
+    def test_sweep_respects_age_and_archives(self):
+        Invitation.objects.filter(pk=self.used.pk).update(expires_at=timezone.now() - timedelta(days=10))
+        with tempfile.NamedTemporaryFile('r', suffix='.ndjson') as fp:
+            call_command('sweep_invitations', '--older-than-days', '7', '--archive', fp.name, stdout=io.StringIO())
+            archived = [json.loads(line) for line in fp]
+
+        self.assertEqual([row['email'] for row in archived], ['b@example.com'])
+        self.assertEqual(set(Invitation.objects.values_list('email', flat=True)), {'a@example.com', 'c@example.com'})
+
+    def test_sweep_deletes_each_batch_with_one_query(self):
+        past = timezone.now() - timedelta(days=3)
+        Invitation.objects.bulk_create([
+            Invitation(email=f'old{i}@example.com', role='staff', expires_at=past) for i in range(3)
+        ])
+
+        with CaptureQueriesContext(connection) as ctx, \
+                mock.patch('adminapi.management.commands.sweep_invitations.invalidate_resource_state') as invalidate:
+            call_command('sweep_invitations', '--batch-size', '2', stdout=io.StringIO())
+
+        # 4 unused (2 batch) + 1 used (1 batch); row tidak di-load untuk signal
+        deletes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(invalidate.call_count, 3)
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        # per pass: satu SELECT id per batch + satu yang kosong
+        self.assertEqual(len(selects), 5)
+        self.assertEqual(list(Invitation.objects.all()), [self.pending])
+
+    def test_sweep_query_uses_index(self):
+        plan = Invitation.objects.filter(is_used__in=[False], expires_at__lte=timezone.now()).explain()
+        self.assertIn('invitation_used_expires_idx', plan)
+
+
+class MetricsTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.create_orders(self.create_products(3))
+
+    def test_server_timing_header_is_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.post('/api/login', {'username': 'admin', 'password': 'x'}, format='json'))
+        self.login_as('admin')
+        self.assertNotIn('Server-Timing', self.client.get('/api/orders'))
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        self.login_as('admin')
+        response = self.client.get('/api/orders')
+
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", ser;dur=[\d.]+$')
+        self.assertNotIn('desc="0 queries"', timing)
+
+    def test_metrics_endpoint_for_admin(self):
+        self.login_as('admin')
+        self.client.get('/api/orders')
+        self.client.get('/api/orders')
+        response = self.client.get('/api/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        labels = 'view="order-list",method="GET",status="200"'
+        self.assertIn(f'adminapi_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'adminapi_request_db_queries_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f'adminapi_request_serializer_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'adminapi_response_size_bytes_count{{{labels}}} 2', body)
+
+    def test_metrics_endpoint_admin_only(self):
+        for role in ('manager', 'staff'):
+            self.login_as(role)
+            self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+        self.client.credentials()
+        self.assertEqual(self.client.get('/api/metrics').status_code, 401)
+
+    def test_threads_are_merged(self):
+        def work():
+            for _ in range(50):
+                request = metrics.RequestMetrics()
+                request.queries = 2
+                metrics.record(('order-list', 'GET', 200), request)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        histograms = metrics.collect()[('order-list', 'GET', 200)]
+        self.assertEqual(histograms[0].count, 200)
+        self.assertEqual(histograms[1].sum, 400)
+        # response_size tidak diisi -> tidak diobservasi
+        self.assertEqual(histograms[4].count, 0)
+
+
+class BenchmarkTests(ApiTestCase):
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare_results_flags_regressions(self):
+        baseline = [
+            {'name': 'GET /api/orders', 'role': 'admin', 'orders': 1000, 'p95_ms': 10.0, 'ops_per_sec': 100.0, 'queries_per_op': 1.0},
+            {'name': 'GET /api/orders', 'role': 'staff', 'orders': 1000, 'p95_ms': 1.0, 'ops_per_sec': 900.0, 'queries_per_op': 0.0},
+        ]
+        results = [
+            {'name': 'GET /api/orders', 'role': 'admin', 'orders': 1000, 'p95_ms': 11.5, 'ops_per_sec': 70.0, 'queries_per_op': 2.0},
+            {'name': 'GET /api/orders', 'role': 'staff', 'orders': 1000, 'p95_ms': 1.1, 'ops_per_sec': 850.0, 'queries_per_op': 0.0},
+            {'name': 'GET /api/orders', 'role': 'admin', 'orders': 100000, 'p95_ms': 99.0},
+        ]
+
+        regressions = compare_results(results, baseline, tolerance=0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('role=admin orders=1000: ops_per_sec 70.0 (baseline 100.0)', regressions[0])
+        self.assertIn('queries_per_op 2.0', regressions[1])
+
+    def test_endpoints_scenario(self):
+        results = SCENARIOS['endpoints']({'sizes': [200], 'iterations': 3})
+
+        self.assertEqual(Order.objects.count(), 200)
+        by_key = {(result['name'], result['role']): result for result in results}
+        self.assertEqual(len(by_key), 15)
+        self.assertEqual(by_key[('GET /api/orders', 'admin')]['status'], 200)
+        self.assertEqual(by_key[('GET /api/orders', 'staff')]['status'], 403)
+        self.assertEqual(by_key[('POST /api/login', 'manager')]['status'], 200)
+        for result in results:
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_list_rows_scenario(self):
+        results = SCENARIOS['list_rows']({'sizes': [200], 'iterations': 100})
+
+        self.assertEqual([result['name'] for result in results], [
+            'list_rows[products:serializer]', 'list_rows[products:fast]',
+            'list_rows[orders:serializer]', 'list_rows[orders:fast]',
+        ])
+        self.assertEqual(results[3]['rows'], 200)
+        self.assertIn('cpu_saved_ms_per_10k_rows', results[3])
+
+
+class AsyncReadTests(ApiTestCase):
+    """GET products / orders lewat view async (backend.asgi_urls) harus identik dengan jalur sync."""
+
+    def setUp(self):
+        super().setUp()
+        self.products = self.create_products(5)
+        self.orders = self.create_orders(self.products, per_product=2)
+
+    def get_both(self, path, headers=None):
+        sync_response = self.client.get(path, headers=headers)
+        with override_settings(ROOT_URLCONF='backend.asgi_urls'):
+            async_response = async_to_sync(self.async_client.get)(path, headers={**self.auth_headers, **(headers or {})})
+        return sync_response, async_response
+
+    def login_as(self, role):
+        super().login_as(role)
+        token = CustomTokenObtainPairSerializer.get_token(self.users[role]).access_token
+        self.auth_headers = {'Authorization': f'Bearer {token}'}
+
+    def assertSameResponse(self, path, headers=None):
+        sync_response, async_response = self.get_both(path, headers)
+        self.assertEqual(async_response.status_code, sync_response.status_code, path)
+        self.assertEqual(async_response.content, sync_response.content, path)
+        for header in ('Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Allow', 'WWW-Authenticate'):
+            self.assertEqual(async_response.get(header), sync_response.get(header), f'{path} {header}')
+        return async_response
+
+    def test_async_view_is_used(self):
+        with override_settings(ROOT_URLCONF='backend.asgi_urls'):
+            match = resolve('/api/orders')
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
+        self.assertEqual(match.view_name, 'order-list')
+
+    def test_lists_and_details_match_sync(self):
+        self.login_as('admin')
+        for path in (
+            '/api/products', '/api/orders', '/api/orders?page_size=3', '/api/orders?status=Pending&ordering=-updated_at',
+            '/api/orders?fields=id,product.name', '/api/products?ordering=price&price_min=11',
+            f'/api/products/{self.products[0].pk}', f'/api/orders/{self.orders[0].pk}', '/api/orders/999999',
+            '/api/orders?ordering=customer_name',
+        ):
+            self.assertSameResponse(path)
+
+    def test_rendered_response_keeps_cookies(self):
+        response = Response({'ok': True})
+        response.accepted_renderer = fastpath.FastJSONRenderer()
+        response.accepted_media_type = 'application/json'
+        response.renderer_context = {}
+        response.set_cookie('csrftoken', 'abc', httponly=True)
+
+        rendered = render_response(response)
+
+        self.assertEqual(rendered.content, b'{"ok":true}')
+        self.assertEqual(rendered.cookies['csrftoken'].value, 'abc')
+        self.assertTrue(rendered.cookies['csrftoken']['httponly'])
+
+    def test_cursor_pages_match_sync(self):
+        self.login_as('manager')
+        response = self.assertSameResponse('/api/orders?page_size=4')
+        next_url = json.loads(response.content)['next']
+        response = self.assertSameResponse(next_url.replace('http://testserver', ''))
+        previous = json.loads(response.content)['previous']
+        self.assertSameResponse(previous.replace('http://testserver', ''))
+
+    def test_permissions_and_auth_match_sync(self):
+        self.login_as('staff')
+        self.assertEqual(self.assertSameResponse('/api/orders').status_code, 403)
+        self.assertEqual(self.assertSameResponse('/api/products').status_code, 200)
+
+        self.auth_headers = {}
+        self.client.credentials()
+        response = self.assertSameResponse('/api/products')
+        self.assertEqual(response.status_code, 401)
+
+        self.auth_headers = {'Authorization': 'Bearer not-a-token'}
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.assertSameResponse('/api/orders').status_code, 401)
+
+    def test_not_modified_and_revoked_token(self):
+        self.login_as('admin')
+        etag = self.client.get('/api/orders')['ETag']
+        self.assertEqual(self.assertSameResponse('/api/orders', {'If-None-Match': etag}).status_code, 304)
+
+        User.objects.filter(pk=self.users['admin'].pk).update(auth_version=F('auth_version') + 1)
+        invalidate_auth_version(self.users['admin'].pk)
+        self.assertEqual(self.assertSameResponse('/api/orders').status_code, 401)
+
+    def test_writes_go_to_sync_viewset(self):
+        self.login_as('admin')
+        with override_settings(ROOT_URLCONF='backend.asgi_urls'):
+            response = async_to_sync(self.async_client.patch)(
+                f'/api/products/{self.products[0].pk}', {'stock': 7}, content_type='application/json', headers=self.auth_headers,
+            )
+            created = async_to_sync(self.async_client.post)('/api/orders/bulk', [
+                {'product_id': self.products[1].pk, 'customer_name': 'Bulk', 'quantity': 1},
+            ], content_type='application/json', headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, 7)
+        self.assertEqual(created.status_code, 201)
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_async_request_is_measured(self):
+        self.login_as('admin')
+        _, response = self.get_both('/api/orders')
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+
+class FastPathTests(ApiTestCase):
+    """
+    Golden test: list lewat FastListMixin + FastJSONRenderer harus identik
+    byte per byte dengan serializer + JSONRenderer DRF.
+    """
+
+    def setUp(self):
+        super().setUp()
+        products = self.create_products(4)
+        Product.objects.filter(pk=products[0].pk).update(sku='SKU-1', name='Kopi \u2028 susu é', price=Decimal('0.01'), status=False)
+        Product.objects.filter(pk=products[1].pk).update(price=Decimal('99999999.99'), stock=0)
+        self.orders = self.create_orders(products, per_product=2)
+        Order.objects.filter(pk=self.orders[0].pk).update(status='Completed', total_price=Decimal('1234.50'))
+        self.login_as('manager')
+
+    def get(self, path, fast=True, use_orjson=True):
+        cache.clear()
+        with override_settings(FAST_READ_PATH=fast), mock.patch.object(fastpath, 'orjson', fastpath.orjson if use_orjson else None):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return response.content
+
+    def assertGolden(self, path):
+        expected = self.get(path, fast=False, use_orjson=False)
+        self.assertEqual(self.get(path), expected, path)
+        self.assertEqual(self.get(path, use_orjson=False), expected, path)
+        return expected
+
+    def test_lists_match_serializer_output(self):
+        for path in (
+            '/api/products', '/api/products?ordering=price', '/api/products?status=false',
+            '/api/orders', '/api/orders?ordering=-updated_at', '/api/orders?status=Completed',
+        ):
+            self.assertGolden(path)
+
+    def test_sparse_fieldsets_match(self):
+        for path in (
+            '/api/products?fields=id,sku,price', '/api/products?exclude=created_at',
+            '/api/orders?fields=id,product.price,created_at', '/api/orders?exclude=product',
+            '/api/orders?fields=product.name,total_price',
+        ):
+            self.assertGolden(path)
+
+    def test_cursor_pages_match(self):
+        body = json.loads(self.assertGolden('/api/orders?page_size=3'))
+        while body['next']:
+            body = json.loads(self.assertGolden(body['next']))
+
+    def test_special_values_are_encoded_like_drf(self):
+        body = self.assertGolden('/api/products?ordering=price')
+        self.assertIn(b'Kopi \\u2028 susu \xc3\xa9', body)
+        self.assertIn(b'"price":0.01', body)
+        self.assertIn(b'"price":99999999.99', body)
+        self.assertIn(b'"sku":null', body)
+
+    def test_fast_path_skips_serializer(self):
+        with mock.patch.object(OrderSerializer, 'to_representation') as to_representation:
+            self.get('/api/orders')
+        to_representation.assert_not_called()
+
+    def test_unsupported_serializer_falls_back(self):
+        self.assertIsNotNone(fastpath.row_plan(ProductSerializer()))
+        self.assertIsNotNone(fastpath.row_plan(OrderSerializer()))
+        # inviter adalah PrimaryKeyRelatedField
+        self.assertIsNone(fastpath.row_plan(InvitationSerializer()))
+
+    def test_renderer_matches_json_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+        from django.utils.translation import gettext_lazy
+
+        data = {
+            'when': timezone.now(), 'price': Decimal('10.50'), 'id': uuid.uuid4(), 'label': gettext_lazy('Orders'),
+            'big': 2 ** 70, 'nested': [{'text': 'a\u2029b', 'none': None}], 'ok': True,
+        }
+        for value in (data, {1: 'int key'}, [], None):
+            self.assertEqual(fastpath.FastJSONRenderer().render(value), JSONRenderer().render(value), value)
+
+
+class FakeConnection:
+    """Pengganti koneksi MySQLdb untuk test pool."""
+
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def ping(self):
+        if not self.alive:
+            raise OSError('gone away')
+
+    def rollback(self):
+        if not self.alive:
+            raise OSError('gone away')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def make_pool(self, **kwargs):
+        self.opened = []
+
+        def connect():
+            self.opened.append(FakeConnection(len(self.opened) + 1))
+            return self.opened[-1]
+        return db_pool.ConnectionPool(connect, **kwargs)
+
+    def test_connections_are_reused(self):
+        pool = self.make_pool(max_size=2)
+        conn = pool.acquire()
+        conn.close()
+        again = pool.acquire()
+
+        self.assertIs(again, conn)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(self.opened[0].rollbacks, 1)
+        self.assertEqual(pool.snapshot()['checkouts'], 2)
+        # atribut lain diteruskan ke koneksi asli
+        self.assertEqual(again.number, 1)
+
+    def test_min_size_is_prefilled(self):
+        pool = self.make_pool(min_size=3, max_size=5)
+        pool.acquire()
+        self.assertEqual(len(self.opened), 3)
+        self.assertEqual(pool.snapshot()['idle'], 2)
+
+    def test_full_pool_waits_then_times_out(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(db_pool.PoolTimeout):
+            pool.acquire()
+
+        threading.Timer(0.02, conn.close).start()
+        pool.timeout = 2
+        self.assertIs(pool.acquire(), conn)
+        snapshot = pool.snapshot()
+        self.assertEqual((snapshot['timeouts'], snapshot['waits']), (1, 1))
+        self.assertGreater(snapshot['wait_seconds'], 0)
+
+    def test_dead_connection_is_replaced_on_checkout(self):
+        pool = self.make_pool(max_size=1)
+        conn = pool.acquire()
+        conn.close()
+        self.opened[0].alive = False
+
+        fresh = pool.acquire()
+
+        self.assertEqual(fresh.number, 2)
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual(pool.snapshot()['broken'], 1)
+
+    def test_ping_interval_skips_recent_connections(self):
+        pool = self.make_pool(ping_interval=60)
+        pool.acquire().close()
+        self.opened[0].alive = False
+        # idle < ping_interval: tidak di-ping, langsung dipakai
+        self.assertEqual(pool.acquire().number, 1)
+
+    def test_old_connections_are_recycled(self):
+        pool = self.make_pool(max_lifetime=60)
+        conn = pool.acquire()
+        conn.created_at -= 61
+        conn.close()
+
+        self.assertEqual(pool.acquire().number, 2)
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual(pool.snapshot()['recycled'], 1)
+
+    def test_failed_rollback_discards_connection(self):
+        pool = self.make_pool()
+        conn = pool.acquire()
+        self.opened[0].alive = False
+        conn.close()
+        self.assertEqual(pool.snapshot()['size'], 0)
+
+    def test_concurrent_checkouts_respect_max_size(self):
+        pool = self.make_pool(max_size=3)
+        in_use = []
+        peak = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                conn = pool.acquire()
+                with lock:
+                    in_use.append(conn)
+                    peak.append(len(in_use))
+                time.sleep(0.001)
+                with lock:
+                    in_use.remove(conn)
+                conn.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(max(peak), 3)
+        self.assertLessEqual(len(self.opened), 3)
+        self.assertEqual(pool.snapshot()['checkouts'], 160)
+
+    def test_pool_metrics_are_exported(self):
+        key = ('default', 'app@db:3306/shop')
+        pool = db_pool.get_pool(key, lambda: self.make_pool(max_size=4))
+        self.addCleanup(db_pool._pools.pop, key)
+        self.assertIs(db_pool.get_pool(key, lambda: None), pool)
+        pool.acquire()
+
+        body = metrics.render_prometheus()
+
+        self.assertIn('adminapi_db_pool_in_use{alias="default",database="app@db:3306/shop"} 1', body)
+        self.assertIn('adminapi_db_pool_checkouts_total{alias="default",database="app@db:3306/shop"} 1', body)
+        self.assertIn('# TYPE adminapi_db_pool_wait_seconds_total counter', body)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], REPLICA_STICKY_SECONDS=10, REPLICA_HEALTH_CHECK_INTERVAL=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Router diuji tanpa koneksi ke replica: check() (ping replica) di-mock,
+    dan view-nya hanya mencatat database yang dipilih untuk read. Bukan
+    TestCase karena read di dalam transaksi test selalu ke primary.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.users = {role: User(pk=pk, username=role, role=role) for pk, role in enumerate(('admin', 'manager', 'staff'), start=1)}
+        self.router = ReplicaRouter()
+        self.router.check = mock.Mock(return_value=True)
+        self.factory = RequestFactory()
+
+    def token(self, role):
+        return f'Bearer {AccessToken.for_user(self.users[role])}'
+
+    def request(self, method, role=None, write=False, status=200, authenticated=True):
+        """Jalankan satu request lewat middleware; hasilnya database untuk read di view."""
+        chosen = []
+
+        def view(request):
+            if role and authenticated:
+                # seperti DRF setelah token diverifikasi
+                request.user, request.auth = self.users[role], 'token'
+            if write:
+                self.router.db_for_write(Product)
+            chosen.append(self.router.db_for_read(Product))
+            return HttpResponse(status=status)
+
+        headers = {'HTTP_AUTHORIZATION': self.token(role)} if role else {}
+        ReplicaRoutingMiddleware(view)(self.factory.generic(method, '/api/products', **headers))
+        return chosen[0]
+
+    def test_reads_round_robin_over_replicas(self):
+        self.assertEqual(
+            [self.request('GET', 'staff') for _ in range(4)],
+            ['replica1', 'replica2', 'replica1', 'replica2'],
+        )
+
+    def test_unsafe_methods_use_primary(self):
+        for method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            self.assertEqual(self.request(method), 'default')
+
+    def test_reads_after_write_stick_to_primary(self):
+        self.request('POST', 'manager')
+
+        self.assertEqual(self.request('GET', 'manager'), 'default')
+        # user lain tidak terpengaruh
+        self.assertIn(self.request('GET', 'staff'), ('replica1', 'replica2'))
+
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            self.request('POST', 'staff')
+        cache.clear()
+        self.assertIn(self.request('GET', 'manager'), ('replica1', 'replica2'))
+
+    def test_failed_or_unauthenticated_write_does_not_stick(self):
+        self.request('POST', 'manager', status=403)
+        self.request('POST', 'staff', authenticated=False)
+
+        self.assertIn(self.request('GET', 'manager'), ('replica1', 'replica2'))
+        self.assertIn(self.request('GET', 'staff'), ('replica1', 'replica2'))
+
+    def test_write_inside_get_pins_rest_of_request(self):
+        self.assertEqual(self.request('GET', 'staff', write=True), 'default')
+
+    def test_unhealthy_replica_is_skipped_until_recheck(self):
+        self.router.check.side_effect = lambda alias: alias != 'replica1'
+        with mock.patch('adminapi.routers.time.monotonic', return_value=100.0):
+            self.assertEqual([self.request('GET') for _ in range(3)], ['replica2'] * 3)
+        self.assertEqual(self.router.check.call_count, 2)
+
+        self.router.check.side_effect = None
+        with mock.patch('adminapi.routers.time.monotonic', return_value=106.0):
+            self.assertEqual({self.request('GET') for _ in range(2)}, {'replica1', 'replica2'})
+
+    def test_all_replicas_down_falls_back_to_primary(self):
+        self.router.check.return_value = False
+        self.assertEqual(self.request('GET'), 'default')
+
+    def test_outside_request_uses_primary(self):
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_event_loop_uses_only_checked_replicas(self):
+        chosen = []
+
+        async def view(request):
+            chosen.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        read = async_to_sync(ReplicaRoutingMiddleware(view))
+        # belum pernah dicek (dan di event loop tidak boleh dicek): primary
+        read(self.factory.get('/api/products'))
+        self.router.check.assert_not_called()
+
+        self.router.check.side_effect = lambda alias: alias != 'replica1'
+        self.router.healthy('replica1')
+        self.router.healthy('replica2')
+        with mock.patch('adminapi.routers.time.monotonic', return_value=time.monotonic() + 60):
+            # hasil cek sudah basi: yang terakhir sehat tetap dipakai, yang down tidak
+            read(self.factory.get('/api/products'))
+            read(self.factory.get('/api/products'))
+
+        self.assertEqual(chosen, ['default', 'replica2', 'replica2'])
+        self.assertEqual(self.router.check.call_count, 2)
+
+    def test_async_middleware_sticks_after_write(self):
+        # cek kesehatan dilakukan di thread sync (di event loop hanya dibaca)
+        self.router.healthy('replica1')
+        self.router.healthy('replica2')
+        chosen = []
+
+        async def view(request):
+            request.user, request.auth = self.users['admin'], 'token'
+            chosen.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        headers = {'HTTP_AUTHORIZATION': self.token('admin')}
+        async_to_sync(middleware)(self.factory.get('/api/products', **headers))
+        async_to_sync(middleware)(self.factory.post('/api/products', **headers))
+        async_to_sync(middleware)(self.factory.get('/api/products', **headers))
+
+        self.assertEqual(chosen, ['replica1', 'default', 'default'])
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(self.router.allow_migrate('replica1', 'adminapi'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'adminapi'))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'replica disimulasikan dengan file SQLite kedua')
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_STICKY_SECONDS=10, REPLICA_HEALTH_CHECK_INTERVAL=0)
+class ReplicaEndToEndTests(TransactionTestCase):
+    """
+    Dua database SQLite sungguhan: primary (database test) dan replica1, file
+    terpisah berisi snapshot primary (backup API sqlite3). Write sesudah
+    snapshot tidak ada di replica, seperti lag replikasi, jadi isi response
+    menunjukkan database mana yang melayani read.
+
+    replica1 tidak ada di settings.DATABASES, jadi alias-nya didaftarkan ke
+    connections hanya selama class ini; `databases` baru ditambah di
+    setUpClass karena test runner mengecek (dan membuat database test untuk)
+    semua alias di `databases` sebelum test jalan.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings['replica1'] = {
+            **connections['default'].settings_dict, 'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3'),
+        }
+        cls.databases = {'default', 'replica1'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica1'].close()
+        del connections['replica1']
+        del connections.settings['replica1']
+        cls.databases = {'default'}
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        permission_table.expire()
+        self.product = Product.objects.create(name='Replicated', price=Decimal('5.00'), stock=10)
+        Order.objects.create(product=self.product, customer_name='replicated', total_price=Decimal('5.00'))
+        # "replikasi": salin primary ke replica, lalu satu write yang belum sampai
+        for alias in ('default', 'replica1'):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(connections['replica1'].connection)
+        Order.objects.create(product=self.product, customer_name='lagging', total_price=Decimal('5.00'))
+
+    def client_for(self, role):
+        client = APIClient()
+        token = CustomTokenObtainPairSerializer.get_token(User.objects.get(role=role)).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def read_orders(self, client, aliases=('default', 'replica1')):
+        """Nama customer di GET /api/orders, dan alias (dari `aliases`) yang menjalankan query."""
+        with contextlib.ExitStack() as stack:
+            captured = {alias: stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in aliases}
+            response = client.get('/api/orders')
+        self.assertEqual(response.status_code, 200)
+        served = {alias for alias, ctx in captured.items() if ctx.captured_queries}
+        return {order['customer_name'] for order in response.data['results']}, served
+
+    def test_writer_reads_own_write_from_primary(self):
+        admin, manager = self.client_for('admin'), self.client_for('manager')
+
+        self.assertEqual(self.read_orders(admin), ({'replicated'}, {'replica1'}))
+
+        response = admin.post('/api/orders', {'product_id': self.product.pk, 'customer_name': 'written', 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        # admin baru menulis: primary, termasuk order yang belum direplikasi
+        self.assertEqual(self.read_orders(admin), ({'replicated', 'lagging', 'written'}, {'default'}))
+        # user lain tetap membaca dari replica
+        self.assertEqual(self.read_orders(manager), ({'replicated'}, {'replica1'}))
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        replica = connections['replica1']
+        name = replica.settings_dict['NAME']
+        replica.close()
+        replica.settings_dict['NAME'] = os.path.join(self.replica_dir.name, 'missing', 'replica.sqlite3')
+        try:
+            # CaptureQueriesContext membuka koneksi, jadi replica tidak ikut dicatat
+            names, served = self.read_orders(self.client_for('manager'), aliases=('default',))
+            self.assertEqual((names, served), ({'replicated', 'lagging'}, {'default'}))
+            self.assertIsNone(replica.connection)
+        finally:
+            replica.settings_dict['NAME'] = name
+
+
+@override_settings(THROTTLE_RATES={
+    'login_ip': '6/min,3', 'login_username': '2/min,2', 'refresh_ip': '6/min,2', 'accept_ip': '6/min,2',
+})
+class ThrottleTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # jam tetap: bucket tidak terisi ulang di tengah test
+        self.now = 1000.0
+        patcher = mock.patch.object(TokenBucketThrottle, 'timer', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, username='manager', ip='10.0.0.1', password='wrong'):
+        return self.client.post('/api/login', {'username': username, 'password': password}, format='json', REMOTE_ADDR=ip)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('6/min,3'), (0.1, 3))
+        self.assertEqual(parse_rate('10/s'), (10, 10))
+
+    def test_bucket_refills_at_rate_up_to_burst(self):
+        # 1 token / 10 detik, burst 3
+        self.assertEqual([consume('bucket', 0.1, 3, now=1000) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(consume('bucket', 0.1, 3, now=1000), 10)
+        # yang ditolak tidak memakai token
+        self.assertAlmostEqual(consume('bucket', 0.1, 3, now=1005), 5)
+        self.assertEqual(consume('bucket', 0.1, 3, now=1010), 0)
+        self.assertGreater(consume('bucket', 0.1, 3, now=1010), 0)
+        # lama idle: bucket penuh lagi, tapi tidak lebih dari burst
+        self.assertEqual([consume('bucket', 0.1, 3, now=5000) for _ in range(3)], [0, 0, 0])
+        self.assertGreater(consume('bucket', 0.1, 3, now=5000), 0)
+
+    def test_busy_bucket_ttl_is_refreshed(self):
+        # bucket 1 token / 10 detik, TTL key 3600 detik (jam cache ikut dipalsukan)
+        cache = get_throttle_cache()
+        with mock.patch('time.time', return_value=0):
+            consume('busy', 0.1, 3, now=1000)
+        with mock.patch('time.time', return_value=3000):
+            self.assertEqual(consume('busy', 0.1, 3, now=1000), 0)
+        # lewat TTL awal, tapi key dipakai 1000 detik yang lalu: state masih ada
+        with mock.patch('time.time', return_value=4000):
+            self.assertEqual(cache.get('busy'), int(1000 * 0.1 * TICK) + 2 * TICK)
+
+    def test_no_extra_token_across_tick_boundary(self):
+        self.assertEqual([consume('edge', 0.1, 3, now=1009.9) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(consume('edge', 0.1, 3, now=1010.05), 9.85, places=2)
+        self.assertEqual(consume('edge', 0.1, 3, now=1019.9), 0)
+
+    def test_spoofed_forwarded_for_does_not_reset_ip_bucket(self):
+        # tanpa NUM_PROXIES, X-Forwarded-For dari client tidak dipercaya
+        with self.settings(THROTTLE_RATES={**settings.THROTTLE_RATES, 'login_ip': '2/min'}):
+            statuses = [
+                self.client.post(
+                    '/api/login', {'username': f'user{i}', 'password': 'wrong'}, format='json',
+                    REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'198.51.100.{i}',
+                ).status_code
+                for i in range(5)
+            ]
+
+        self.assertEqual(statuses, [401, 401, 429, 429, 429])
+
+    def test_login_rejected_by_ip_before_hashing(self):
+        for i in range(3):
+            self.assertEqual(self.login(f'user{i}').status_code, 401)
+
+        with mock.patch('django.contrib.auth.backends.ModelBackend.authenticate') as authenticate, \
+                CaptureQueriesContext(connection) as ctx:
+            response = self.login('user9')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 10)
+        authenticate.assert_not_called()
+        self.assertEqual(len(ctx.captured_queries), 0)
+        # IP lain tidak terpengaruh
+        self.assertEqual(self.login('user9', ip='10.0.0.2').status_code, 401)
+
+    def test_login_rejected_by_username_across_ips(self):
+        self.assertEqual(self.login('Manager', ip='10.0.0.1').status_code, 401)
+        self.assertEqual(self.login('manager', ip='10.0.0.2').status_code, 401)
+        self.assertEqual(self.login('manager', ip='10.0.0.3', password='password123').status_code, 429)
+        self.assertEqual(self.login('staff', ip='10.0.0.3', password='password123').status_code, 200)
+
+    def test_refresh_throttled_by_ip(self):
+        refresh = str(RefreshToken.for_user(self.users['staff']))
+        statuses = [
+            self.client.post('/api/token/refresh', {'refresh': refresh}, format='json').status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses[-1], 429)
+        # 10 detik kemudian satu token kembali
+        self.now += 10
+        self.assertEqual(self.client.post('/api/token/refresh', {'refresh': refresh}, format='json').status_code, 200)
+
+    def test_accept_throttled_before_hashing(self):
+        for _ in range(2):
+            self.client.post('/api/invitations/accept', {'token': str(uuid.uuid4()), 'username': 'x', 'password': 'y'}, format='json')
+        with mock.patch.object(User, 'set_password') as set_password:
+            response = self.client.post('/api/invitations/accept', {
+                'token': str(uuid.uuid4()), 'username': 'x', 'password': 'y',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 429)
+        set_password.assert_not_called()
+
+    def test_scope_without_rate_is_not_throttled(self):
+        with override_settings(THROTTLE_RATES={}):
+            self.assertEqual({self.login(f'user{i}').status_code for i in range(5)}, {401})
+
+
+class SchemaTests(SimpleTestCase):
+
+    # worker baru: django.setup(), load URLconf, lalu request pertama (401, tanpa query)
+    STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urlconf = time.perf_counter()
+from django.test import Client
+status = Client().get('/api/products').status_code
+first = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - start) * 1000,
+    'urlconf_ms': (urlconf - setup) * 1000,
+    'first_request_ms': (first - start) * 1000,
+    'status': status,
+    'loaded': sorted(m for m in sys.modules if m.split('.')[0] == 'drf_spectacular'),
+}))
+"""
+
+    def test_startup_does_not_import_schema_generator(self):
+        env = {**os.environ, 'DEBUG': 'True', 'PYTHONDONTWRITEBYTECODE': '1'}
+        result = subprocess.run(
+            [sys.executable, '-c', self.STARTUP_SCRIPT], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        startup = json.loads(result.stdout.splitlines()[-1])
+
+        self.assertEqual(startup['status'], 401)
+        # app config + checks saja; generator, plumbing dan views baru saat skema dibuat
+        self.assertEqual(startup['loaded'], ['drf_spectacular', 'drf_spectacular.apps', 'drf_spectacular.checks'])
+        self.assertLess(startup['urlconf_ms'], 1000, startup)
+        self.assertLess(startup['first_request_ms'], 5000, startup)
+
+    def test_extra_actions_match_drf(self):
+        for viewset in (UserViewSet, ProductViewSet, OrderViewSet, InvitationViewSet):
+            self.assertTrue(issubclass(viewset, LazySchemaMixin))
+            self.assertEqual(viewset.get_extra_actions(), ViewSetMixin.get_extra_actions.__func__(viewset))
+
+    def test_build_schema_is_served_as_is(self):
+        factory = RequestFactory()
+        # warning generator drf_spectacular ditulis langsung ke sys.stderr
+        with tempfile.TemporaryDirectory() as directory, override_settings(OPENAPI_SCHEMA_DIR=directory), \
+                mock.patch.dict('adminapi.schema._schemas', clear=True), mock.patch('sys.stderr', new_callable=io.StringIO):
+            call_command('build_schema', stdout=io.StringIO(), stderr=io.StringIO())
+            with open(os.path.join(directory, 'openapi.yaml'), 'rb') as fp:
+                yaml_bytes = fp.read()
+            with open(os.path.join(directory, 'openapi.json'), 'rb') as fp:
+                json_bytes = fp.read()
+
+            response = schema_view(factory.get('/api/schema'))
+            self.assertEqual(response.content, yaml_bytes)
+            self.assertEqual(response['Content-Type'], 'application/vnd.oai.openapi; charset=utf-8')
+            response = schema_view(factory.get('/api/schema', HTTP_ACCEPT='application/json'))
+            self.assertEqual(response.content, json_bytes)
+            self.assertEqual(json.loads(json_bytes)['info']['title'], settings.SPECTACULAR_SETTINGS['TITLE'])
+            self.assertIn('/api/products', json.loads(json_bytes)['paths'])
+
+            with open(os.path.join(directory, 'openapi.json'), 'ab') as fp:
+                fp.write(b' ')
+            with self.assertRaisesMessage(CommandError, 'openapi.json'):
+                call_command('build_schema', '--check', stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_stale_artifact_is_regenerated_under_debug(self):
+        factory = RequestFactory()
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict('adminapi.schema._schemas', clear=True), mock.patch('sys.stderr', new_callable=io.StringIO):
+            path = os.path.join(directory, 'openapi.yaml')
+            with open(path, 'wb') as fp:
+                fp.write(b'openapi: stale')
+            os.utime(path, (0, 0))
+
+            with override_settings(OPENAPI_SCHEMA_DIR=directory, DEBUG=False):
+                self.assertEqual(schema_view(factory.get('/api/schema')).content, b'openapi: stale')
+            with override_settings(OPENAPI_SCHEMA_DIR=directory, DEBUG=True):
+                content = schema_view(factory.get('/api/schema')).content
+                self.assertTrue(content.startswith(b'openapi: 3'), content[:40])
+
+                # lebih baru dari kode: dipakai apa adanya
+                os.utime(path, (time.time() + 60, time.time() + 60))
+                self.assertEqual(schema_view(factory.get('/api/schema')).content, b'openapi: stale')
+
+
+class StockStressTests(TransactionTestCase):
+    """Banyak thread memesan satu product yang sama: tidak boleh oversell."""
+
+    THREADS = 8
+    ORDERS_PER_THREAD = 25
+    STOCK = 100
+
+    def test_no_oversell_under_concurrency(self):
+        product = Product.objects.create(name='Hot item', price=Decimal('1.00'), stock=self.STOCK)
+
+        result = place_concurrent_orders(product.pk, self.THREADS, self.ORDERS_PER_THREAD)
+
+        self.assertEqual(result['accepted'], self.STOCK)
+        self.assertEqual(result['rejected'], self.THREADS * self.ORDERS_PER_THREAD - self.STOCK)
+        self.assertEqual(Product.objects.get(pk=product.pk).stock, 0)
+        self.assertEqual(Order.objects.filter(product=product).count(), self.STOCK)
@@ -0,0 +1,122 @@
+"""
+Throttle token bucket untuk endpoint tanpa login yang mahal: /api/login,
+/api/token/refresh dan /api/invitations/accept (hash password / query DB).
+
+Dipasang lewat throttle_classes DRF, jadi dicek di initial(), sebelum
+handler: request yang ditolak langsung 429 (dengan Retry-After) tanpa
+hash password atau query. View menentukan `throttle_scope`; rate per
+scope + kunci ada di settings.THROTTLE_RATES, mis. 'login_ip', 'login_username'.
+
+State bucket disimpan di cache (THROTTLE_CACHE_ALIAS) supaya berlaku untuk
+semua worker; dengan cache per-process (locmem) limit-nya per worker.
+Algoritmanya GCRA (setara token bucket): satu angka per key, yaitu
+"theoretical arrival time" dalam satuan 1/TICK token (1 token = 1/rate
+detik), dimajukan dengan cache.incr yang atomic.
+"""
+import functools
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# resolusi TAT: 1 token = TICK unit di cache
+TICK = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/min' -> (10/60 token per detik, burst 10); '10/min,3' -> burst 3."""
+    rate, _, burst = rate.partition(',')
+    num, _, period = rate.partition('/')
+    num = int(num)
+    return num / PERIODS[period.strip()[0]], int(burst) if burst else num
+
+
+def get_throttle_cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def consume(key, rate, burst, now=None):
+    """
+    Ambil satu token dari bucket `key`. Return 0 kalau boleh, atau berapa
+    detik lagi token berikutnya tersedia.
+
+    Semua langkah atomic (incr / decr / touch) kecuali saat bucket idle (penuh)
+    dimajukan ke waktu sekarang; kalau dua worker balapan di situ, paling
+    banyak satu request ekstra per worker yang lolos.
+    """
+    cache = get_throttle_cache()
+    # semua dalam integer 1/TICK token; dibulatkan ke atas (setelah membuang
+    # noise float) supaya pembulatan tidak pernah menambah allowance
+    now = math.ceil(round((time.time() if now is None else now) * rate * TICK, 6))
+    # harus lebih lama dari isi bucket penuh (burst tick)
+    timeout = max(math.ceil(2 * burst / rate), 3600)
+    try:
+        tat = cache.incr(key, TICK)
+    except ValueError:
+        cache.add(key, now, timeout)
+        tat = cache.incr(key, TICK)
+    if tat < now + TICK:
+        # bucket sudah penuh lagi: token yang "tertabung" tidak melebihi burst
+        tat = now + TICK
+        cache.set(key, tat, timeout)
+    else:
+        # incr/decr tidak memperpanjang TTL: tanpa touch, state bucket yang
+        # terus dipakai bisa expire di tengah window dan bucket ter-reset
+        cache.touch(key, timeout)
+    if tat - now <= burst * TICK:
+        return 0
+    # request yang ditolak tidak memakai token
+    cache.decr(key, TICK)
+    return (tat - now - burst * TICK) / (rate * TICK)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base: subclass menentukan key_name dan get_ident_value()."""
+    key_name = None
+    # seperti SimpleRateThrottle DRF; bisa diganti di test
+    timer = time.time
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = settings.THROTTLE_RATES.get(f'{scope}_{self.key_name}') if scope else None
+        if rate is None:
+            return True
+        value = self.get_ident_value(request)
+        if value is None:
+            return True
+
+        digest = hashlib.md5(str(value).encode('utf-8')).hexdigest()
+        self.retry_after = consume(f'throttle:{scope}:{self.key_name}:{digest}', *parse_rate(rate), now=self.timer())
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    # alamat client dari DRF: REMOTE_ADDR, atau X-Forwarded-For kalau NUM_PROXIES > 0
+    key_name = 'ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Per username yang dicoba, supaya satu akun tidak bisa ditebak dari banyak IP."""
+    key_name = 'username'
+
+    def get_ident_value(self, request):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return username.strip().casefold()
@@ -0,0 +1,133 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    """
+    Bloom filter sederhana di atas bytearray. `jti in bloom` bisa false
+    positive (dengan peluang ~error_rate) tapi tidak pernah false negative.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BlacklistFilter:
+    """
+    Negative cache untuk token blacklist, per process.
+
+    Kalau jti tidak ada di bloom filter, token pasti tidak di-blacklist dan
+    query ke tabel blacklist bisa dilewati. Filter disinkronkan secara
+    incremental dari BlacklistedToken (berdasarkan blacklisted_at) paling
+    sering tiap SYNC_INTERVAL detik, dan dibangun ulang dari token yang
+    belum expired tiap REBUILD_INTERVAL detik atau saat kapasitas penuh.
+
+    Token yang di-blacklist di process lain baru terlihat setelah sync
+    berikutnya; set SYNC_INTERVAL = 0 untuk sync di setiap pengecekan.
+    """
+
+    # Jarak aman untuk transaksi blacklist yang commit terlambat / jam server yang berbeda
+    SYNC_OVERLAP = timedelta(seconds=30)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+            self.synced_until = None
+            self.next_sync = 0
+            self.next_rebuild = 0
+
+    @property
+    def config(self):
+        return settings.TOKEN_BLACKLIST_FILTER
+
+    def _rebuild(self, now):
+        bloom = BloomFilter(self.config['CAPACITY'], self.config['ERROR_RATE'])
+        jtis = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=now)
+            .values_list('token__jti', flat=True)
+            .iterator(chunk_size=5000)
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom = bloom
+        self.next_rebuild = time.monotonic() + self.config['REBUILD_INTERVAL']
+
+    def _sync(self):
+        jtis = BlacklistedToken.objects.filter(
+            blacklisted_at__gte=self.synced_until - self.SYNC_OVERLAP
+        ).values_list('token__jti', flat=True)
+        for jti in jtis:
+            # baris di jendela overlap sudah pernah masuk, jangan dihitung dua kali
+            if jti not in self.bloom:
+                self.bloom.add(jti)
+
+    def sync(self):
+        if time.monotonic() < self.next_sync:
+            return
+        with self.lock:
+            if time.monotonic() < self.next_sync:
+                return
+            now = timezone.now()
+            if self.bloom is None or self.bloom.count > self.bloom.capacity or time.monotonic() >= self.next_rebuild:
+                self._rebuild(now)
+            else:
+                self._sync()
+            self.synced_until = now
+            self.next_sync = time.monotonic() + self.config['SYNC_INTERVAL']
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self.bloom
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None and jti not in self.bloom:
+                self.bloom.add(jti)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken yang hanya query tabel blacklist kalau bloom filter bilang 'mungkin'."""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
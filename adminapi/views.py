@@ -1,20 +1,76 @@
+import uuid
+
 from rest_framework import viewsets, mixins, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils import timezone
 from .models import User, Product, Order, Invitation
-from .serializers import CustomTokenObtainPairSerializer, UserSerializer, AdminCreateUserSerializer, ProductSerializer, OrderSerializer, InvitationSerializer
-from .permissions import UserPermission, ProductPermission, OrderPermission
-from rest_framework_simplejwt.views import TokenObtainPairView
+from .serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer, UserSerializer, AdminCreateUserSerializer, ProductSerializer, OrderSerializer, OrderBulkItemSerializer, InvitationSerializer, SalesReportQuerySerializer, DailyProductSalesSerializer
+from .permissions import RolePermission
+from .pagination import UserCursorPagination
+from .filters import IndexedOrderingFilter, QueryParamFilterBackend
+from .async_views import AsyncReadMixin
+from .catalog import CatalogCacheMixin, acatalog_version, catalog_version
+from .conditional import ConditionalGetMixin, invalidate_resource_state
+from .exports import ExportMixin
+from .fastpath import FastListMixin
+from .metrics import render_prometheus
+from .imports import detect_format, import_products
+from .inventory import OutOfStock, release_stock, reserve_stock, try_reserve_stock
+from .schema import LazySchemaMixin
+from .reports import record_orders_created, sales_report, sales_totals
+from .outbox import enqueue_invitation_email, enqueue_invitation_emails
+from .throttling import IPThrottle, UsernameThrottle
+from .tokens import FilteredRefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+class SparseFieldsetViewMixin:
+    """
+    Untuk GET dengan ?fields= / ?exclude=: queryset hanya me-load kolom yang
+    masih dirender serializer (lihat SparseFieldsetMixin), plus pk dan kolom
+    ordering pagination. Relasi yang tidak dirender dilepas dari select_related.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.request
+        if request.method not in ('GET', 'HEAD') or not ({'fields', 'exclude'} & set(request.query_params)):
+            return queryset
+
+        columns = self.get_serializer().only_fields()
+        paginator = self.paginator
+        if paginator is not None and self.action == 'list':
+            # termasuk ?ordering= (lihat IndexedOrderingFilter)
+            columns.update(field.lstrip('-') for field in paginator.get_ordering(request, queryset, self))
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+        related = queryset.query.select_related
+        queryset = queryset.only(*columns)
+        if isinstance(related, dict):
+            keep = [name for name in related if name in columns]
+            queryset = queryset.select_related(None).select_related(*keep) if keep else queryset.select_related(None)
+        return queryset
+
+
+class UserViewSet(SparseFieldsetViewMixin, ConditionalGetMixin, ExportMixin, LazySchemaMixin, viewsets.ModelViewSet):
+    # only() kolom yang dipakai UserSerializer + key pagination
+    queryset = User.objects.only('id', 'username', 'email', 'role', 'first_name', 'last_name', 'date_joined', 'auth_version', 'updated_at')
     serializer_class = UserSerializer
-    permission_classes = [UserPermission]
+    permission_classes = [RolePermission]
+    permission_resource = 'users'
+    pagination_class = UserCursorPagination
+    filter_backends = [IndexedOrderingFilter, QueryParamFilterBackend]
+    query_filters = {'role': 'role'}
+    ordering_fields = ['date_joined', 'updated_at', 'username']
+    export_columns = [
+        ('id', 'id'), ('username', 'username'), ('email', 'email'), ('role', 'role'),
+        ('first_name', 'first_name'), ('last_name', 'last_name'), ('date_joined', 'date_joined'),
+    ]
 
     lookup_field = 'username'
 
@@ -23,62 +79,322 @@ class UserViewSet(viewsets.ModelViewSet):
             return AdminCreateUserSerializer
         return UserSerializer
 
-class ProductViewSet(viewsets.ModelViewSet):
+# urutan mixin: cek 304 dulu, baru cache katalog, baru DB (sync dan async)
+class ProductViewSet(SparseFieldsetViewMixin, ConditionalGetMixin, CatalogCacheMixin, FastListMixin, AsyncReadMixin, LazySchemaMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    permission_classes = [ProductPermission]
+    permission_classes = [RolePermission]
+    permission_resource = 'products'
+    filter_backends = [IndexedOrderingFilter, QueryParamFilterBackend]
+    query_filters = {
+        'status': 'status',
+        'price_min': 'price__gte',
+        'price_max': 'price__lte',
+        'stock_below': 'stock__lt',
+    }
+    ordering_fields = ['created_at', 'updated_at', 'price', 'stock']
+    import_chunk_size = 1000
+
+    # body list/detail bisa dari cache katalog yang stock-nya basi (lihat catalog.py);
+    # ETag ikut versi katalog supaya 304 tidak mengunci client ke body lama
+    def get_validator_version(self):
+        return catalog_version()
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all()
+    async def aget_validator_version(self):
+        return await acatalog_version()
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_products(self, request):
+        """
+        Upsert product dari file CSV / NDJSON (field multipart `file`), sku
+        sebagai natural key. Row invalid dilaporkan per baris, sisanya tetap masuk.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'file required'}, status=400)
+        fmt = request.data.get('file_format') or detect_format(upload.name, upload.content_type or '')
+        if fmt not in ('csv', 'ndjson'):
+            return Response({'detail': 'file must be .csv or .ndjson'}, status=400)
+
+        result = import_products(upload.file, fmt, self.import_chunk_size)
+        return Response(result, status=status.HTTP_200_OK if result['created'] or result['updated'] or not result['failed'] else status.HTTP_400_BAD_REQUEST)
+
+class OrderViewSet(SparseFieldsetViewMixin, ConditionalGetMixin, ExportMixin, FastListMixin, AsyncReadMixin, LazySchemaMixin, viewsets.ModelViewSet):
+    # product di-join sekalian supaya ProductForeignSerializer tidak query per order
+    queryset = Order.objects.select_related('product').only(
+        'id', 'customer_name', 'quantity', 'total_price', 'status', 'created_at', 'updated_at',
+        'product', 'product__id', 'product__name', 'product__price',
+    )
     serializer_class = OrderSerializer
-    permission_classes = [OrderPermission]
+    permission_classes = [RolePermission]
+    permission_resource = 'orders'
+    filter_backends = [IndexedOrderingFilter, QueryParamFilterBackend]
+    # semua kombinasi ini dilayani index (status, created_at) / (product, created_at)
+    query_filters = {
+        'status': 'status',
+        'product': 'product',
+        'created_after': 'created_at__gte',
+        'created_before': 'created_at__lt',
+    }
+    ordering_fields = ['created_at', 'updated_at']
+    # product di-join di SQL (values_list), tanpa serializer
+    export_columns = [
+        ('id', 'id'), ('product_id', 'product_id'), ('product_name', 'product__name'),
+        ('customer_name', 'customer_name'), ('quantity', 'quantity'), ('total_price', 'total_price'),
+        ('status', 'status'), ('created_at', 'created_at'),
+    ]
+    bulk_limit = 1000
 
     def perform_create(self, serializer):
         # Calculate total_price automatically
         product = serializer.validated_data['product']
-        quantity = serializer.validated_data['quantity']
+        quantity = serializer.validated_data.get('quantity', 1)
         total = product.price * quantity
-        serializer.save(total_price=total)
+        with transaction.atomic():
+            order = serializer.save(total_price=total)
+            # terakhir: lock baris product dipegang sampai commit (lihat try_reserve_stock);
+            # OutOfStock me-rollback INSERT di atas
+            if order.holds_stock():
+                reserve_stock(product.pk, quantity)
+
+    def perform_update(self, serializer):
+        order = serializer.instance
+        before = (order.product_id, order.quantity, order.holds_stock())
+        with transaction.atomic():
+            order = serializer.save()
+            after = (order.product_id, order.quantity, order.holds_stock())
+            if before != after:
+                # kembalikan stock lama dulu, baru ambil lagi sesuai data baru
+                if before[2]:
+                    release_stock(before[0], before[1])
+                if after[2]:
+                    reserve_stock(after[0], after[1])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            product_id, quantity, holds_stock = instance.product_id, instance.quantity, instance.holds_stock()
+            instance.delete()
+            if holds_stock:
+                release_stock(product_id, quantity)
+
+    def _reserve_bulk_stock(self, orders, atomic):
+        """
+        Ambil stock untuk order bulk: satu UPDATE bersyarat per product.
+        Dalam mode per-item, product yang stock-nya kurang untuk total
+        dicoba ulang per order. Return index order yang kehabisan stock.
+
+        Berbeda dengan perform_create, ini harus jalan sebelum bulk_create
+        (hasilnya menentukan order mana yang dibuat), jadi lock baris product
+        dipegang juga selama INSERT sampai commit; product diurutkan supaya
+        dua request bulk tidak saling deadlock.
+        """
+        groups = {}
+        for index, order in orders:
+            if order.holds_stock():
+                groups.setdefault(order.product_id, []).append((index, order))
+
+        short = set()
+        for product_id, group in sorted(groups.items()):
+            if try_reserve_stock(product_id, sum(order.quantity for _, order in group)):
+                continue
+            if atomic:
+                short.update(index for index, _ in group)
+                continue
+            for index, order in group:
+                if not try_reserve_stock(product_id, order.quantity):
+                    short.add(index)
+        return short
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Buat banyak order sekaligus (sync dari POS).
+
+        Body: list order, atau {"orders": [...], "atomic": true}. Dengan
+        atomic=true (default) satu item invalid membatalkan semuanya;
+        atomic=false membuat item yang valid dan melaporkan error per item.
+        """
+        if isinstance(request.data, dict):
+            items = request.data.get('orders')
+            atomic = request.data.get('atomic', request.query_params.get('atomic', 'true'))
+        else:
+            items = request.data
+            atomic = request.query_params.get('atomic', 'true')
+        atomic = str(atomic).lower() not in ('false', '0', 'no')
+
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'list of orders required'}, status=400)
+        if len(items) > self.bulk_limit:
+            return Response({'detail': f'at most {self.bulk_limit} orders per request'}, status=400)
+
+        results = []
+        valid = []
+        for index, item in enumerate(items):
+            serializer = OrderBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+                results.append(None)
+            else:
+                results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+
+        # satu query IN untuk semua product yang direferensikan
+        products = Product.objects.only('id', 'name', 'price').in_bulk({data['product_id'] for _, data in valid})
+
+        orders = []
+        for index, data in valid:
+            product = products.get(data['product_id'])
+            if product is None:
+                results[index] = {'index': index, 'status': 'error', 'errors': {
+                    'product_id': [f'Invalid pk "{data["product_id"]}" - object does not exist.'],
+                }}
+                continue
+            data = dict(data)
+            del data['product_id']
+            order = Order(product=product, **data)
+            order.total_price = product.price * order.quantity
+            orders.append((index, order))
+
+        if atomic and len(orders) < len(items):
+            return Response({'created': 0, 'failed': len(items) - len(orders), 'results': [r for r in results if r]}, status=400)
+
+        with transaction.atomic():
+            short = self._reserve_bulk_stock(orders, atomic)
+            for index in short:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'quantity': [OutOfStock.default_detail]}}
+            if atomic and short:
+                transaction.set_rollback(True)
+                return Response({'created': 0, 'failed': len(short), 'results': [r for r in results if r]}, status=409)
+            orders = [(index, order) for index, order in orders if index not in short]
+            if connection.features.can_return_rows_from_bulk_insert:
+                Order.objects.bulk_create([order for _, order in orders])
+                # bulk_create tidak memicu signal post_save
+                invalidate_resource_state('orders')
+                record_orders_created([order for _, order in orders])
+            else:
+                # MySQL: bulk_create tidak mengisi pk, dan row tidak punya kolom unik
+                # untuk dicocokkan lagi; INSERT per row (signal mengurus rollup & state)
+                for _, order in orders:
+                    order.save(force_insert=True)
+
+        failed = len(items) - len(orders)
+
+        for index, order in orders:
+            results[index] = {'index': index, 'status': 'created', 'order': self.get_serializer(order).data}
 
-class InvitationViewSet(viewsets.GenericViewSet,
+        return Response(
+            {'created': len(orders), 'failed': failed, 'results': results},
+            status=status.HTTP_201_CREATED if orders else status.HTTP_400_BAD_REQUEST,
+        )
+
+class InvitationViewSet(SparseFieldsetViewMixin,
+                        ConditionalGetMixin,
+                        LazySchemaMixin,
+                        viewsets.GenericViewSet,
                         mixins.CreateModelMixin,
                         mixins.RetrieveModelMixin,
                         mixins.ListModelMixin):
+    # inviter dirender sebagai pk saja (inviter_id), tidak perlu join ke User
     queryset = Invitation.objects.all()
     serializer_class = InvitationSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [RolePermission]
+    permission_resource = 'invitations'
+    # revoke membatalkan invitation, diperlakukan seperti delete
+    permission_action_map = {'revoke': 'delete'}
+    # hanya action accept yang di-throttle (scope 'accept', lihat throttling.py)
+    throttle_scope = None
+    bulk_limit = 500
 
     def create(self, request):
-        if request.user.role not in ('admin', 'manager'):
-            return Response({'detail': 'Forbidden'}, status=403)
-
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        invitation = serializer.save(inviter=request.user)
 
-        invite_link = f"https://frontend-rbac.tokocoding.com/api/invitations/accept/?token={invitation.token}"
-        subject = 'You are invited'
-        message = f"You have been invited. Click to accept: {invite_link}\nThis link expires: {invitation.expires_at}"
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [invitation.email])
-
-        print(f"Invitation sent to {invitation.email} with link: {invite_link}")
+        # email masuk outbox dalam transaksi yang sama, dikirim oleh worker send_outbox
+        with transaction.atomic():
+            # request.user bisa berupa RoleTokenUser (bukan instance model)
+            invitation = serializer.save(inviter_id=request.user.pk)
+            enqueue_invitation_email(invitation)
 
         return Response(self.get_serializer(invitation).data, status=status.HTTP_201_CREATED)
 
-    @action(detail=False, methods=['post'], url_path='accept', permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Buat banyak invitation sekaligus dari list {email, role}.
+        Email yang masih punya invitation pending (atau dobel di payload)
+        dilaporkan sebagai error per item, sisanya tetap dibuat.
+        """
+        items = request.data.get('invitations') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'list of invitations required'}, status=400)
+        if len(items) > self.bulk_limit:
+            return Response({'detail': f'at most {self.bulk_limit} invitations per request'}, status=400)
+
+        results = []
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+                results.append(None)
+            else:
+                results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+
+        # satu query untuk semua email yang masih punya invitation pending
+        emails = Q()
+        for _, data in valid:
+            emails |= Q(email__iexact=data['email'])
+        taken = set()
+        if valid:
+            taken = {email.lower() for email in Invitation.objects.pending().filter(emails).values_list('email', flat=True)}
+
+        invitations = []
+        for index, data in valid:
+            email = data['email'].lower()
+            if email in taken:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'email': ['pending invitation already exists']}}
+                continue
+            taken.add(email)
+            invitations.append((index, Invitation(
+                email=data['email'], role=data['role'], inviter_id=request.user.pk,
+                expires_at=Invitation.default_expires_at(),
+            )))
+
+        with transaction.atomic():
+            created = Invitation.objects.bulk_create([invitation for _, invitation in invitations])
+            if created and created[0].pk is None:
+                # backend tanpa RETURNING (MySQL): ambil pk lewat token
+                pks = dict(Invitation.objects.filter(token__in=[i.token for i in created]).values_list('token', 'pk'))
+                for invitation in created:
+                    invitation.pk = pks[invitation.token]
+            enqueue_invitation_emails(created)
+            invalidate_resource_state('invitations')
+
+        for index, invitation in invitations:
+            results[index] = {'index': index, 'status': 'created', 'invitation': self.get_serializer(invitation).data}
+
+        created_count = len(invitations)
+        return Response(
+            {'created': created_count, 'failed': len(items) - created_count, 'results': results},
+            status=status.HTTP_201_CREATED if created_count else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=['post'], url_path='accept', permission_classes=[AllowAny],
+            throttle_classes=[IPThrottle, UsernameThrottle], throttle_scope='accept')
     def accept(self, request):
+        """
+        Terima invitation dan buat akun.
+
+        Invitation diklaim dengan satu UPDATE bersyarat (is_used=false dan
+        belum expired) di dalam transaksi yang sama dengan pembuatan user,
+        jadi dua request dengan token yang sama tidak mungkin sama-sama berhasil.
+        """
         token = request.data.get('token') or request.query_params.get('token')
         if not token:
             return Response({'detail': 'token required'}, status=400)
         try:
-            invitation = Invitation.objects.get(token=token)
-        except Invitation.DoesNotExist:
+            token = uuid.UUID(str(token))
+        except ValueError:
             return Response({'detail': 'Invalid or expired token'}, status=400)
-        except Exception as e:
-            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        if not invitation.is_valid():
-            return Response({'detail': 'invitation invalid or expired'}, status=400)
 
         username = request.data.get('username')
         password = request.data.get('password')
@@ -88,27 +404,39 @@ class InvitationViewSet(viewsets.GenericViewSet,
         if not username or not password:
             return Response({'detail': 'username and password required'}, status=400)
 
-        if User.objects.filter(username=username).exists():
-            return Response({'detail': 'username exists'}, status=400)
+        # hash password (lambat) di luar transaksi supaya lock row invitation singkat
+        user = User(username=User.normalize_username(username), first_name=first_name or '', last_name=last_name or '')
+        user.set_password(password)
 
-        User.objects.create_user(username=username, email=invitation.email, first_name=first_name, last_name=last_name, 
-                                 password=password, role=invitation.role)
+        now = timezone.now()
+        with transaction.atomic():
+            claimed = Invitation.objects.filter(
+                Q(expires_at__isnull=True) | Q(expires_at__gt=now), token=token, is_used=False,
+            ).update(is_used=True, updated_at=now)
+            if not claimed:
+                if Invitation.objects.filter(token=token).exists():
+                    return Response({'detail': 'invitation invalid or expired'}, status=400)
+                return Response({'detail': 'Invalid or expired token'}, status=400)
 
-        invitation.is_used = True
-        invitation.save()
+            invitation = Invitation.objects.values('email', 'role').get(token=token)
+            user.email = User.objects.normalize_email(invitation['email'])
+            user.role = invitation['role']
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError:
+                # username unik: batalkan klaim invitation juga
+                transaction.set_rollback(True)
+                return Response({'detail': 'username exists'}, status=400)
+            invalidate_resource_state('invitations')
 
         return Response({'detail': 'account created'}, status=201)
 
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['post'])
     def revoke(self, request, pk=None):
         """Revoke (cancel) an existing invitation by ID."""
         invitation = self.get_object()
 
-        # hanya admin boleh revoke invitation
-
-        if request.user.role != 'admin':
-            return Response({'detail': 'Forbidden'}, status=403)
-
         # kalau sudah dipakai / expired, tidak bisa di revoke lagi
         if getattr(invitation, 'is_used', False) or invitation.is_used:
             return Response({'detail': 'Invitation already used or revoked'}, status=400)
@@ -119,6 +447,46 @@ class InvitationViewSet(viewsets.GenericViewSet,
 
         return Response({'detail': 'Invitation revoked successfully'}, status=200)
     
+class SalesReportView(APIView):
+    """
+    GET /api/reports/sales?start=2025-01-01&end=2025-01-31&product=1,2
+
+    Dibaca dari rollup DailyProductSales (satu row per hari x product),
+    tidak menyentuh tabel Order. Hak akses sama dengan read orders.
+    """
+    permission_classes = [RolePermission]
+    permission_resource = 'orders'
+
+    def get(self, request):
+        params = SalesReportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data['start'], params.validated_data['end']
+
+        rows = sales_report(start, end, params.validated_data.get('product'))
+        results = rows.select_related('product').only(
+            'date', 'product', 'orders', 'units', 'revenue', 'product__id', 'product__name',
+        ).order_by('date', 'product_id')
+        totals = sales_totals(rows)
+        totals['revenue'] = float(totals['revenue'])
+
+        return Response({
+            'start': start,
+            'end': end,
+            'totals': totals,
+            'results': DailyProductSalesSerializer(results, many=True).data,
+        })
+
+class MetricsView(APIView):
+    """
+    GET /api/metrics: histogram per (view, method, status) dalam format
+    text Prometheus. Hanya admin (resource 'metrics').
+    """
+    permission_classes = [RolePermission]
+    permission_resource = 'metrics'
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -128,7 +496,7 @@ class LogoutView(APIView):
             if not refresh_token:
                 return Response({"detail": "Refresh token required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
 
             return Response({"detail": "Successfully logged out"}, status=status.HTTP_205_RESET_CONTENT)
@@ -136,4 +504,12 @@ class LogoutView(APIView):
             return Response({"detail": "Invalid or expired token"}, status=status.HTTP_400_BAD_REQUEST)
     
 class CustomTokenObtainPairView(TokenObtainPairView):
-    serializer_class = CustomTokenObtainPairSerializer  
\ No newline at end of file
+    serializer_class = CustomTokenObtainPairSerializer
+    # ditolak (429) sebelum hash password
+    throttle_classes = [IPThrottle, UsernameThrottle]
+    throttle_scope = 'login'
+
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+    throttle_classes = [IPThrottle]
+    throttle_scope = 'refresh'
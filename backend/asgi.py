@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# GET products / orders lewat view async (lihat backend/asgi_urls.py)
+os.environ.setdefault('ROOT_URLCONF', 'backend.asgi_urls')
 
 application = get_asgi_application()
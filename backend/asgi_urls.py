@@ -0,0 +1,15 @@
+"""
+URL configuration untuk ASGI (dipilih di backend/asgi.py lewat env ROOT_URLCONF).
+
+Sama dengan backend.urls, tapi GET list/detail products dan orders
+dilayani view async (adminapi/async_views.py) tanpa thread hop.
+"""
+from django.urls import include, path
+
+from adminapi.urls import async_read_urlpatterns
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('api/', include(async_read_urlpatterns)),
+    *wsgi_urlpatterns,
+]
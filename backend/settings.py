@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # paling luar supaya latency mencakup middleware lain
+    'adminapi.metrics.MetricsMiddleware',
+    'adminapi.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -59,7 +62,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'backend.urls'
+# backend/asgi.py memakai backend.asgi_urls (view baca async)
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', 'backend.urls')
 
 TEMPLATES = [
     {
@@ -82,19 +86,56 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DB_POOL=True: koneksi diambil dari pool per process (adminapi/mysql_pool),
+# Django tetap "menutup" koneksi di akhir request tapi koneksinya kembali ke pool.
+# DB_POOL=False: backend mysql biasa dengan koneksi persisten (DB_CONN_MAX_AGE).
+DB_POOL = os.getenv('DB_POOL', 'True') == 'True'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'adminapi.mysql_pool' if DB_POOL else 'django.db.backends.mysql',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST', '127.0.0.1'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'charset': 'utf8mb4',
         },
     }
 }
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '20')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+        'ping_interval': float(os.getenv('DB_POOL_PING_INTERVAL', '0')),
+    }
+
+# Read replica: DB_REPLICA_HOSTS=10.0.0.2,10.0.0.3:3307 -> alias replica1, replica2
+# dengan setting lain sama seperti default. Request GET dibaca dari replica
+# (adminapi/routers.py); user yang baru menulis tetap ke primary selama
+# DB_REPLICA_STICKY_SECONDS supaya perubahannya langsung terlihat.
+for index, replica_host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = replica_host.strip().partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'OPTIONS': {**DATABASES['default']['OPTIONS']},
+        # saat test, replica = database test default (tidak dibuat terpisah)
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['adminapi.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+# replica yang gagal dicek dilewati selama ini (detik) sebelum dicek lagi
+REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_HEALTH_CHECK_INTERVAL', '5'))
 
 
 # Password validation
@@ -145,12 +186,22 @@ APPEND_SLASH=False
 # REST Framework and JWT Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'adminapi.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSONRenderer dengan orjson kalau ter-install, output sama (adminapi/fastpath.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'adminapi.fastpath.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'adminapi.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
+    # jumlah proxy tepercaya di depan app; 0 = pakai REMOTE_ADDR, X-Forwarded-For
+    # diabaikan (kalau tidak di-set DRF memakai header itu mentah-mentah)
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 SIMPLE_JWT = {
@@ -159,6 +210,15 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Bloom filter blacklist refresh token per process (adminapi/tokens.py)
+TOKEN_BLACKLIST_FILTER = {
+    'CAPACITY': int(os.getenv('TOKEN_BLACKLIST_FILTER_CAPACITY', '100000')),
+    'ERROR_RATE': 0.001,
+    # detik; token yang di-blacklist di worker lain terlihat paling lambat setelah ini
+    'SYNC_INTERVAL': int(os.getenv('TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL', '5')),
+    'REBUILD_INTERVAL': 3600,
+}
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Backend API RBAC Doni',
     'DESCRIPTION': 'Django 5 API with RBAC and JWT — autogenerated OpenAPI schema',
@@ -177,10 +237,78 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# openapi.yaml / openapi.json hasil `manage.py build_schema`, dikirim oleh /api/schema
+OPENAPI_SCHEMA_DIR = Path(os.getenv('OPENAPI_SCHEMA_DIR', BASE_DIR / 'openapi'))
+
+# Cache (default locmem per process). Untuk lebih dari satu worker pakai
+# cache bersama, mis. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Berapa lama auth_version user di-cache oleh StatelessJWTAuthentication.
+# Dengan cache per-process, ini batas waktu token lama masih diterima di worker lain.
+AUTH_VERSION_CACHE_TIMEOUT = int(os.getenv('AUTH_VERSION_CACHE_TIMEOUT', '60'))
+
+# Versi tabel permission (PermissionGrant) di cache dan umur maksimal tabel yang
+# sudah di-compile per process: dengan cache per-process, ini batas waktu grant
+# baru terlihat di worker lain. Versi dicek paling sering tiap PERMISSION_CHECK_INTERVAL detik.
+PERMISSION_CACHE_TIMEOUT = int(os.getenv('PERMISSION_CACHE_TIMEOUT', '60'))
+PERMISSION_CHECK_INTERVAL = float(os.getenv('PERMISSION_CHECK_INTERVAL', '1'))
+
+# Berapa lama state (count, MAX(updated_at)) per resource untuk ETag di-cache.
+# Sama seperti auth_version: dengan cache per-process ini batas basinya 304 di worker lain.
+RESOURCE_STATE_CACHE_TIMEOUT = int(os.getenv('RESOURCE_STATE_CACHE_TIMEOUT', '60'))
+
+# Jumlah row per query saat streaming export CSV / NDJSON
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Histogram per request + header Server-Timing (adminapi/metrics.py)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+# Header Server-Timing (durasi + jumlah query) dikirim ke semua client, termasuk
+# yang belum login: hanya untuk development / debugging, jangan di production
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'False') == 'True'
+
+# list products / orders dari .values() tanpa serializer (adminapi/fastpath.py)
+FAST_READ_PATH = os.getenv('FAST_READ_PATH', 'True') == 'True'
+
+# Token bucket untuk login / refresh / accept invitation (adminapi/throttling.py):
+# '<jumlah>/<sec|min|hour|day>[,burst]', key '<throttle_scope>_<ip|username>'.
+# Bucket disimpan di cache ini; pakai cache bersama (Redis) supaya limit berlaku lintas worker.
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', 'default')
+THROTTLE_RATES = {
+    'login_ip': os.getenv('THROTTLE_LOGIN_IP', '20/min,10'),
+    'login_username': os.getenv('THROTTLE_LOGIN_USERNAME', '10/min,5'),
+    'refresh_ip': os.getenv('THROTTLE_REFRESH_IP', '300/min,60'),
+    'accept_ip': os.getenv('THROTTLE_ACCEPT_IP', '10/min,5'),
+    'accept_username': os.getenv('THROTTLE_ACCEPT_USERNAME', '5/min,5'),
+}
+
+# Cache payload list/detail product (adminapi/catalog.py), dalam detik
+PRODUCT_CACHE = {
+    'ALIAS': os.getenv('PRODUCT_CACHE_ALIAS', 'default'),
+    'TIMEOUT': int(os.getenv('PRODUCT_CACHE_TIMEOUT', '300')),
+    # lama lock stampede dipegang / ditunggu oleh request lain
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 5,
+}
+
 # Email for invitations (development)
 EMAIL_BACKEND = os.getenv('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 DEFAULT_FROM_EMAIL = 'no-reply@tokocoding.com'
 
+# Worker outbox email (manage.py send_outbox), semua dalam detik
+EMAIL_OUTBOX = {
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BASE': 30,
+    'RETRY_MAX': 3600,
+    # row 'sending' lebih lama dari ini dianggap worker-nya mati dan diklaim ulang
+    'LEASE': 300,
+}
+
 CORS_ALLOWED_ORIGINS = [
     os.getenv("CORS_ALLOWED_ORIGIN", "http://localhost:3000"),
 ]